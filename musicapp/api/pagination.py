@@ -0,0 +1,12 @@
+from rest_framework import pagination
+
+
+class CursorPagination(pagination.CursorPagination):
+    """Cursor pagination ordered by `ordering` of the view, so pages cost the same at any depth."""
+    ordering = '-id'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, 'ordering', self.ordering)
+        return (ordering,) if isinstance(ordering, str) else tuple(ordering)
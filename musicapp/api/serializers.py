@@ -0,0 +1,78 @@
+from rest_framework import serializers
+
+from app.models import Albums, Artists, Comments, CustomUser, Playlists, Recommendations, Tracks
+
+
+def requested_fields(request):
+    """Function returns names from `fields` query param, None if it's not given."""
+    if request is None or not request.query_params.get('fields'):
+        return None
+    return {name.strip() for name in request.query_params['fields'].split(',') if name.strip()}
+
+
+class SparseFieldsMixin:
+    """Serializer mixin leaving only fields listed in `fields` query param.
+
+    Nested serializers are declared without context, so they are always complete.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = requested_fields(self.context.get('request'))
+        if fields is not None:
+            for name in set(self.fields) - fields:
+                self.fields.pop(name)
+
+
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    class Meta:
+        model = CustomUser
+        fields = ['id', 'username', 'followers_count', 'following_count', 'tracks_count', 'date_joined']
+
+
+class ArtistSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Artists
+        fields = ['id', 'id_musixmatch', 'name']
+
+
+class AlbumSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Albums
+        fields = ['id', 'id_musixmatch', 'name']
+
+
+class TrackSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    album = AlbumSerializer(read_only=True)
+    author = ArtistSerializer(read_only=True)
+    genres = serializers.SlugRelatedField(many=True, read_only=True, slug_field='name')
+
+    class Meta:
+        model = Tracks
+        fields = ['id', 'id_musixmatch', 'name', 'album', 'author', 'genres']
+
+
+class PlaylistSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    creator = UserSerializer(read_only=True)
+
+    class Meta:
+        model = Playlists
+        fields = [
+            'id', 'name', 'description', 'created_at', 'updated_at', 'creator',
+            'adds_count', 'comments_count', 'tracks_count'
+        ]
+
+
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    author = UserSerializer(read_only=True)
+
+    class Meta:
+        model = Comments
+        fields = ['id', 'message', 'created_at', 'author', 'playlist']
+
+
+class RecommendationSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    candidate = UserSerializer(read_only=True)
+
+    class Meta:
+        model = Recommendations
+        fields = ['id', 'candidate', 'score']
@@ -0,0 +1,101 @@
+from django.test import TestCase
+
+from app import counters
+from app.models import Albums, Artists, Comments, CustomUser, Genres, Playlists, Recommendations, Tracks
+
+
+class ApiTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = CustomUser.objects.bulk_create([
+            CustomUser(username='api{}'.format(i), email='api{}@test.test'.format(i)) for i in range(30)
+        ])
+        cls.me = cls.users[0]
+        Following = CustomUser.following.through
+        Following.objects.bulk_create([
+            Following(from_customuser=user, to_customuser=cls.me) for user in cls.users[1:]
+        ])
+        artist = Artists.objects.create(id_musixmatch=1, name='Artist')
+        album = Albums.objects.create(id_musixmatch=1, name='Album')
+        genre = Genres.objects.create(id_musixmatch=1, name='Rock')
+        cls.tracks = Tracks.objects.bulk_create([
+            Tracks(id_musixmatch=i, name='Track {}'.format(i), album=album, author=artist) for i in range(1, 26)
+        ])
+        Tracks.genres.through.objects.bulk_create([
+            Tracks.genres.through(tracks=track, genres=genre) for track in cls.tracks
+        ])
+        cls.playlist = Playlists.objects.create(name='Playlist', creator=cls.me)
+        cls.playlist.tracks.add(*cls.tracks)
+        Comments.objects.bulk_create([
+            Comments(message='Comment {}'.format(i), author=cls.users[i], playlist=cls.playlist) for i in range(25)
+        ])
+        Recommendations.objects.create(user=cls.me, candidate=cls.users[1], score=1)
+        counters.reconcile(CustomUser)
+        counters.reconcile(Playlists)
+
+    def collect(self, url, queries, **params):
+        """Method follows `next` links from url and returns all results, checking queries of every page."""
+        results = []
+        while url:
+            with self.assertNumQueries(queries):
+                response = self.client.get(url, params)
+            self.assertEqual(200, response.status_code)
+            results.extend(response.json()['results'])
+            url, params = response.json()['next'], {}
+        return results
+
+    def test_users_are_paginated_by_cursor_without_count(self):
+        response = self.client.get('/api/users/')
+        self.assertNotIn('count', response.json())
+        users = self.collect('/api/users/', 1, page_size=7)
+        self.assertEqual([user.id for user in reversed(self.users)], [user['id'] for user in users])
+
+    def test_page_size_is_limited(self):
+        response = self.client.get('/api/tracks/', {'page_size': 1000})
+        self.assertEqual(25, len(response.json()['results']))
+        response = self.client.get('/api/users/', {'page_size': 1000})
+        self.assertEqual(30, len(response.json()['results']))
+
+    def test_sparse_fields(self):
+        response = self.client.get('/api/playlists/', {'fields': 'id,name'})
+        self.assertEqual([{'id': self.playlist.id, 'name': 'Playlist'}], response.json()['results'])
+        response = self.client.get('/api/playlists/{}/'.format(self.playlist.id), {'fields': 'creator,tracks_count'})
+        self.assertEqual({'creator', 'tracks_count'}, set(response.json()))
+        self.assertEqual(25, response.json()['tracks_count'])
+        self.assertEqual('api0', response.json()['creator']['username'])
+
+    def test_tracks_load_only_requested_relations(self):
+        with self.assertNumQueries(2):
+            tracks = self.client.get('/api/tracks/').json()['results']
+        self.assertEqual(['Rock'], tracks[0]['genres'])
+        self.assertEqual('Artist', tracks[0]['author']['name'])
+        with self.assertNumQueries(1):
+            tracks = self.client.get('/api/tracks/', {'fields': 'id,name'}).json()['results']
+        self.assertEqual({'id', 'name'}, set(tracks[0]))
+
+    def test_followers(self):
+        followers = self.collect('/api/users/{}/followers/'.format(self.me.id), 2, page_size=10)
+        self.assertEqual([user.id for user in reversed(self.users[1:])], [user['id'] for user in followers])
+        response = self.client.get('/api/users/{}/following/'.format(self.users[1].id))
+        self.assertEqual([self.me.id], [user['id'] for user in response.json()['results']])
+
+    def test_playlist_tracks_and_comments(self):
+        tracks = self.collect('/api/playlists/{}/tracks/'.format(self.playlist.id), 3, page_size=10)
+        self.assertEqual([track.id for track in self.tracks], [track['id'] for track in tracks])
+        comments = self.collect('/api/playlists/{}/comments/'.format(self.playlist.id), 2, page_size=10)
+        self.assertEqual(25, len(comments))
+        self.assertEqual(25, len(self.collect('/api/comments/', 1, playlist=self.playlist.id)))
+        response = self.client.get('/api/playlists/0/tracks/')
+        self.assertEqual(404, response.status_code)
+        response = self.client.get('/api/comments/', {'playlist': 'abc'})
+        self.assertEqual(400, response.status_code)
+        self.assertIn('playlist', response.json())
+
+    def test_recommendations_are_private(self):
+        url = '/api/users/{}/recommendations/'.format(self.me.id)
+        self.assertIn(self.client.get(url).status_code, [401, 403])
+        self.client.force_login(self.users[2])
+        self.assertEqual(403, self.client.get(url).status_code)
+        self.client.force_login(self.me)
+        results = self.client.get(url).json()['results']
+        self.assertEqual([self.users[1].id], [result['candidate']['id'] for result in results])
@@ -0,0 +1,13 @@
+from rest_framework.routers import DefaultRouter
+
+from . import views
+
+
+router = DefaultRouter()
+router.register('users', views.UserViewSet)
+router.register('playlists', views.PlaylistViewSet, basename='playlists')
+router.register('tracks', views.TrackViewSet, basename='tracks')
+router.register('artists', views.ArtistViewSet)
+router.register('comments', views.CommentViewSet, basename='comments')
+
+urlpatterns = router.urls
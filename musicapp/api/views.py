@@ -0,0 +1,113 @@
+from django.db.models import Prefetch
+from django.shortcuts import get_object_or_404
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
+
+from app.models import Artists, Comments, CustomUser, Genres, Playlists, PlaylistHasTracks, Tracks
+
+from .serializers import (
+    ArtistSerializer, CommentSerializer, PlaylistSerializer, RecommendationSerializer, TrackSerializer, UserSerializer,
+    requested_fields
+)
+
+Following = CustomUser.following.through
+
+
+def tracks_queryset(request, queryset=None):
+    """Function returns tracks with related rows joined or prefetched only when they are requested."""
+    fields = requested_fields(request)
+    queryset = Tracks.objects.all() if queryset is None else queryset
+    related = [name for name in ['album', 'author'] if fields is None or name in fields]
+    if related:
+        queryset = queryset.select_related(*related)
+    if fields is None or 'genres' in fields:
+        queryset = queryset.prefetch_related(Prefetch('genres', queryset=Genres.objects.only('id', 'name')))
+    return queryset
+
+
+class PagedActionMixin:
+    """Viewset mixin rendering one cursor page of related rows in detail actions."""
+    def paged_response(self, queryset, serializer_class, ordering, attr=None):
+        self.ordering = ordering
+        rows = self.paginate_queryset(queryset)
+        items = [getattr(row, attr) for row in rows] if attr else rows
+        serializer = serializer_class(items, many=True, context=self.get_serializer_context())
+        return self.get_paginated_response(serializer.data)
+
+
+class UserViewSet(PagedActionMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = CustomUser.objects.filter(is_active=True)
+    serializer_class = UserSerializer
+
+    @action(detail=True)
+    def followers(self, request, pk=None):
+        user = self.get_object()
+        queryset = Following.objects.filter(to_customuser=user).select_related('from_customuser')
+        return self.paged_response(queryset, UserSerializer, '-id', 'from_customuser')
+
+    @action(detail=True)
+    def following(self, request, pk=None):
+        user = self.get_object()
+        queryset = Following.objects.filter(from_customuser=user).select_related('to_customuser')
+        return self.paged_response(queryset, UserSerializer, '-id', 'to_customuser')
+
+    @action(detail=True)
+    def recommendations(self, request, pk=None):
+        user = self.get_object()
+        if request.user != user and not request.user.is_staff:
+            raise PermissionDenied
+        queryset = user.recommendations.select_related('candidate')
+        return self.paged_response(queryset, RecommendationSerializer, ('-score', 'candidate_id'))
+
+
+class PlaylistViewSet(PagedActionMixin, viewsets.ReadOnlyModelViewSet):
+    serializer_class = PlaylistSerializer
+
+    def get_queryset(self):
+        fields = requested_fields(self.request)
+        queryset = Playlists.objects.all()
+        if fields is None or 'creator' in fields:
+            queryset = queryset.select_related('creator')
+        return queryset
+
+    @action(detail=True)
+    def tracks(self, request, pk=None):
+        get_object_or_404(Playlists, pk=pk)
+        rows = PlaylistHasTracks.objects.filter(playlists_id=pk)
+        queryset = rows.select_related(*['tracks__' + name for name in ['album', 'author']])
+        queryset = queryset.prefetch_related(Prefetch('tracks__genres', queryset=Genres.objects.only('id', 'name')))
+        return self.paged_response(queryset, TrackSerializer, ('position', 'id'), 'tracks')
+
+    @action(detail=True)
+    def comments(self, request, pk=None):
+        get_object_or_404(Playlists, pk=pk)
+        queryset = Comments.objects.filter(playlist_id=pk).select_related('author')
+        return self.paged_response(queryset, CommentSerializer, ('created_at', 'id'))
+
+
+class TrackViewSet(viewsets.ReadOnlyModelViewSet):
+    serializer_class = TrackSerializer
+
+    def get_queryset(self):
+        return tracks_queryset(self.request)
+
+
+class ArtistViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = Artists.objects.all()
+    serializer_class = ArtistSerializer
+
+
+class CommentViewSet(viewsets.ReadOnlyModelViewSet):
+    serializer_class = CommentSerializer
+    ordering = ('-created_at', '-id')
+
+    def get_queryset(self):
+        queryset = Comments.objects.select_related('author')
+        playlist = self.request.query_params.get('playlist')
+        if playlist is not None:
+            try:
+                queryset = queryset.filter(playlist_id=int(playlist))
+            except ValueError:
+                raise ValidationError({'playlist': 'A valid integer is required.'})
+        return queryset
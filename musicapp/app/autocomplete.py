@@ -0,0 +1,196 @@
+import heapq
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import connection
+
+from .models import Artists, CustomUser, Tracks
+from .search_index import tokenize
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'REFRESH_INTERVAL': 5,
+    'REBUILD_INTERVAL': 600,
+    'CACHE_SIZE': 1024,
+}
+
+INDEXES = ['tracks', 'artists', 'users']
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_config():
+    """Function returns autocomplete settings merged with defaults."""
+    return {**DEFAULTS, **getattr(settings, 'AUTOCOMPLETE', {})}
+
+
+class PrefixIndex:
+    """Class keeps sorted array of name keys for bisect prefix lookups.
+
+    Every word start of a name is a key, so "park" completes "Linkin Park".
+    New rows are merged in by primary key watermark, whole array is rebuilt
+    every REBUILD_INTERVAL to drop renamed and deleted rows. Rebuild runs in
+    background thread and swaps new array in, lookups use the old one meanwhile.
+    Results of hot prefixes are kept in LRU cache until the array changes.
+    """
+    def __init__(self, model, name_field, fields, to_suggestion):
+        self.model = model
+        self.name_field = name_field
+        self.fields = fields
+        self.to_suggestion = to_suggestion
+        self.items = []
+        self.keys = []
+        self.watermark = 0
+        self.refreshed_at = None
+        self.rebuilt_at = None
+        self.rebuilding = False
+        self.cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    def refresh(self):
+        config = get_config()
+        now = time.monotonic()
+        if self.rebuilt_at is None:
+            if not self.rebuilding:
+                # Index was not warmed up, so the first lookup builds it.
+                with self._load_lock:
+                    if self.rebuilt_at is None:
+                        self._rebuild()
+            return
+        if now - self.rebuilt_at >= config['REBUILD_INTERVAL']:
+            self.rebuild_in_background()
+        if self.refreshed_at is not None and now - self.refreshed_at < config['REFRESH_INTERVAL']:
+            return
+        # Lookups don't wait for rows loaded by other thread, they use current array.
+        if not self._load_lock.acquire(blocking=False):
+            return
+        try:
+            new_items, watermark = self._load(self.watermark)
+            with self._lock:
+                if new_items:
+                    self.items = list(heapq.merge(self.items, new_items, key=lambda item: item[:3]))
+                    self.keys = [item[0] for item in self.items]
+                    self.cache.clear()
+                self.watermark = watermark
+                self.refreshed_at = now
+        finally:
+            self._load_lock.release()
+
+    def rebuild_in_background(self):
+        """Method rebuilds whole array in background thread unless it is already rebuilt."""
+        with self._lock:
+            if self.rebuilding:
+                return
+            self.rebuilding = True
+
+        def rebuild():
+            try:
+                with self._load_lock:
+                    self._rebuild()
+            except Exception:
+                logger.exception('Autocomplete index of %s failed to rebuild', self.model.__name__)
+            finally:
+                self.rebuilding = False
+                connection.close()
+
+        threading.Thread(target=rebuild, name='autocomplete', daemon=True).start()
+
+    def _rebuild(self):
+        now = time.monotonic()
+        items, watermark = self._load(0)
+        keys = [item[0] for item in items]
+        with self._lock:
+            self.items, self.keys, self.watermark = items, keys, watermark
+            self.cache.clear()
+            self.refreshed_at = self.rebuilt_at = now
+
+    def _load(self, watermark):
+        """Method returns sorted items of rows created after watermark and new watermark."""
+        rows = self.model.objects.filter(pk__gt=watermark).order_by('pk').values_list(
+            'pk', self.name_field, *self.fields
+        )
+        items = []
+        for row in rows.iterator(chunk_size=2000):
+            words = tokenize(row[1])
+            suggestion = self.to_suggestion(row)
+            for position in range(len(words)):
+                items.append((' '.join(words[position:]), position, row[0], suggestion))
+            watermark = row[0]
+        items.sort(key=lambda item: item[:3])
+        return items, watermark
+
+    def complete(self, prefix, limit=5):
+        """Method returns up to `limit` suggestions whose name has word starting with prefix."""
+        self.refresh()
+        prefix = ' '.join(tokenize(prefix))
+        if not prefix:
+            return []
+        with self._lock:
+            cached = self.cache.get((prefix, limit))
+            if cached is not None:
+                self.cache.move_to_end((prefix, limit))
+                return cached
+            matches = {}
+            position = bisect_left(self.keys, prefix)
+            while position < len(self.keys) and self.keys[position].startswith(prefix):
+                key, word_position, pk, suggestion = self.items[position]
+                rank = (word_position > 0, len(key))
+                if pk not in matches or rank < matches[pk][0]:
+                    matches[pk] = (rank, suggestion)
+                position += 1
+                if len(matches) >= limit * 5:
+                    break
+            result = [suggestion for _, suggestion in sorted(matches.values(), key=lambda match: match[0])[:limit]]
+            self.cache[(prefix, limit)] = result
+            if len(self.cache) > get_config()['CACHE_SIZE']:
+                self.cache.popitem(last=False)
+            return result
+
+
+def get_index(name):
+    """Function returns process-wide prefix index of 'tracks', 'artists' or 'users'."""
+    if name not in _indexes:
+        with _indexes_lock:
+            if name == 'tracks':
+                _indexes.setdefault(name, PrefixIndex(
+                    Tracks, 'name', ('id_musixmatch', 'author__name'),
+                    lambda row: {'id_musixmatch': row[2], 'name': row[1], 'artist': row[3]}
+                ))
+            elif name == 'artists':
+                _indexes.setdefault(name, PrefixIndex(
+                    Artists, 'name', ('id_musixmatch',),
+                    lambda row: {'id_musixmatch': row[2], 'name': row[1]}
+                ))
+            elif name == 'users':
+                _indexes.setdefault(name, PrefixIndex(
+                    CustomUser, 'username', (),
+                    lambda row: {'id': row[0], 'username': row[1]}
+                ))
+            else:
+                raise KeyError(name)
+    return _indexes[name]
+
+
+def warm_up():
+    """Function builds every index in background, so first lookups of worker don't wait for it."""
+    for name in INDEXES:
+        get_index(name).rebuild_in_background()
+
+
+def complete(prefix, limit=5):
+    """Function returns suggestions of every kind for prefix."""
+    return {name: get_index(name).complete(prefix, limit) for name in INDEXES}
+
+
+def reset():
+    """Function drops built indexes."""
+    with _indexes_lock:
+        _indexes.clear()
@@ -0,0 +1,199 @@
+from django.db import transaction
+from django.db.models import Max
+
+from . import feed, ingestion
+from .counters import increment, increment_many, touch
+from .models import Activities, CustomUser, Playlists, PlaylistHasTracks, Tracks, UserHasPlaylists, UserHasTracks
+
+
+# Outcomes of items
+ADDED = 'added'
+REMOVED = 'removed'
+MOVED = 'moved'
+EXISTS = 'exists'
+MISSING = 'missing'
+NOT_FOUND = 'not_found'
+
+
+def resolve_tracks(ids):
+    """Function returns pks of tracks by MusixMatch ids, waiting once for ingestion of unknown ones."""
+    tracks = dict(Tracks.objects.filter(id_musixmatch__in=ids).values_list('id_musixmatch', 'id'))
+    unknown = [track_id for track_id in ids if track_id not in tracks]
+    if unknown:
+        # Tracks found by search could still wait in ingestion queue.
+        ingestion.flush()
+        tracks.update(Tracks.objects.filter(id_musixmatch__in=unknown).values_list('id_musixmatch', 'id'))
+    return tracks
+
+
+def resolve_playlists(ids):
+    """Function returns pks of existing playlists by their ids."""
+    return {pk: pk for pk in Playlists.objects.filter(pk__in=ids).values_list('pk', flat=True)}
+
+
+def outcomes(ids, resolved, changed, outcome, otherwise):
+    """Function returns list of outcomes in order of ids."""
+    results = []
+    for item_id in ids:
+        if item_id not in resolved:
+            result = NOT_FOUND
+        else:
+            result = outcome if resolved[item_id] in changed else otherwise
+        results.append({'id': item_id, 'result': result})
+    return results
+
+
+def lock(model, pk):
+    """Function locks row till the end of transaction, so concurrent batches of one owner don't interleave."""
+    list(model.objects.select_for_update().filter(pk=pk).values_list('pk', flat=True))
+
+
+def inserted(rows, field, existing):
+    """Function returns `field` values of rows absent from `existing`.
+
+    Rows are read with lock, so rows committed meanwhile are seen as well.
+    """
+    return [pk for pk in rows.select_for_update().values_list(field, flat=True) if pk not in existing]
+
+
+def add_tracks(user, ids):
+    """Function adds tracks with given MusixMatch ids to library of user."""
+    tracks = resolve_tracks(ids)
+    with transaction.atomic():
+        lock(CustomUser, user.pk)
+        existing = set(
+            UserHasTracks.objects.filter(user=user, track_id__in=tracks.values()).values_list('track_id', flat=True)
+        )
+        added = [pk for pk in tracks.values() if pk not in existing]
+        if added:
+            # Row added meanwhile by single add is skipped instead of failing the batch.
+            UserHasTracks.objects.bulk_create(
+                [UserHasTracks(user=user, track_id=pk) for pk in added], ignore_conflicts=True
+            )
+            added = inserted(UserHasTracks.objects.filter(user=user, track_id__in=added), 'track_id', existing)
+            increment(CustomUser, user.pk, tracks_count=len(added))
+            feed.record_many(user, Activities.TRACK_ADDED, 'track', added)
+    return outcomes(ids, tracks, set(added), ADDED, EXISTS)
+
+
+def remove_tracks(user, ids):
+    """Function removes tracks with given MusixMatch ids from library of user."""
+    tracks = resolve_tracks(ids)
+    with transaction.atomic():
+        lock(CustomUser, user.pk)
+        rows = UserHasTracks.objects.filter(user=user, track_id__in=tracks.values())
+        removed = set(rows.values_list('track_id', flat=True))
+        if removed:
+            rows.delete()
+            increment(CustomUser, user.pk, tracks_count=-len(removed))
+    return outcomes(ids, tracks, removed, REMOVED, MISSING)
+
+
+def add_playlists(user, ids):
+    """Function adds playlists to liked playlists of user."""
+    playlists = resolve_playlists(ids)
+    with transaction.atomic():
+        lock(CustomUser, user.pk)
+        existing = set(
+            UserHasPlaylists.objects.filter(user=user, playlist_id__in=playlists).values_list('playlist_id', flat=True)
+        )
+        added = [pk for pk in playlists if pk not in existing]
+        if added:
+            UserHasPlaylists.objects.bulk_create(
+                [UserHasPlaylists(user=user, playlist_id=pk) for pk in added], ignore_conflicts=True
+            )
+            added = inserted(UserHasPlaylists.objects.filter(user=user, playlist_id__in=added), 'playlist_id', existing)
+            increment_many(Playlists, added, adds_count=1)
+            touch(CustomUser, [user.pk])
+            feed.record_many(user, Activities.PLAYLIST_ADDED, 'playlist', added)
+    return outcomes(ids, playlists, set(added), ADDED, EXISTS)
+
+
+def remove_playlists(user, ids):
+    """Function removes playlists from liked playlists of user. Own playlists are never deleted here."""
+    playlists = resolve_playlists(ids)
+    with transaction.atomic():
+        lock(CustomUser, user.pk)
+        rows = UserHasPlaylists.objects.filter(user=user, playlist_id__in=playlists)
+        removed = set(rows.values_list('playlist_id', flat=True))
+        if removed:
+            rows.delete()
+            increment_many(Playlists, removed, adds_count=-1)
+            touch(CustomUser, [user.pk])
+    return outcomes(ids, playlists, removed, REMOVED, MISSING)
+
+
+def add_playlist_tracks(playlist, ids):
+    """Function appends tracks with given MusixMatch ids to the end of playlist in order of ids."""
+    tracks = resolve_tracks(ids)
+    with transaction.atomic():
+        lock(Playlists, playlist.pk)
+        rows = PlaylistHasTracks.objects.filter(playlists=playlist)
+        existing = set(rows.filter(tracks_id__in=tracks.values()).values_list('tracks_id', flat=True))
+        added = [tracks[track_id] for track_id in ids if track_id in tracks and tracks[track_id] not in existing]
+        if added:
+            last = rows.aggregate(last=Max('position'))['last']
+            start = 0 if last is None else last + 1
+            PlaylistHasTracks.objects.bulk_create([
+                PlaylistHasTracks(playlists=playlist, tracks_id=pk, position=position)
+                for position, pk in enumerate(added, start)
+            ])
+            increment(Playlists, playlist.pk, tracks_count=len(added))
+    return outcomes(ids, tracks, set(added), ADDED, EXISTS)
+
+
+def remove_playlist_tracks(playlist, ids):
+    """Function removes tracks with given MusixMatch ids from playlist."""
+    tracks = resolve_tracks(ids)
+    with transaction.atomic():
+        lock(Playlists, playlist.pk)
+        rows = PlaylistHasTracks.objects.filter(playlists=playlist, tracks_id__in=tracks.values())
+        removed = set(rows.values_list('tracks_id', flat=True))
+        if removed:
+            rows.delete()
+            increment(Playlists, playlist.pk, tracks_count=-len(removed))
+    return outcomes(ids, tracks, removed, REMOVED, MISSING)
+
+
+def reorder_playlist_tracks(playlist, ids):
+    """Function moves tracks with given MusixMatch ids to the start of playlist in order of ids.
+
+    The rest keep their order after them. Only rows with changed position are updated, in one query.
+    """
+    with transaction.atomic():
+        lock(Playlists, playlist.pk)
+        rows = list(
+            PlaylistHasTracks.objects
+            .filter(playlists=playlist)
+            .order_by('position', 'id')
+            .values_list('id', 'position', 'tracks__id_musixmatch')
+        )
+        by_track = {row[2]: row for row in rows}
+        first = [by_track[track_id] for track_id in ids if track_id in by_track]
+        moved = {row[0] for row in first}
+        order = first + [row for row in rows if row[0] not in moved]
+        changed = [
+            PlaylistHasTracks(id=row_id, position=position)
+            for position, (row_id, old_position, _) in enumerate(order)
+            if position != old_position
+        ]
+        if changed:
+            PlaylistHasTracks.objects.bulk_update(changed, ['position'], batch_size=500)
+            touch(Playlists, [playlist.pk])
+    return [{'id': track_id, 'result': MOVED if track_id in by_track else NOT_FOUND} for track_id in ids]
+
+
+# (content, action): function changing library of user
+LIBRARY_ACTIONS = {
+    ('track', 'add'): add_tracks,
+    ('track', 'remove'): remove_tracks,
+    ('playlist', 'add'): add_playlists,
+    ('playlist', 'remove'): remove_playlists,
+}
+
+# action: function changing tracks of playlist
+PLAYLIST_ACTIONS = {
+    'add': add_playlist_tracks,
+    'remove': remove_playlist_tracks,
+    'reorder': reorder_playlist_tracks,
+}
@@ -0,0 +1,10 @@
+from .suite import SCENARIOS, compare, dump, load, run, seed
+
+__all__ = [
+    'SCENARIOS',
+    'compare',
+    'dump',
+    'load',
+    'run',
+    'seed',
+]
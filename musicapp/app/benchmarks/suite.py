@@ -0,0 +1,218 @@
+import json
+import statistics
+import time
+import tracemalloc
+
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from .. import counters, recommendations, search_index
+from ..models import (
+    Activities, Albums, Artists, Comments, CustomUser, FeedItems, Playlists, PlaylistHasTracks, Tracks,
+    UserHasPlaylists, UserHasTracks, UsernameTrigrams, trigrams
+)
+from ..musixmatch.stub import StubServer
+
+
+# Rows created per unit of scale.
+SIZES = {
+    'users': 2000,
+    'tracks': 5000,
+    'user_tracks': 2000,
+    'created_playlists': 200,
+    'liked_playlists': 500,
+    'playlist_tracks': 2000,
+    'comments': 2000,
+    'follows_per_user': 10,
+    'activities': 2000,
+}
+
+
+class Dataset:
+    """Synthetic data shared by scenarios: `me` with large profile and `playlist` with large content."""
+    def __init__(self, me, viewer, playlist, track):
+        self.me = me
+        self.viewer = viewer
+        self.playlist = playlist
+        self.track = track
+
+
+def sizes(scale):
+    return {name: max(2, int(size * scale)) for name, size in SIZES.items()}
+
+
+def seed(scale=1):
+    """Function fills database with synthetic users, follows, tracks, playlists and comments."""
+    size = sizes(scale)
+    CustomUser.objects.bulk_create([
+        CustomUser(username='bench{}'.format(i), email='bench{}@bench.test'.format(i))
+        for i in range(size['users'])
+    ])
+    users = list(CustomUser.objects.filter(username__startswith='bench').order_by('id'))
+    me, viewer, others = users[0], users[1], users[1:]
+    UsernameTrigrams.objects.bulk_create([
+        UsernameTrigrams(user=user, trigram=trigram) for user in users for trigram in trigrams(user.username)
+    ])
+
+    Following = CustomUser.following.through
+    follows = {(me.id, other.id) for other in others} | {(other.id, me.id) for other in others}
+    for index, user in enumerate(others):
+        for step in range(1, size['follows_per_user'] + 1):
+            follows.add((user.id, others[(index + step * 7) % len(others)].id))
+    Following.objects.bulk_create([
+        Following(from_customuser_id=source, to_customuser_id=target)
+        for source, target in follows if source != target
+    ])
+
+    artist = Artists.objects.create(id_musixmatch=-1, name='Bench Artist')
+    album = Albums.objects.create(id_musixmatch=-1, name='Bench Album')
+    Tracks.objects.bulk_create([
+        Tracks(id_musixmatch=-i - 1, name='Bench track {}'.format(i), album=album, author=artist)
+        for i in range(size['tracks'])
+    ])
+    tracks = list(Tracks.objects.filter(id_musixmatch__lt=0).order_by('id'))
+    UserHasTracks.objects.bulk_create([UserHasTracks(user=me, track=track) for track in tracks[:size['user_tracks']]])
+
+    Playlists.objects.bulk_create([
+        Playlists(name='Bench playlist {}'.format(i), creator=users[i % len(users)])
+        for i in range(size['created_playlists'] + size['liked_playlists'])
+    ])
+    playlists = list(Playlists.objects.filter(name__startswith='Bench playlist').order_by('id'))
+    Playlists.objects.filter(id__in=[p.id for p in playlists[:size['created_playlists']]]).update(creator=me)
+    UserHasPlaylists.objects.bulk_create([
+        UserHasPlaylists(user=me, playlist=playlist) for playlist in playlists[size['created_playlists']:]
+    ])
+    playlist = playlists[0]
+    PlaylistHasTracks.objects.bulk_create([
+        PlaylistHasTracks(playlists=playlist, tracks=track, position=position)
+        for position, track in enumerate(tracks[:size['playlist_tracks']])
+    ])
+    Comments.objects.bulk_create([
+        Comments(message='Bench comment {}'.format(i), author=users[i % len(users)], playlist=playlist)
+        for i in range(size['comments'])
+    ])
+
+    Activities.objects.bulk_create([
+        Activities(actor=users[i % 2 * 2], verb=Activities.TRACK_ADDED, track=tracks[i % len(tracks)])
+        for i in range(size['activities'])
+    ])
+    # Activities of `me` are read by followers, the rest are pushed to feed of `viewer`.
+    FeedItems.objects.bulk_create([
+        FeedItems(owner=viewer, activity=activity) for activity in Activities.objects.exclude(actor=me)
+    ])
+
+    counters.reconcile(CustomUser)
+    counters.reconcile(Playlists)
+    recommendations.rebuild([me.id, viewer.id])
+    return Dataset(me, viewer, playlist, tracks[-1])
+
+
+def _get(url, user=None, **params):
+    def scenario(client, data):
+        return client.get(url(data), params)
+    scenario.user = user
+    return scenario
+
+
+def _content_manager(client, data):
+    params = {'content': 'track', 'pk': data.track.id_musixmatch, 'next': reverse('profile')}
+    client.post(reverse('manager'), {**params, 'add': ''})
+    return client.post(reverse('manager'), {**params, 'delete': ''})
+
+
+_content_manager.user = 'me'
+
+# name: function making requests of one iteration with client logged in as its `user`
+SCENARIOS = {
+    'profile': _get(lambda data: reverse('profile'), user='me'),
+    'user_profile': _get(lambda data: reverse('user', kwargs={'pk': data.me.pk}), user='viewer'),
+    'playlist': _get(lambda data: reverse('playlist', kwargs={'pk': data.playlist.pk}), user='me'),
+    'recommendations': _get(lambda data: reverse('recommendations'), user='me'),
+    'feed': _get(lambda data: reverse('feed'), user='viewer'),
+    'search': _get(lambda data: reverse('search'), user='me', query='bench'),
+    'content_manager': _content_manager,
+}
+
+
+def measure(scenario, client, data, repeat=5):
+    """Function returns median wall time, query count and peak traced memory of scenario."""
+    scenario(client, data)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = scenario(client, data)
+        timings.append(time.perf_counter() - started)
+    if response.status_code >= 400:
+        raise AssertionError('Scenario responded with {}'.format(response.status_code))
+    queries = []
+    with connection.execute_wrapper(lambda execute, sql, *args: queries.append(sql) or execute(sql, *args)):
+        scenario(client, data)
+    tracemalloc.start()
+    try:
+        scenario(client, data)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        'wall_ms': round(statistics.median(timings) * 1000, 2),
+        'queries': len(queries),
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def run(scale=1, repeat=5, names=None):
+    """Function seeds synthetic data and measures scenarios against local MusixMatch stub.
+
+    Search ingests every response synchronously and skips local index, so each
+    run measures the full upstream path. Page cache is disabled, so pages are
+    measured as rendered on the first view and after every change.
+    """
+    data = seed(scale)
+    results = {}
+    with StubServer() as server, override_settings(
+        MUSIXMATCH={'BASE_URL': server.url, 'RETRIES': 0},
+        INGESTION={'BACKEND': 'sync'},
+        SEARCH_INDEX={'ENABLED': False},
+        PAGE_CACHE={'ENABLED': False},
+    ):
+        search_index.reset()
+        for name in names or SCENARIOS:
+            scenario = SCENARIOS[name]
+            client = Client()
+            client.force_login(getattr(data, scenario.user))
+            results[name] = measure(scenario, client, data, repeat)
+    return {'scale': scale, 'results': results}
+
+
+def compare(report, baseline, time_tolerance=0.5, memory_tolerance=0.25):
+    """Function returns descriptions of budgets exceeded by report compared to baseline.
+
+    Query counts may not grow at all, time and memory may grow by given share.
+    """
+    if report['scale'] != baseline['scale']:
+        raise ValueError('Baseline is measured at scale {}, not {}'.format(baseline['scale'], report['scale']))
+    budgets = {'queries': 0, 'wall_ms': time_tolerance, 'peak_kb': memory_tolerance}
+    regressions = []
+    for name, result in report['results'].items():
+        expected = baseline['results'].get(name)
+        if expected is None:
+            continue
+        for metric, tolerance in budgets.items():
+            limit = expected[metric] * (1 + tolerance)
+            if result[metric] > limit:
+                regressions.append('{}: {} {} exceeds budget {:g} (baseline {})'.format(
+                    name, metric, result[metric], limit, expected[metric]
+                ))
+    return regressions
+
+
+def load(path):
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def dump(report, path):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2, sort_keys=True)
+        file.write('\n')
@@ -0,0 +1,49 @@
+from django.db import transaction
+from django.db.models import Subquery
+
+from .ingestion import ingest
+from .mixins import APIDataMixins
+from .models import Artists, ChartEntries, ChartSnapshots, Tracks
+from .musixmatch import get_client
+
+
+# kind: (API method, params)
+CHARTS = {
+    ChartSnapshots.TRACKS: ('chart.tracks.get', {'chart_name': 'mxmweekly', 'page': 1, 'page_size': 6}),
+    ChartSnapshots.ARTISTS: ('chart.artists.get', {'page': 1, 'page_size': 7}),
+}
+
+
+def refresh(kind):
+    """Function fetches chart from API, saves its content and new snapshot. Returns the snapshot.
+
+    Raises ValueError if API answered with error or empty chart, the previous snapshot stays the latest.
+    """
+    method, params = CHARTS[kind]
+    response = APIDataMixins(get_client().refresh(method, **params))
+    data = response.get_data()
+    if not data:
+        raise ValueError('API answered with status {} and no chart entries'.format(response.header.get('status_code')))
+    model, key = (Tracks, 'track') if kind == ChartSnapshots.TRACKS else (Artists, 'artist')
+    with transaction.atomic():
+        ingest(data)
+        ids = [row[key]['id_musixmatch'] for row in data]
+        pks = dict(model.objects.filter(id_musixmatch__in=ids).values_list('id_musixmatch', 'id'))
+        snapshot = ChartSnapshots.objects.create(kind=kind, chart_name=params.get('chart_name', ''))
+        ChartEntries.objects.bulk_create([
+            ChartEntries(snapshot=snapshot, rank=rank, **{key + '_id': pks[id_musixmatch]})
+            for rank, id_musixmatch in enumerate(ids, 1)
+        ])
+    return snapshot
+
+
+def latest_entries(kind):
+    """Function returns entries of the latest snapshot of kind in one query."""
+    latest = ChartSnapshots.objects.filter(kind=kind).order_by('-created_at', '-id').values('id')[:1]
+    related = 'track__author' if kind == ChartSnapshots.TRACKS else 'artist'
+    return list(
+        ChartEntries.objects
+        .filter(snapshot_id=Subquery(latest))
+        .select_related('snapshot', related)
+        .order_by('rank')
+    )
@@ -0,0 +1,77 @@
+import functools
+import hashlib
+
+from django.contrib import messages
+from django.db.models import OuterRef, Subquery
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+from .models import Comments, CustomUser, Playlists, UserHasPlaylists, UserHasTracks
+
+
+def _latest(queryset, field):
+    return Subquery(queryset.order_by('-' + field).values(field)[:1])
+
+
+def playlist_validators(request, pk):
+    """Function returns time of the last change and state of playlist page data, None if it doesn't exist."""
+    row = Playlists.objects.filter(pk=pk).values(
+        'updated_at', 'adds_count', 'comments_count', 'tracks_count',
+        last_comment=_latest(Comments.objects.filter(playlist=OuterRef('pk')), 'created_at'),
+    ).first()
+    if row is None:
+        return None
+    return max(filter(None, [row['updated_at'], row['last_comment']])), row
+
+
+def profile_validators(request, pk):
+    """Function returns time of the last change and state of profile page data, None if user doesn't exist."""
+    row = CustomUser.objects.filter(pk=pk).values(
+        'content_updated_at', 'followers_count', 'following_count', 'tracks_count',
+        last_track=_latest(UserHasTracks.objects.filter(user=OuterRef('pk')), 'added_at'),
+        last_playlist=_latest(UserHasPlaylists.objects.filter(user=OuterRef('pk')), 'added_at'),
+    ).first()
+    if row is None:
+        return None
+    return max(filter(None, [row['content_updated_at'], row['last_track'], row['last_playlist']])), row
+
+
+def make_etag(request, state):
+    """Function returns ETag of page state as seen by the current visitor.
+
+    Page differs by viewer and embeds CSRF token, so both are part of the tag.
+    """
+    key = repr([request.user.pk, request.META.get('CSRF_COOKIE'), sorted(state.items())])
+    return '"{}"'.format(hashlib.md5(key.encode()).hexdigest())
+
+
+def conditional_page(validators):
+    """Decorator answering GET of page with 304 before rendering when `validators` report no changes.
+
+    Pages showing pending messages are always rendered and get no validators,
+    so messages are neither lost nor replayed from browser cache.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or len(messages.get_messages(request)):
+                response = view(request, *args, **kwargs)
+                patch_cache_control(response, private=True, no_cache=True)
+                return response
+            validated = validators(request, *args, **kwargs)
+            if validated is None:
+                return view(request, *args, **kwargs)
+            last_modified, state = validated
+            last_modified = int(last_modified.timestamp())
+            response = get_conditional_response(request, make_etag(request, state), last_modified)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                # Rendering could issue new CSRF token, so tag is computed again.
+                response['ETag'] = make_etag(request, state)
+                response['Last-Modified'] = http_date(last_modified)
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ['Cookie'])
+            return response
+        return wrapper
+    return decorator
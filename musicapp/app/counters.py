@@ -0,0 +1,87 @@
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import page_cache
+
+from .models import Comments, CustomUser, Playlists, PlaylistHasTracks, UserHasPlaylists, UserHasTracks
+
+Following = CustomUser.following.through
+
+# model: {counter field: (model of counted rows, field pointing to counter owner)}
+COUNTERS = {
+    CustomUser: {
+        'followers_count': (Following, 'to_customuser'),
+        'following_count': (Following, 'from_customuser'),
+        'tracks_count': (UserHasTracks, 'user'),
+    },
+    Playlists: {
+        'adds_count': (UserHasPlaylists, 'playlist'),
+        'comments_count': (Comments, 'playlist'),
+        'tracks_count': (PlaylistHasTracks, 'playlists'),
+    },
+}
+
+# model: field holding time of the last change of its content, validator of conditional requests
+CHANGED_AT = {
+    CustomUser: 'content_updated_at',
+    Playlists: 'updated_at',
+}
+
+
+def count_of(model, field):
+    """Function returns subquery counting `model` rows which `field` points to outer row."""
+    counts = (
+        model.objects
+        .filter(**{field: OuterRef('pk')})
+        .order_by()
+        .values(field)
+        .annotate(count=Count('*'))
+        .values('count')
+    )
+    return Coalesce(Subquery(counts), 0)
+
+
+def increment(model, pk, **deltas):
+    """Function atomically adds deltas to counters of row with given pk and marks the row changed.
+
+    Change time is the validator of conditional requests, cached content of the row is invalidated.
+    """
+    return increment_many(model, [pk], **deltas)
+
+
+def increment_many(model, pks, **deltas):
+    """Function adds the same deltas to counters of every row with given pks in one query, like `increment`."""
+    values = {name: F(name) + delta for name, delta in deltas.items()}
+    page_cache.bump(model, pks)
+    return model.objects.filter(pk__in=pks).update(**values, **{CHANGED_AT[model]: timezone.now()})
+
+
+def touch(model, pks):
+    """Function marks content of rows with given pks changed, same as `increment`."""
+    pks = list(pks)
+    page_cache.bump(model, pks)
+    return model.objects.filter(pk__in=pks).update(**{CHANGED_AT[model]: timezone.now()})
+
+
+def reconcile(model, ids=None, batch_size=1000):
+    """Function recomputes counters of model rows with one UPDATE per batch. Returns number of rows.
+
+    Cached content of the rows is invalidated as it could show wrong counts.
+    """
+    values = {name: count_of(*source) for name, source in COUNTERS[model].items()}
+    if ids is not None:
+        with transaction.atomic():
+            page_cache.bump(model, ids)
+            return model.objects.filter(pk__in=ids).update(**values)
+    updated = 0
+    last_pk = 0
+    while True:
+        pks = list(model.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return updated
+        with transaction.atomic():
+            page_cache.bump(model, pks)
+            updated += model.objects.filter(pk__gte=pks[0], pk__lte=pks[-1]).update(**values)
+        last_pk = pks[-1]
@@ -0,0 +1,112 @@
+from django.conf import settings
+from django.core.exceptions import BadRequest
+from django.db import transaction
+
+from .models import Activities, CustomUser, FeedItems
+from .pagination import Page, decode_cursor, encode_cursor
+
+
+DEFAULTS = {
+    # Activities of users with this many followers are read from them instead of pushed to every follower.
+    'CELEBRITY_FOLLOWERS': 1000,
+    # Number of recent activities of followed user copied to feed of new follower.
+    'BACKFILL': 20,
+    'BATCH_SIZE': 1000,
+}
+
+Following = CustomUser.following.through
+
+RELATED = ['actor', 'target_user', 'playlist', 'track', 'comment']
+
+
+def get_config():
+    """Function returns feed settings merged with defaults."""
+    return {**DEFAULTS, **getattr(settings, 'FEED', {})}
+
+
+def is_celebrity(user):
+    return user.followers_count >= get_config()['CELEBRITY_FOLLOWERS']
+
+
+def record(actor, verb, **targets):
+    """Function saves activity of actor and pushes it to followers' feeds after commit."""
+    activity = Activities.objects.create(actor=actor, verb=verb, **targets)
+    if not is_celebrity(actor):
+        transaction.on_commit(lambda: fan_out(actor.pk, [activity.pk]))
+    return activity
+
+
+def record_many(actor, verb, field, pks):
+    """Function saves activity of actor for every target pk in one query, like `record`."""
+    activities = Activities.objects.bulk_create([
+        Activities(actor=actor, verb=verb, **{field + '_id': pk}) for pk in pks
+    ])
+    if activities and not is_celebrity(actor):
+        ids = [activity.pk for activity in activities]
+        if None in ids:
+            # Database doesn't return ids of inserted rows, they are the newest activities of actor.
+            newest = Activities.objects.filter(actor=actor, verb=verb).order_by('-id')
+            ids = list(newest.values_list('id', flat=True)[:len(ids)])
+        transaction.on_commit(lambda: fan_out(actor.pk, ids))
+    return activities
+
+
+def fan_out(actor_id, activity_ids):
+    """Function writes activities to feed of every follower of their actor in batches."""
+    batch_size = get_config()['BATCH_SIZE']
+    followers = Following.objects.filter(to_customuser=actor_id).values_list('from_customuser', flat=True)
+    batch = []
+    for follower_id in followers.iterator(chunk_size=batch_size):
+        batch.extend(FeedItems(owner_id=follower_id, activity_id=activity_id) for activity_id in activity_ids)
+        if len(batch) >= batch_size:
+            FeedItems.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    FeedItems.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def on_follow(user, target):
+    """Function copies recent activities of `target` to feed of its new follower `user`."""
+    if is_celebrity(target):
+        return
+    recent = Activities.objects.filter(actor=target).order_by('-id').values_list('id', flat=True)
+    FeedItems.objects.bulk_create(
+        [FeedItems(owner=user, activity_id=activity_id) for activity_id in recent[:get_config()['BACKFILL']]],
+        ignore_conflicts=True
+    )
+
+
+def on_unfollow(user, target):
+    """Function removes activities of `target` from feed of `user`."""
+    FeedItems.objects.filter(owner=user, activity__actor=target).delete()
+
+
+def get_feed(user, cursor=None, page_size=20):
+    """Function returns page of activities of users followed by `user`, newest first.
+
+    Pushed feed items and activities of followed celebrities are read by two
+    keyset queries and merged, so page cost doesn't grow with number of follows.
+    """
+    before = decode_cursor(cursor, 1)[0] if cursor else None
+    if before is not None and (not isinstance(before, int) or isinstance(before, bool)):
+        raise BadRequest('Invalid cursor')
+    pushed = FeedItems.objects.filter(owner=user).select_related(
+        *['activity__' + name for name in RELATED]
+    ).order_by('-activity_id')
+    celebrities = Following.objects.filter(
+        from_customuser=user,
+        to_customuser__followers_count__gte=get_config()['CELEBRITY_FOLLOWERS']
+    ).values('to_customuser')
+    pulled = Activities.objects.filter(actor__in=celebrities).select_related(*RELATED).order_by('-id')
+    if before is not None:
+        pushed = pushed.filter(activity_id__lt=before)
+        pulled = pulled.filter(id__lt=before)
+
+    activities = {item.activity_id: item.activity for item in pushed[:page_size + 1]}
+    for activity in pulled[:page_size + 1]:
+        activities.setdefault(activity.id, activity)
+    items = [activities[activity_id] for activity_id in sorted(activities, reverse=True)]
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        next_cursor = encode_cursor([items[-1].id])
+    return Page(items, next_cursor)
@@ -1,7 +1,7 @@
 from django.contrib.auth.forms import UserCreationForm
 from django.forms import ModelForm, CheckboxSelectMultiple, HiddenInput
 
-from .models import CustomUser, Playlists, Comments
+from .models import CustomUser, Playlists, PlaylistHasTracks, Comments
 
 
 class RegistrationForm(UserCreationForm):
@@ -23,6 +23,22 @@ class CreatePlaylistForm(ModelForm):
         self.fields['tracks'].queryset = user.added_tracks.all()
         self.fields['creator'].initial = user.id
 
+    def save(self, commit=True):
+        playlist = super().save(commit=False)
+        playlist.tracks_count = len(self.cleaned_data['tracks'])
+        self.save_m2m = self.save_tracks
+        if commit:
+            playlist.save()
+            self.save_tracks()
+        return playlist
+
+    def save_tracks(self):
+        """Method adds selected tracks to saved playlist in one query, numbering their positions."""
+        PlaylistHasTracks.objects.bulk_create([
+            PlaylistHasTracks(playlists=self.instance, tracks=track, position=position)
+            for position, track in enumerate(self.cleaned_data['tracks'])
+        ])
+
     class Meta:
         model = Playlists
         fields = ['name', 'description', 'tracks', 'creator']
@@ -0,0 +1,208 @@
+import atexit
+import json
+import logging
+import threading
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from . import search_index
+from .models import Albums, Artists, Genres, IngestionTask, Tracks
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BACKEND': 'thread',
+    'BATCH_SIZE': 200,
+    'FLUSH_INTERVAL': 2.0,
+}
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def ingest(rows):
+    """Function saves rows formatted by APIDataMixins.get_data in constant number of queries.
+
+    Rows already known by `id_musixmatch` are left untouched.
+    """
+    tracks = {}
+    artists = {}
+    for row in rows:
+        if 'track' in row:
+            tracks[row['track']['id_musixmatch']] = row['track']
+        elif 'artist' in row:
+            artists[row['artist']['id_musixmatch']] = row['artist']
+    with transaction.atomic():
+        if tracks:
+            known = Tracks.objects.filter(id_musixmatch__in=tracks).values_list('id_musixmatch', flat=True)
+            for id_musixmatch in known:
+                del tracks[id_musixmatch]
+        albums = {}
+        genres = {}
+        for track in tracks.values():
+            albums[track['album']['id_musixmatch']] = track['album']
+            artists.setdefault(track['artist']['id_musixmatch'], track['artist'])
+            for genre in track['genres']:
+                genres[genre['id_musixmatch']] = genre
+        album_ids = _insert_missing(Albums, albums)
+        artist_ids = _insert_missing(Artists, artists)
+        genre_ids = _insert_missing(Genres, genres)
+        track_ids = _insert_missing(
+            Tracks,
+            {
+                id_musixmatch: {
+                    'id_musixmatch': id_musixmatch,
+                    'name': track['name'],
+                    'album_id': album_ids[track['album']['id_musixmatch']],
+                    'author_id': artist_ids[track['artist']['id_musixmatch']],
+                }
+                for id_musixmatch, track in tracks.items()
+            }
+        )
+        through = Tracks.genres.through
+        through.objects.bulk_create(
+            [
+                through(tracks_id=track_ids[id_musixmatch], genres_id=genre_ids[genre['id_musixmatch']])
+                for id_musixmatch, track in tracks.items()
+                for genre in track['genres']
+            ],
+            ignore_conflicts=True
+        )
+        transaction.on_commit(search_index.invalidate)
+
+
+def _insert_missing(model, objects):
+    """Function creates absent `objects` of model and returns mapping of id_musixmatch to pk."""
+    if not objects:
+        return {}
+    ids = dict(model.objects.filter(id_musixmatch__in=objects).values_list('id_musixmatch', 'id'))
+    missing = [fields for id_musixmatch, fields in objects.items() if id_musixmatch not in ids]
+    if missing:
+        model.objects.bulk_create([model(**fields) for fields in missing], ignore_conflicts=True)
+        ids.update(
+            model.objects.filter(
+                id_musixmatch__in=[fields['id_musixmatch'] for fields in missing]
+            ).values_list('id_musixmatch', 'id')
+        )
+    return ids
+
+
+def get_config():
+    """Function returns ingestion settings merged with defaults."""
+    return {**DEFAULTS, **getattr(settings, 'INGESTION', {})}
+
+
+def dedupe(rows):
+    """Function returns rows unique by kind and id_musixmatch, later rows win."""
+    unique = {}
+    for row in rows:
+        kind = next(iter(row))
+        unique[(kind, row[kind]['id_musixmatch'])] = row
+    return list(unique.values())
+
+
+class IngestionQueue:
+    """Class collects rows in memory and saves them in batches from a background thread.
+
+    Batch is flushed when it grows to `batch_size` rows or every `flush_interval` seconds.
+    """
+    def __init__(self, batch_size=200, flush_interval=2.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def put(self, rows):
+        with self._lock:
+            for row in rows:
+                kind = next(iter(row))
+                self._pending[(kind, row[kind]['id_musixmatch'])] = row
+            size = len(self._pending)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='ingestion', daemon=True)
+                self._thread.start()
+        if size >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self):
+        """Method saves all pending rows right away."""
+        with self._flush_lock:
+            with self._lock:
+                rows = list(self._pending.values())
+                self._pending.clear()
+            if rows:
+                ingest(rows)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Ingestion batch failed')
+            finally:
+                connection.close()
+
+
+def get_queue():
+    """Function returns ingestion queue of the process."""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                config = get_config()
+                _queue = IngestionQueue(config['BATCH_SIZE'], config['FLUSH_INTERVAL'])
+                atexit.register(_queue.flush)
+    return _queue
+
+
+def enqueue(rows):
+    """Function schedules saving of rows according to INGESTION['BACKEND'] setting.
+
+    `sync` saves rows immediately, `thread` hands them to in-process queue and
+    `command` stores them for `ingest_worker` management command.
+    """
+    if not rows:
+        return
+    backend = get_config()['BACKEND']
+    if backend == 'sync':
+        ingest(rows)
+    elif backend == 'thread':
+        get_queue().put(rows)
+    elif backend == 'command':
+        IngestionTask.objects.create(payload=json.dumps(dedupe(rows)))
+    else:
+        raise ValueError('Unknown ingestion backend {}'.format(backend))
+
+
+def flush():
+    """Function saves rows still waiting in queue of the configured backend."""
+    backend = get_config()['BACKEND']
+    if backend == 'thread':
+        get_queue().flush()
+    elif backend == 'command':
+        while process_tasks():
+            pass
+
+
+def process_tasks(batch_size=None):
+    """Function saves one batch of stored ingestion tasks and returns number of tasks processed."""
+    batch_size = batch_size or get_config()['BATCH_SIZE']
+    with transaction.atomic():
+        tasks = list(
+            IngestionTask.objects.select_for_update(skip_locked=True).order_by('id')[:batch_size]
+        )
+        if not tasks:
+            return 0
+        rows = []
+        for task in tasks:
+            rows += json.loads(task.payload)
+        ingest(dedupe(rows))
+        IngestionTask.objects.filter(id__in=[task.id for task in tasks]).delete()
+    return len(tasks)
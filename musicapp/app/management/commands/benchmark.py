@@ -0,0 +1,53 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+
+from app import benchmarks
+
+
+BASELINE = os.path.join(os.path.dirname(benchmarks.__file__), 'baseline.json')
+
+
+class Command(BaseCommand):
+    help = 'Measures time, queries and memory of hot views on synthetic data in test database.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1, help='Multiplier of synthetic dataset size.')
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--scenario', choices=list(benchmarks.SCENARIOS), action='append')
+        parser.add_argument('--output', help='Write JSON report to file instead of stdout.')
+        parser.add_argument('--baseline', default=BASELINE)
+        parser.add_argument('--update-baseline', action='store_true', help='Save report as new baseline.')
+        parser.add_argument('--time-tolerance', type=float, default=0.5)
+        parser.add_argument('--memory-tolerance', type=float, default=0.25)
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            report = benchmarks.run(options['scale'], options['repeat'], options['scenario'])
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        if options['output']:
+            benchmarks.dump(report, options['output'])
+        else:
+            self.stdout.write(json.dumps(report, indent=2, sort_keys=True))
+        if options['update_baseline']:
+            benchmarks.dump(report, options['baseline'])
+            self.stdout.write('Baseline saved to {}'.format(options['baseline']))
+            return
+        if not os.path.exists(options['baseline']):
+            return
+        try:
+            regressions = benchmarks.compare(
+                report, benchmarks.load(options['baseline']), options['time_tolerance'], options['memory_tolerance']
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        if regressions:
+            raise CommandError('Performance budgets exceeded:\n' + '\n'.join(regressions))
+        self.stderr.write('All scenarios are within budgets')
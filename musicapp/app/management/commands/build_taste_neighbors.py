@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Recomputes users with similar taste from added tracks, playlists and genres.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--metric', choices=['cosine', 'jaccard'], default='cosine')
+        parser.add_argument('--top-k', type=int, default=20)
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--genre-weight', type=float, default=0.3)
+
+    def handle(self, *args, **options):
+        try:
+            from app import taste
+        except ImportError as error:
+            raise CommandError('numpy and scipy are required: poetry install --extras taste') from error
+        total = taste.build(
+            metric=options['metric'],
+            top_k=options['top_k'],
+            chunk_size=options['chunk_size'],
+            genre_weight=options['genre_weight'],
+        )
+        self.stdout.write('Stored {} taste neighbors'.format(total))
@@ -0,0 +1,84 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from app.models import CustomUser, Playlists, Tracks, UserHasPlaylists, UserHasTracks
+from app.views import PAGE_SIZE, PLAYLIST_COLLECTIONS, USER_COLLECTIONS, Following, get_profile_users
+
+
+# vendor: pattern of plan line reading whole table
+FULL_SCANS = {
+    'sqlite': re.compile(r'\bSCAN (?!CONSTANT ROW)(?!.*\bUSING\b)'),
+    'mysql': re.compile(r'Table scan on'),
+    'postgresql': re.compile(r'Seq Scan on'),
+}
+
+EXPLAIN_OPTIONS = {
+    'mysql': {'format': 'tree'},
+}
+
+
+def hot_queries(user, playlist):
+    """Function returns querysets run by hot views for given user and playlist by name."""
+    queries = {}
+    for name, (model, field, related, ordering, _, _) in USER_COLLECTIONS.items():
+        queryset = model.objects.filter(**{field + '_id': user.pk}).select_related(*related)
+        queries['user ' + name] = queryset.order_by(*ordering)[:PAGE_SIZE + 1]
+    for name, (model, field, related, ordering, _, _) in PLAYLIST_COLLECTIONS.items():
+        queryset = model.objects.filter(**{field + '_id': playlist.pk}).select_related(*related)
+        queries['playlist ' + name] = queryset.order_by(*ordering)[:PAGE_SIZE + 1]
+    queries['profile counts'] = get_profile_users().filter(pk=user.pk)
+    queries['is follow'] = Following.objects.filter(from_customuser=user, to_customuser_id=playlist.creator_id)
+    queries['followers of user'] = Following.objects.filter(to_customuser=user).values('from_customuser')
+    queries['stored recommendations'] = (
+        user.recommendations.select_related('candidate').order_by('-score', 'candidate_id')[:50]
+    )
+    queries['taste neighbors'] = user.taste_neighbors.select_related('neighbor').order_by('-score', 'neighbor_id')[:50]
+    queries['added track'] = UserHasTracks.objects.filter(user=user, track_id=1)
+    queries['added playlist'] = UserHasPlaylists.objects.filter(user=user, playlist=playlist)
+    queries['track by musixmatch id'] = Tracks.objects.filter(id_musixmatch=1)
+    return queries
+
+
+def full_scans(plan, vendor):
+    """Function returns lines of query plan reading whole tables."""
+    pattern = FULL_SCANS.get(vendor)
+    if pattern is None:
+        return []
+    return [line.strip() for line in plan.splitlines() if pattern.search(line)]
+
+
+class Command(BaseCommand):
+    help = 'Runs EXPLAIN on queries of hot views and reports the ones reading whole tables.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, help='Id of user to explain queries for, first user by default.')
+        parser.add_argument('--playlist', type=int, help='Id of playlist, first playlist by default.')
+        parser.add_argument('--plans', action='store_true', help='Print every query plan.')
+        parser.add_argument('--strict', action='store_true', help='Fail if any query reads whole table.')
+
+    def handle(self, *args, **options):
+        vendor = connection.vendor
+        if vendor not in FULL_SCANS:
+            raise CommandError('Full scans are not recognized in {} plans'.format(vendor))
+        users = CustomUser.objects.order_by('id')
+        playlists = Playlists.objects.order_by('id')
+        user = users.filter(pk=options['user']).first() if options['user'] else users.first()
+        playlist = playlists.filter(pk=options['playlist']).first() if options['playlist'] else playlists.first()
+        if user is None or playlist is None:
+            raise CommandError('User and playlist are needed to explain queries')
+
+        scanning = []
+        for name, queryset in hot_queries(user, playlist).items():
+            plan = queryset.explain(**EXPLAIN_OPTIONS.get(vendor, {}))
+            scans = full_scans(plan, vendor)
+            if scans:
+                scanning.append(name)
+                self.stdout.write(self.style.WARNING('FULL SCAN {}: {}'.format(name, '; '.join(scans))))
+            else:
+                self.stdout.write('ok {}'.format(name))
+            if options['plans']:
+                self.stdout.write(plan + '\n')
+        if scanning and options['strict']:
+            raise CommandError('{} queries read whole tables: {}'.format(len(scanning), ', '.join(scanning)))
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.ingestion import get_config, process_tasks
+
+
+class Command(BaseCommand):
+    help = 'Saves MusixMatch data queued by views when INGESTION backend is "command".'
+
+    def add_arguments(self, parser):
+        config = get_config()
+        parser.add_argument('--batch-size', type=int, default=config['BATCH_SIZE'])
+        parser.add_argument('--interval', type=float, default=config['FLUSH_INTERVAL'])
+        parser.add_argument('--once', action='store_true', help='Drain queue and exit.')
+
+    def handle(self, *args, **options):
+        while True:
+            processed = process_tasks(options['batch_size'])
+            if processed:
+                self.stdout.write('Processed {} tasks'.format(processed))
+                continue
+            if options['once']:
+                return
+            time.sleep(options['interval'])
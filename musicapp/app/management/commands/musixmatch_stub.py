@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from app.musixmatch.stub import StubServer
+
+
+class Command(BaseCommand):
+    help = 'Runs local MusixMatch API stub. Point MUSIXMATCH_BASE_URL to the printed url.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--latency', type=float, default=0, help='Delay of every response in ms.')
+        parser.add_argument('--jitter', type=float, default=0, help='Random extra delay up to given ms.')
+        parser.add_argument('--error-rate', type=float, default=0, help='Share of requests failed, 0..1.')
+        parser.add_argument('--error-status', type=int, default=503)
+        parser.add_argument('--cassette', help='Serve recorded responses from cassette file first.')
+        parser.add_argument('--seed', type=int, default=0, help='Seed of generated catalog.')
+
+    def handle(self, *args, **options):
+        server = StubServer(
+            host=options['host'],
+            port=options['port'],
+            latency=options['latency'] / 1000,
+            jitter=options['jitter'] / 1000,
+            error_rate=options['error_rate'],
+            error_status=options['error_status'],
+            cassette=options['cassette'],
+            seed=options['seed'],
+            verbose=options['verbosity'] > 1,
+        )
+        self.stdout.write('Serving MusixMatch stub at {}'.format(server.url))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from app.models import CustomUser
+from app.recommendations import rebuild_in_chunks
+
+
+class Command(BaseCommand):
+    help = 'Recomputes stored friends-of-friends recommendations of all users.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        total = rebuild_in_chunks(CustomUser.objects.all(), options['chunk_size'])
+        self.stdout.write('Rebuilt recommendations of {} users'.format(total))
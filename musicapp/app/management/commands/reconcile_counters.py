@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from app import counters
+from app.models import CustomUser, Playlists
+
+
+MODELS = {
+    'users': CustomUser,
+    'playlists': Playlists,
+}
+
+
+class Command(BaseCommand):
+    help = 'Recomputes stored followers, following, adds, comments and tracks counters from their tables.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', choices=list(MODELS), action='append')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        for name in options['model'] or list(MODELS):
+            updated = counters.reconcile(MODELS[name], batch_size=options['batch_size'])
+            self.stdout.write('Recounted {} {}'.format(updated, name))
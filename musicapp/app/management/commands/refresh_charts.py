@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from app import charts
+from app.models import ChartSnapshots
+from app.musixmatch import MusixmatchError
+
+
+class Command(BaseCommand):
+    help = 'Fetches MusixMatch charts and saves them as new snapshots. Run from cron or with --loop.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=[kind for kind, _ in ChartSnapshots.KINDS], action='append')
+        parser.add_argument('--loop', action='store_true', help='Keep refreshing every --interval seconds.')
+        parser.add_argument('--interval', type=int, default=60 * 60)
+
+    def handle(self, *args, **options):
+        kinds = options['kind'] or list(charts.CHARTS)
+        while True:
+            for kind in kinds:
+                try:
+                    snapshot = charts.refresh(kind)
+                except (MusixmatchError, ValueError) as error:
+                    self.stderr.write('Failed to refresh {} chart: {}'.format(kind, error))
+                else:
+                    self.stdout.write('Saved {} chart with {} entries'.format(kind, snapshot.entries.count()))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,33 @@
+# Generated by Django 4.2 on 2026-10-18 08:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0002_ingestiontask'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Recommendations',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('candidate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommendations', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='recommendations',
+            index=models.Index(fields=['user', '-score'], name='recommendations_user_score'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='recommendations',
+            unique_together={('user', 'candidate')},
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2 on 2026-10-18 08:08
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0003_recommendations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TasteNeighbors',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('neighbor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='taste_neighbors', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='tasteneighbors',
+            index=models.Index(fields=['user', '-score'], name='taste_neighbors_user_score'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='tasteneighbors',
+            unique_together={('user', 'neighbor')},
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2 on 2026-10-18 08:12
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def index_usernames(apps, schema_editor):
+    CustomUser = apps.get_model('app', 'CustomUser')
+    UsernameTrigrams = apps.get_model('app', 'UsernameTrigrams')
+    rows = []
+    for user_id, username in CustomUser.objects.values_list('id', 'username').iterator(chunk_size=2000):
+        padded = '  {} '.format(username.lower())
+        rows += [UsernameTrigrams(user_id=user_id, trigram=trigram)
+                 for trigram in {padded[i:i + 3] for i in range(len(padded) - 2)}]
+        if len(rows) >= 5000:
+            UsernameTrigrams.objects.bulk_create(rows, ignore_conflicts=True)
+            rows = []
+    UsernameTrigrams.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0004_tasteneighbors'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UsernameTrigrams',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigram', models.CharField(max_length=3)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='username_trigrams', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('trigram', 'user')},
+            },
+        ),
+        migrations.RunPython(index_usernames, migrations.RunPython.noop),
+    ]
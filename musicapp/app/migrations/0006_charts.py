@@ -0,0 +1,53 @@
+# Generated by Django 4.2 on 2026-10-18 08:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0005_usernametrigrams'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChartEntries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ChartSnapshots',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('tracks', 'Tracks'), ('artists', 'Artists')], max_length=16)),
+                ('chart_name', models.CharField(blank=True, max_length=32)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='chartsnapshots',
+            index=models.Index(fields=['kind', '-created_at'], name='chart_snapshots_kind_created'),
+        ),
+        migrations.AddField(
+            model_name='chartentries',
+            name='artist',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='chart_entries', to='app.artists'),
+        ),
+        migrations.AddField(
+            model_name='chartentries',
+            name='snapshot',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='app.chartsnapshots'),
+        ),
+        migrations.AddField(
+            model_name='chartentries',
+            name='track',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='chart_entries', to='app.tracks'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='chartentries',
+            unique_together={('snapshot', 'rank')},
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 4.2 on 2026-10-18 08:22
+
+from django.db import migrations, models
+
+
+FOLLOWING_REVERSE = models.Index(fields=['to_customuser', 'from_customuser'], name='following_reverse')
+
+
+def drop_duplicates(apps, schema_editor):
+    for model_name, field in [('UserHasTracks', 'track'), ('UserHasPlaylists', 'playlist')]:
+        model = apps.get_model('app', model_name)
+        duplicates = (
+            model.objects
+            .values('user', field)
+            .annotate(first=models.Min('id'), count=models.Count('id'))
+            .filter(count__gt=1)
+        )
+        for row in duplicates:
+            model.objects.filter(user=row['user'], **{field: row[field]}).exclude(id=row['first']).delete()
+
+
+def following_through(apps):
+    return apps.get_model('app', 'CustomUser')._meta.get_field('following').remote_field.through
+
+
+def add_following_index(apps, schema_editor):
+    schema_editor.add_index(following_through(apps), FOLLOWING_REVERSE)
+
+
+def remove_following_index(apps, schema_editor):
+    schema_editor.remove_index(following_through(apps), FOLLOWING_REVERSE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0006_charts'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicates, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='userhasplaylists',
+            unique_together={('user', 'playlist')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='userhastracks',
+            unique_together={('user', 'track')},
+        ),
+        migrations.AddIndex(
+            model_name='comments',
+            index=models.Index(fields=['playlist', 'created_at', 'id'], name='comments_playlist_created'),
+        ),
+        migrations.AddIndex(
+            model_name='playlists',
+            index=models.Index(fields=['creator', 'created_at', 'id'], name='playlists_creator_created'),
+        ),
+        migrations.AddIndex(
+            model_name='userhasplaylists',
+            index=models.Index(fields=['user', 'added_at', 'id'], name='user_has_playlists_added'),
+        ),
+        migrations.AddIndex(
+            model_name='userhastracks',
+            index=models.Index(fields=['user', 'added_at', 'id'], name='user_has_tracks_added'),
+        ),
+        # Auto-created following table can't declare indexes, so followers of user are covered here.
+        migrations.RunPython(add_following_index, remove_following_index),
+    ]
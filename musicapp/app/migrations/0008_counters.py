@@ -0,0 +1,81 @@
+# Generated by Django 4.2 on 2026-10-18 08:24
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def count_of(model, field):
+    counts = (
+        model.objects
+        .filter(**{field: models.OuterRef('pk')})
+        .order_by()
+        .values(field)
+        .annotate(count=models.Count('*'))
+        .values('count')
+    )
+    return Coalesce(models.Subquery(counts), 0)
+
+
+def fill_counters(apps, schema_editor):
+    CustomUser = apps.get_model('app', 'CustomUser')
+    Playlists = apps.get_model('app', 'Playlists')
+    Following = CustomUser._meta.get_field('following').remote_field.through
+    CustomUser.objects.update(
+        followers_count=count_of(Following, 'to_customuser'),
+        following_count=count_of(Following, 'from_customuser'),
+        tracks_count=count_of(apps.get_model('app', 'UserHasTracks'), 'user'),
+    )
+    Playlists.objects.update(
+        adds_count=count_of(apps.get_model('app', 'UserHasPlaylists'), 'playlist'),
+        comments_count=count_of(apps.get_model('app', 'Comments'), 'playlist'),
+        tracks_count=count_of(Playlists._meta.get_field('tracks').remote_field.through, 'playlists'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0007_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='followers_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='following_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='tracks_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='playlists',
+            name='adds_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='playlists',
+            name='comments_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='playlists',
+            name='tracks_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['-followers_count'], name='customuser_followers_count'),
+        ),
+        migrations.AddIndex(
+            model_name='playlists',
+            index=models.Index(fields=['-adds_count'], name='playlists_adds_count'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
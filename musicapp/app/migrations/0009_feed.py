@@ -0,0 +1,43 @@
+# Generated by Django 4.2 on 2026-10-18 08:27
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0008_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Activities',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('verb', models.CharField(choices=[('followed', 'Followed user'), ('playlist_created', 'Created playlist'), ('playlist_added', 'Added playlist'), ('track_added', 'Added track'), ('commented', 'Commented playlist')], max_length=32)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('actor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activities', to=settings.AUTH_USER_MODEL)),
+                ('comment', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='app.comments')),
+                ('playlist', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='app.playlists')),
+                ('target_user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('track', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='app.tracks')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='FeedItems',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('activity', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='app.activities')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed_items', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('owner', 'activity')},
+            },
+        ),
+        migrations.AddIndex(
+            model_name='activities',
+            index=models.Index(fields=['actor', '-id'], name='activities_actor_id'),
+        ),
+    ]
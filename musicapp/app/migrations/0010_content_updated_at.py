@@ -0,0 +1,19 @@
+# Generated by Django 4.2 on 2026-10-18 08:32
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0009_feed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='content_updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 4.2 on 2026-10-18 09:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_positions(apps, schema_editor):
+    PlaylistHasTracks = apps.get_model('app', 'PlaylistHasTracks')
+    rows = PlaylistHasTracks.objects.order_by('playlists_id', 'id').only('id', 'playlists_id')
+    batch = []
+    playlist_id = None
+    for row in rows.iterator(chunk_size=2000):
+        if row.playlists_id != playlist_id:
+            playlist_id, position = row.playlists_id, 0
+        row.position = position
+        position += 1
+        batch.append(row)
+        if len(batch) >= 2000:
+            PlaylistHasTracks.objects.bulk_update(batch, ['position'])
+            batch = []
+    PlaylistHasTracks.objects.bulk_update(batch, ['position'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0010_content_updated_at'),
+    ]
+
+    operations = [
+        # Table of implicit many-to-many relation becomes table of explicit through model.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='PlaylistHasTracks',
+                    fields=[
+                        ('id', models.BigAutoField(
+                            auto_created=True, primary_key=True, serialize=False, verbose_name='ID'
+                        )),
+                        ('playlists', models.ForeignKey(
+                            on_delete=django.db.models.deletion.CASCADE, to='app.playlists'
+                        )),
+                        ('tracks', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='app.tracks')),
+                    ],
+                    options={
+                        'db_table': 'app_playlists_tracks',
+                        'unique_together': {('playlists', 'tracks')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='playlists',
+                    name='tracks',
+                    field=models.ManyToManyField(blank=True, through='app.PlaylistHasTracks', to='app.tracks'),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name='playlisthastracks',
+            name='position',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='playlisthastracks',
+            index=models.Index(fields=['playlists', 'position', 'id'], name='playlist_tracks_position'),
+        ),
+        migrations.RunPython(fill_positions, migrations.RunPython.noop),
+    ]
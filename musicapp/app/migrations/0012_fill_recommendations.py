@@ -0,0 +1,45 @@
+# Generated by Django 4.2 on 2026-10-18 10:02
+
+from django.db import migrations, models
+
+
+def fill_recommendations(apps, schema_editor):
+    CustomUser = apps.get_model('app', 'CustomUser')
+    Recommendations = apps.get_model('app', 'Recommendations')
+    Following = CustomUser._meta.get_field('following').remote_field.through
+    already_followed = Following.objects.filter(
+        from_customuser=models.OuterRef('user_id'),
+        to_customuser=models.OuterRef('to_customuser')
+    )
+    user_ids = CustomUser.objects.order_by('id').values_list('id', flat=True)
+    last_id = 0
+    while True:
+        chunk = list(user_ids.filter(id__gt=last_id)[:500])
+        if not chunk:
+            break
+        rows = (
+            Following.objects
+            .annotate(user_id=models.F('from_customuser__followers'))
+            .filter(user_id__in=chunk)
+            .exclude(to_customuser=models.F('user_id'))
+            .exclude(models.Exists(already_followed))
+            .values_list('user_id', 'to_customuser')
+            .annotate(score=models.Count('id'))
+        )
+        Recommendations.objects.filter(user_id__in=chunk).delete()
+        Recommendations.objects.bulk_create(
+            [Recommendations(user_id=user_id, candidate_id=candidate_id, score=score) for user_id, candidate_id, score in rows],
+            batch_size=2000
+        )
+        last_id = chunk[-1]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0011_playlist_positions'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_recommendations, migrations.RunPython.noop),
+    ]
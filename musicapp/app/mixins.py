@@ -1,4 +1,5 @@
-from .models import Albums, Artists, Genres, Tracks
+from .ingestion import enqueue, ingest
+from .musixmatch import get_client
 
 
 class APIDataMixins:
@@ -9,6 +10,11 @@ class APIDataMixins:
         self.header = dict(api_response['message']['header'])
         self.body = dict(api_response['message']['body'])
 
+    @classmethod
+    def from_api(cls, method, **params):
+        """Method requests API method through shared client and wraps its response."""
+        return cls(get_client().get(method, **params))
+
     def _check_status(self):
         """Check response status code."""
         if self.header.get('status_code') == 200:
@@ -79,37 +85,10 @@ class APIDataMixins:
         """Methods fills database with response's data."""
         data = self.get_data()
         if data:
-            for obj in data:
-                obj_name = list(obj.keys())[0]
-                obj_data = obj[obj_name]
-                if obj_name == 'track':
-                    if Tracks.objects.filter(id_musixmatch=obj_data['id_musixmatch']).exists():
-                        continue
-                    obj_to_save = Tracks.objects.create(
-                        id_musixmatch=obj_data['id_musixmatch'],
-                        name=obj_data['name'],
-                    )
-                    album = Albums.objects.get_or_create(
-                        id_musixmatch=obj_data['album']['id_musixmatch'],
-                        name=obj_data['album']['name']
-                    )[0]
-                    obj_to_save.album = album
-                    artist = Artists.objects.get_or_create(
-                        id_musixmatch=obj_data['artist']['id_musixmatch'],
-                        name=obj_data['artist']['name']
-                    )[0]
-                    obj_to_save.author = artist
-                    for _genre in obj_data['genres']:
-                        genre = Genres.objects.get_or_create(
-                            id_musixmatch=_genre['id_musixmatch'],
-                            name=_genre['name']
-                        )[0]
-                        obj_to_save.genres.add(genre)
-                    obj_to_save.save()
-                elif obj_name == 'artist':
-                    if Artists.objects.filter(id_musixmatch=obj_data['id_musixmatch']).exists():
-                        continue
-                    obj_to_save = Artists.objects.create(
-                        id_musixmatch=obj_data['id_musixmatch'],
-                        name=obj_data['name']
-                    )
+            ingest(data)
+
+    def enqueue_to_db(self):
+        """Method schedules saving of response's data without waiting for database."""
+        data = self.get_data()
+        if data:
+            enqueue(data)
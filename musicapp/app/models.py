@@ -1,8 +1,15 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 
+def trigrams(text):
+    """Function returns set of padded lowercase trigrams of text."""
+    padded = '  {} '.format(text.lower())
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
 class CustomUser(AbstractUser):
     email = models.EmailField(
         _("email address"),
@@ -11,28 +18,127 @@ class CustomUser(AbstractUser):
     following = models.ManyToManyField('self', blank=True, symmetrical=False, related_name='followers')
     added_tracks = models.ManyToManyField('app.Tracks', through='app.UserHasTracks')
     added_playlists = models.ManyToManyField('app.Playlists', through='app.UserHasPlaylists')
+    followers_count = models.IntegerField(default=0)
+    following_count = models.IntegerField(default=0)
+    tracks_count = models.IntegerField(default=0)
+    # Time of the last change of profile content, validator of conditional requests.
+    content_updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['-followers_count'], name='customuser_followers_count'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        # Username trigrams are rebuilt only when stored username changes.
+        user._indexed_username = user.__dict__.get('username')
+        return user
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            changed = 'username' in update_fields
+        else:
+            changed = (
+                adding or (
+                    'username' not in self.get_deferred_fields()
+                    and self.username != getattr(self, '_indexed_username', None)
+                )
+            )
+        if changed:
+            self.index_username()
+            self._indexed_username = self.username
+
+    def index_username(self):
+        """Method replaces stored trigrams of username used by fuzzy user search."""
+        with transaction.atomic():
+            self.username_trigrams.all().delete()
+            UsernameTrigrams.objects.bulk_create(
+                [UsernameTrigrams(user=self, trigram=trigram) for trigram in trigrams(self.username)],
+                ignore_conflicts=True
+            )
 
     def follow(self, user):
-        self.following.add(user)
+        from . import feed
+        from .recommendations import on_follow
+
+        with transaction.atomic():
+            _, created = self.following.through.objects.get_or_create(from_customuser=self, to_customuser=user)
+            if created:
+                self._change_follow_counters(user, 1)
+                on_follow(self, user)
+                feed.on_follow(self, user)
+                feed.record(self, Activities.FOLLOWED, target_user=user)
 
     def unfollow(self, user):
-        self.following.remove(user)
+        from . import feed
+        from .recommendations import on_unfollow
+
+        with transaction.atomic():
+            deleted, _ = self.following.through.objects.filter(from_customuser=self, to_customuser=user).delete()
+            if deleted:
+                self._change_follow_counters(user, -1)
+                on_unfollow(self, user)
+                feed.on_unfollow(self, user)
+
+    def _change_follow_counters(self, user, delta):
+        """Method updates counters of both users in one statement, so rows are locked in index order."""
+        from . import page_cache
+
+        page_cache.bump(CustomUser, [self.pk, user.pk])
+        CustomUser.objects.filter(pk__in=[self.pk, user.pk]).update(
+            content_updated_at=timezone.now(),
+            following_count=models.F('following_count') + models.Case(
+                models.When(pk=self.pk, then=delta), default=0
+            ),
+            followers_count=models.F('followers_count') + models.Case(
+                models.When(pk=user.pk, then=delta), default=0
+            ),
+        )
 
     def is_follow(self, user):
         return self.following.filter(id=user.id).exists()
 
-    def get_users_recommendations(self):
-        recommendations = []
-        following = self.following.all()
-        if following.exists():
-            for user in following:
-                user_following = user.following.all()
-                for usr in user_following:
-                    if usr == self or usr in following or usr in recommendations:
-                        continue
-                    recommendations.append(usr)
+    def get_users_recommendations(self, limit=None):
+        """Method returns users followed by user's followings ranked by number of mutual connections."""
+        recommendations = (
+            CustomUser.objects
+            .filter(followers__followers=self)
+            .exclude(id=self.id)
+            .exclude(id__in=self.following.values('id'))
+            .annotate(mutual=models.Count('followers', distinct=True))
+            .order_by('-mutual', 'id')
+        )
+        if limit is not None:
+            recommendations = recommendations[:limit]
         return recommendations
 
+    def get_taste_neighbors(self, limit=None):
+        """Method returns users with similar taste, most similar first."""
+        neighbors = self.taste_neighbors.select_related('neighbor').order_by('-score', 'neighbor_id')
+        if limit is not None:
+            neighbors = neighbors[:limit]
+        users = []
+        for neighbor in neighbors:
+            neighbor.neighbor.similarity = neighbor.score
+            users.append(neighbor.neighbor)
+        return users
+
+    def get_stored_recommendations(self, limit=None):
+        """Method returns precomputed recommendations with the same ranking in one indexed query."""
+        recommendations = self.recommendations.select_related('candidate').order_by('-score', 'candidate_id')
+        if limit is not None:
+            recommendations = recommendations[:limit]
+        users = []
+        for recommendation in recommendations:
+            recommendation.candidate.mutual = recommendation.score
+            users.append(recommendation.candidate)
+        return users
+
 
 class Albums(models.Model):
     id_musixmatch = models.IntegerField(unique=True)
@@ -88,10 +194,17 @@ class Playlists(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     creator = models.ForeignKey(CustomUser, related_name='playlists', on_delete=models.CASCADE)
-    tracks = models.ManyToManyField(Tracks, blank=True)
+    tracks = models.ManyToManyField(Tracks, blank=True, through='PlaylistHasTracks')
+    adds_count = models.IntegerField(default=0)
+    comments_count = models.IntegerField(default=0)
+    tracks_count = models.IntegerField(default=0)
 
     class Meta:
         unique_together = ['name', 'creator']
+        indexes = [
+            models.Index(fields=['creator', 'created_at', 'id'], name='playlists_creator_created'),
+            models.Index(fields=['-adds_count'], name='playlists_adds_count'),
+        ]
 
     def __str__(self):
         return self.name
@@ -100,12 +213,31 @@ class Playlists(models.Model):
         return "Playlist(name={}, creator={})".format(self.name, self.creator)
 
 
+class PlaylistHasTracks(models.Model):
+    """Tracks of playlist in order of `position`."""
+    playlists = models.ForeignKey(Playlists, on_delete=models.CASCADE)
+    tracks = models.ForeignKey(Tracks, on_delete=models.CASCADE)
+    position = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'app_playlists_tracks'
+        unique_together = ['playlists', 'tracks']
+        indexes = [
+            models.Index(fields=['playlists', 'position', 'id'], name='playlist_tracks_position'),
+        ]
+
+
 class Comments(models.Model):
     message = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     author = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
     playlist = models.ForeignKey(Playlists, on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['playlist', 'created_at', 'id'], name='comments_playlist_created'),
+        ]
+
     def __repr__(self):
         return "Comment(author={}, playlist={}, created_at={})".format(
             self.author,
@@ -122,8 +254,146 @@ class UserHasTracks(models.Model):
     track = models.ForeignKey(Tracks, on_delete=models.CASCADE)
     added_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        unique_together = ['user', 'track']
+        indexes = [
+            models.Index(fields=['user', 'added_at', 'id'], name='user_has_tracks_added'),
+        ]
+
 
 class UserHasPlaylists(models.Model):
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
     playlist = models.ForeignKey(Playlists, on_delete=models.CASCADE)
     added_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ['user', 'playlist']
+        indexes = [
+            models.Index(fields=['user', 'added_at', 'id'], name='user_has_playlists_added'),
+        ]
+
+
+class IngestionTask(models.Model):
+    """Rows of API response waiting to be saved by `ingest_worker` command."""
+    payload = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
+class Recommendations(models.Model):
+    """Precomputed friends-of-friends recommendations, `score` is number of mutual connections."""
+    user = models.ForeignKey(CustomUser, related_name='recommendations', on_delete=models.CASCADE)
+    candidate = models.ForeignKey(CustomUser, related_name='+', on_delete=models.CASCADE)
+    score = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['user', 'candidate']
+        indexes = [
+            models.Index(fields=['user', '-score'], name='recommendations_user_score'),
+        ]
+
+    def __repr__(self):
+        return "Recommendation(user={}, candidate={}, score={})".format(self.user_id, self.candidate_id, self.score)
+
+
+class TasteNeighbors(models.Model):
+    """Users with similar tracks and genres, built by `build_taste_neighbors` command."""
+    user = models.ForeignKey(CustomUser, related_name='taste_neighbors', on_delete=models.CASCADE)
+    neighbor = models.ForeignKey(CustomUser, related_name='+', on_delete=models.CASCADE)
+    score = models.FloatField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['user', 'neighbor']
+        indexes = [
+            models.Index(fields=['user', '-score'], name='taste_neighbors_user_score'),
+        ]
+
+    def __repr__(self):
+        return "TasteNeighbor(user={}, neighbor={}, score={})".format(self.user_id, self.neighbor_id, self.score)
+
+
+class UsernameTrigrams(models.Model):
+    """Trigrams of usernames for fuzzy user search."""
+    user = models.ForeignKey(CustomUser, related_name='username_trigrams', on_delete=models.CASCADE)
+    trigram = models.CharField(max_length=3)
+
+    class Meta:
+        unique_together = ['trigram', 'user']
+
+
+class ChartSnapshots(models.Model):
+    """MusixMatch chart saved by `refresh_charts` command."""
+    TRACKS = 'tracks'
+    ARTISTS = 'artists'
+    KINDS = [
+        (TRACKS, 'Tracks'),
+        (ARTISTS, 'Artists'),
+    ]
+    kind = models.CharField(max_length=16, choices=KINDS)
+    chart_name = models.CharField(max_length=32, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['kind', '-created_at'], name='chart_snapshots_kind_created'),
+        ]
+
+    def __repr__(self):
+        return "ChartSnapshot(kind={}, created_at={})".format(self.kind, self.created_at)
+
+
+class ChartEntries(models.Model):
+    snapshot = models.ForeignKey(ChartSnapshots, related_name='entries', on_delete=models.CASCADE)
+    rank = models.PositiveSmallIntegerField()
+    track = models.ForeignKey(Tracks, null=True, related_name='chart_entries', on_delete=models.CASCADE)
+    artist = models.ForeignKey(Artists, null=True, related_name='chart_entries', on_delete=models.CASCADE)
+
+    class Meta:
+        unique_together = ['snapshot', 'rank']
+
+    def __repr__(self):
+        return "ChartEntry(snapshot={}, rank={})".format(self.snapshot_id, self.rank)
+
+
+class Activities(models.Model):
+    """Action of user shown in feeds of its followers."""
+    FOLLOWED = 'followed'
+    PLAYLIST_CREATED = 'playlist_created'
+    PLAYLIST_ADDED = 'playlist_added'
+    TRACK_ADDED = 'track_added'
+    COMMENTED = 'commented'
+    VERBS = [
+        (FOLLOWED, 'Followed user'),
+        (PLAYLIST_CREATED, 'Created playlist'),
+        (PLAYLIST_ADDED, 'Added playlist'),
+        (TRACK_ADDED, 'Added track'),
+        (COMMENTED, 'Commented playlist'),
+    ]
+    actor = models.ForeignKey(CustomUser, related_name='activities', on_delete=models.CASCADE)
+    verb = models.CharField(max_length=32, choices=VERBS)
+    target_user = models.ForeignKey(CustomUser, null=True, related_name='+', on_delete=models.CASCADE)
+    playlist = models.ForeignKey(Playlists, null=True, related_name='+', on_delete=models.CASCADE)
+    track = models.ForeignKey(Tracks, null=True, related_name='+', on_delete=models.CASCADE)
+    comment = models.ForeignKey(Comments, null=True, related_name='+', on_delete=models.CASCADE)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['actor', '-id'], name='activities_actor_id'),
+        ]
+
+    def __repr__(self):
+        return "Activity(actor={}, verb={}, created_at={})".format(self.actor_id, self.verb, self.created_at)
+
+
+class FeedItems(models.Model):
+    """Activity pushed to feed of one follower of its actor."""
+    owner = models.ForeignKey(CustomUser, related_name='feed_items', on_delete=models.CASCADE)
+    activity = models.ForeignKey(Activities, related_name='+', on_delete=models.CASCADE)
+
+    class Meta:
+        unique_together = ['owner', 'activity']
+
+    def __repr__(self):
+        return "FeedItem(owner={}, activity={})".format(self.owner_id, self.activity_id)
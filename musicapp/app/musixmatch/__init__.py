@@ -0,0 +1,21 @@
+from .cache import CachedMusixmatchClient
+from .cassette import CassetteMiss, CassetteMusixmatchClient
+from .client import MusixmatchClient, MusixmatchError, get_client, get_config, reset_client
+from .fanout import fetch_many
+from .limits import CircuitBreaker, GuardedMusixmatchClient, MusixmatchUnavailable, RateLimiter
+
+__all__ = [
+    'CachedMusixmatchClient',
+    'CassetteMiss',
+    'CassetteMusixmatchClient',
+    'CircuitBreaker',
+    'GuardedMusixmatchClient',
+    'MusixmatchClient',
+    'MusixmatchError',
+    'MusixmatchUnavailable',
+    'RateLimiter',
+    'fetch_many',
+    'get_client',
+    'get_config',
+    'reset_client',
+]
@@ -0,0 +1,115 @@
+import hashlib
+import threading
+import time
+from concurrent.futures import Future
+from urllib.parse import urlencode
+
+from django.core.cache import caches
+
+from .client import MusixmatchError
+
+
+def normalize_params(params):
+    """Function returns params with search strings folded, so equal queries share one key."""
+    normalized = {}
+    for name, value in params.items():
+        if name == 'apikey':
+            continue
+        if isinstance(value, str):
+            value = ' '.join(value.split())
+            if name.startswith('q'):
+                value = value.lower()
+        normalized[name] = value
+    return normalized
+
+
+def make_key(method, params):
+    """Function returns cache key for API method and its normalized params."""
+    query = urlencode(sorted(normalize_params(params).items()))
+    return 'mxm:{}:{}'.format(method, hashlib.sha1(query.encode()).hexdigest())
+
+
+class CachedMusixmatchClient:
+    """Class puts Django cache in front of MusixMatch client.
+
+    Fresh entries are served as is. Stale ones are served while a single background
+    refresh runs. Concurrent misses of one key in a process wait for one upstream call.
+    """
+    def __init__(self, client, cache_alias, ttls=None, default_ttl=300, stale_ttl=3600):
+        self.client = client
+        self.cache = caches[cache_alias]
+        self.ttls = ttls or {}
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def get(self, method, **params):
+        key = make_key(method, params)
+        entry = self.cache.get(key)
+        if entry is None:
+            return self._fetch_coalesced(key, method, params)
+        if entry['fresh_until'] <= time.time():
+            self._revalidate(key, method, params)
+        return entry['payload']
+
+    def refresh(self, method, **params):
+        """Method calls API bypassing cached entry and stores fresh response."""
+        return self._fetch_coalesced(make_key(method, params), method, params)
+
+    def _fetch_coalesced(self, key, method, params):
+        """Method makes one upstream call per key, other callers wait for its result."""
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            payload = self._fetch_and_store(key, method, params)
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(payload)
+            return payload
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def _fetch_and_store(self, key, method, params):
+        payload = self.client.get(method, **params)
+        if self._is_cacheable(payload):
+            ttl = self.ttls.get(method, self.default_ttl)
+            self.cache.set(
+                key,
+                {'payload': payload, 'fresh_until': time.time() + ttl},
+                timeout=ttl + self.stale_ttl
+            )
+        return payload
+
+    def _revalidate(self, key, method, params):
+        """Method refreshes stale entry in background unless other worker already does it."""
+        if not self.cache.add(key + ':refresh', True, timeout=self.client.timeout[1] * 2):
+            return
+
+        def refresh():
+            try:
+                self._fetch_coalesced(key, method, params)
+            except MusixmatchError:
+                pass
+            finally:
+                self.cache.delete(key + ':refresh')
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    @staticmethod
+    def _is_cacheable(payload):
+        try:
+            return payload['message']['header']['status_code'] == 200
+        except (KeyError, TypeError):
+            return False
+
+    def close(self):
+        self.client.close()
@@ -0,0 +1,74 @@
+import json
+import os
+import tempfile
+import threading
+
+from .cache import make_key, normalize_params
+from .client import MusixmatchError
+
+
+class CassetteMiss(MusixmatchError):
+    """Raised in "replay" mode for call missing in cassette, API is not requested."""
+
+
+class CassetteMusixmatchClient:
+    """Class records MusixMatch responses to JSON cassette file and replays them.
+
+    In "replay" mode only recorded calls are answered, others raise CassetteMiss
+    without touching network. In "record" mode recorded calls are replayed and
+    missing ones are requested from wrapped client and appended to the file.
+    """
+    modes = ('replay', 'record')
+
+    def __init__(self, client, path, mode='replay'):
+        if mode not in self.modes:
+            raise ValueError('Unknown cassette mode {!r}'.format(mode))
+        self.client = client
+        self.path = path
+        self.mode = mode
+        self.lock = threading.Lock()
+        self.interactions = load_cassette(path) if os.path.exists(path) else {}
+
+    @property
+    def timeout(self):
+        return self.client.timeout
+
+    def get(self, method, **params):
+        key = make_key(method, params)
+        interaction = self.interactions.get(key)
+        if interaction is not None:
+            return interaction['response']
+        if self.mode == 'replay':
+            raise CassetteMiss('{} is not recorded in {}'.format(method, self.path))
+        response = self.client.get(method, **params)
+        with self.lock:
+            self.interactions[key] = {
+                'method': method,
+                'params': normalize_params(params),
+                'response': response,
+            }
+            save_cassette(self.path, self.interactions)
+        return response
+
+    def refresh(self, method, **params):
+        return self.get(method, **params)
+
+    def close(self):
+        self.client.close()
+
+
+def load_cassette(path):
+    """Function reads cassette file and returns its interactions by cache key."""
+    with open(path, encoding='utf-8') as file:
+        interactions = json.load(file)['interactions']
+    return {make_key(row['method'], row['params']): row for row in interactions}
+
+
+def save_cassette(path, interactions):
+    """Function atomically writes interactions to cassette file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    rows = sorted(interactions.values(), key=lambda row: (row['method'], sorted(row['params'].items())))
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=directory, delete=False) as file:
+        json.dump({'interactions': rows}, file, ensure_ascii=False, indent=1, default=str)
+    os.replace(file.name, path)
@@ -0,0 +1,164 @@
+import threading
+import time
+
+import requests
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import Signal, receiver
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+DEFAULTS = {
+    'BASE_URL': 'https://api.musixmatch.com/ws/1.1/',
+    'API_KEY': None,
+    'CONNECT_TIMEOUT': 3.05,
+    'READ_TIMEOUT': 10,
+    'RETRIES': 2,
+    'BACKOFF_FACTOR': 0.3,
+    'POOL_SIZE': 10,
+    'FANOUT_WORKERS': 8,
+    'SEARCH_DEADLINE': 5,
+    'RATE_LIMIT': None,
+    'RATE_PERIOD': 1,
+    'BREAKER_THRESHOLD': None,
+    'BREAKER_COOLDOWN': 30,
+    'STATE_CACHE_ALIAS': 'default',
+    'CACHE_ALIAS': None,
+    'CACHE_TTL': {},
+    'CACHE_DEFAULT_TTL': 300,
+    'CACHE_STALE_TTL': 3600,
+    'CASSETTE': None,
+    'CASSETTE_MODE': 'replay',
+}
+
+_client = None
+_client_lock = threading.Lock()
+
+# Sent after every request to API with `method`, `duration` in seconds and `failed` flag.
+api_called = Signal()
+
+
+class MusixmatchError(Exception):
+    """Raised when MusixMatch API can't be reached or returns unreadable data."""
+
+
+def get_config():
+    """Function returns MusixMatch settings merged with defaults."""
+    return {**DEFAULTS, **getattr(settings, 'MUSIXMATCH', {})}
+
+
+class MusixmatchClient:
+    """Class sends requests to MusixMatch API through one pooled keep-alive session."""
+    retry_statuses = (429, 500, 502, 503, 504)
+
+    def __init__(self, base_url, api_key, timeout=(3.05, 10), retries=2, backoff_factor=0.3, pool_size=10):
+        self.base_url = base_url.rstrip('/') + '/'
+        self.api_key = api_key
+        self.timeout = timeout
+        self.session = self._make_session(retries, backoff_factor, pool_size)
+
+    @classmethod
+    def from_settings(cls):
+        config = get_config()
+        return cls(
+            base_url=config['BASE_URL'],
+            api_key=config['API_KEY'],
+            timeout=(config['CONNECT_TIMEOUT'], config['READ_TIMEOUT']),
+            retries=config['RETRIES'],
+            backoff_factor=config['BACKOFF_FACTOR'],
+            pool_size=config['POOL_SIZE'],
+        )
+
+    def _make_session(self, retries, backoff_factor, pool_size):
+        """Method builds session with bounded retries and connection pool."""
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=self.retry_statuses,
+            allowed_methods=frozenset(['GET']),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def get(self, method, **params):
+        """Method calls API method with given query params and returns decoded JSON."""
+        params['apikey'] = self.api_key
+        started = time.perf_counter()
+        failed = True
+        try:
+            response = self.session.get(self.base_url + method, params=params, timeout=self.timeout)
+            response.raise_for_status()
+            payload = response.json()
+            failed = False
+            return payload
+        except (requests.RequestException, ValueError) as error:
+            raise MusixmatchError('{} request failed: {}'.format(method, error)) from error
+        finally:
+            api_called.send(
+                sender=self.__class__, method=method, duration=time.perf_counter() - started, failed=failed
+            )
+
+    def refresh(self, method, **params):
+        """Method calls API method, same as get for client without cache."""
+        return self.get(method, **params)
+
+    def close(self):
+        self.session.close()
+
+
+def build_client():
+    """Function builds MusixMatch client from settings.
+
+    Client is guarded by rate limiter and circuit breaker, replays cassette
+    and is put behind cache when configured. Cassette is outside of the guard,
+    so replayed calls and replay misses take no tokens and are no failures.
+    """
+    from .cache import CachedMusixmatchClient
+    from .cassette import CassetteMusixmatchClient
+    from .limits import GuardedMusixmatchClient
+
+    config = get_config()
+    client = MusixmatchClient.from_settings()
+    if config['RATE_LIMIT'] or config['BREAKER_THRESHOLD']:
+        client = GuardedMusixmatchClient.from_config(client, config)
+    if config['CASSETTE']:
+        client = CassetteMusixmatchClient(client, config['CASSETTE'], config['CASSETTE_MODE'])
+    if config['CACHE_ALIAS']:
+        client = CachedMusixmatchClient(
+            client,
+            config['CACHE_ALIAS'],
+            ttls=config['CACHE_TTL'],
+            default_ttl=config['CACHE_DEFAULT_TTL'],
+            stale_ttl=config['CACHE_STALE_TTL'],
+        )
+    return client
+
+
+def get_client():
+    """Function returns MusixMatch client shared by the whole process."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = build_client()
+    return _client
+
+
+def reset_client():
+    """Function drops shared client so the next call rebuilds it from settings."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+
+
+@receiver(setting_changed)
+def _reset_on_settings_change(setting, **kwargs):
+    if setting == 'MUSIXMATCH':
+        reset_client()
@@ -0,0 +1,52 @@
+import contextvars
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from .client import get_client, get_config
+
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Function returns bounded thread pool shared by all fan-out requests of the process."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=get_config()['FANOUT_WORKERS'],
+                    thread_name_prefix='musixmatch'
+                )
+    return _executor
+
+
+def fetch_many(calls, deadline=None):
+    """Function issues API calls concurrently and returns payloads by call name.
+
+    `calls` maps name to (method, params). Calls that fail or don't finish
+    within `deadline` seconds get None, so caller can render partial results.
+    Calls run in context of the caller, so they are attributed to its request.
+    """
+    client = get_client()
+    executor = get_executor()
+    futures = {
+        name: executor.submit(contextvars.copy_context().run, client.get, method, **params)
+        for name, (method, params) in calls.items()
+    }
+    done, _ = wait(futures.values(), timeout=deadline)
+    results = {}
+    for name, future in futures.items():
+        results[name] = None
+        if future not in done:
+            future.cancel()
+            logger.warning('MusixMatch call %s missed %ss deadline', name, deadline)
+        elif future.exception() is not None:
+            logger.warning('MusixMatch call %s failed: %s', name, future.exception())
+        else:
+            results[name] = future.result()
+    return results
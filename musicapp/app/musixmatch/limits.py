@@ -0,0 +1,129 @@
+import time
+
+from django.core.cache import caches
+
+from .cassette import CassetteMiss
+from .client import MusixmatchError
+
+
+class MusixmatchUnavailable(MusixmatchError):
+    """Raised without calling API when rate limit is exhausted or circuit is open."""
+
+
+class RateLimiter:
+    """Class allows `rate` calls per `period` seconds across all workers sharing the cache.
+
+    Tokens are counted by atomic cache increments in fixed windows.
+    """
+    def __init__(self, cache, key, rate, period=1):
+        self.cache = cache
+        self.key = key
+        self.rate = rate
+        self.period = period
+
+    def acquire(self):
+        """Method takes one token, returns False if window has none left."""
+        key = '{}:{}'.format(self.key, int(time.time() // self.period))
+        self.cache.add(key, 0, timeout=self.period * 2)
+        try:
+            used = self.cache.incr(key)
+        except ValueError:
+            self.cache.set(key, 1, timeout=self.period * 2)
+            used = 1
+        return used <= self.rate
+
+
+class CircuitBreaker:
+    """Class stops calls for `cooldown` seconds after `threshold` consecutive failures.
+
+    After cooldown one probe call is let through, its success closes the circuit.
+    State lives in cache, so every worker sharing the cache sees the same circuit.
+    """
+    def __init__(self, cache, key, threshold, cooldown):
+        self.cache = cache
+        self.key = key
+        self.threshold = threshold
+        self.cooldown = cooldown
+
+    def is_open(self):
+        open_until = self.cache.get(self.key + ':open_until')
+        return open_until is not None and time.time() < open_until
+
+    def allow(self):
+        open_until = self.cache.get(self.key + ':open_until')
+        if open_until is None:
+            return True
+        if time.time() < open_until:
+            return False
+        return self.cache.add(self.key + ':probe', True, timeout=self.cooldown)
+
+    def record_success(self):
+        self.cache.delete_many([self.key + ':failures', self.key + ':open_until', self.key + ':probe'])
+
+    def record_failure(self):
+        self.cache.add(self.key + ':failures', 0, timeout=self.cooldown * 10)
+        try:
+            failures = self.cache.incr(self.key + ':failures')
+        except ValueError:
+            failures = 1
+        if failures >= self.threshold:
+            self.cache.set(self.key + ':open_until', time.time() + self.cooldown, timeout=None)
+            self.cache.delete(self.key + ':probe')
+
+
+class GuardedMusixmatchClient:
+    """Class lets API calls through rate limiter and circuit breaker."""
+    def __init__(self, client, limiter=None, breaker=None):
+        self.client = client
+        self.limiter = limiter
+        self.breaker = breaker
+
+    @classmethod
+    def from_config(cls, client, config):
+        cache = caches[config['STATE_CACHE_ALIAS']]
+        limiter = breaker = None
+        if config['RATE_LIMIT']:
+            limiter = RateLimiter(cache, 'mxm:rate', config['RATE_LIMIT'], config['RATE_PERIOD'])
+        if config['BREAKER_THRESHOLD']:
+            breaker = CircuitBreaker(
+                cache, 'mxm:circuit', config['BREAKER_THRESHOLD'], config['BREAKER_COOLDOWN']
+            )
+        return cls(client, limiter, breaker)
+
+    @property
+    def timeout(self):
+        return self.client.timeout
+
+    def get(self, method, **params):
+        if self.breaker and not self.breaker.allow():
+            raise MusixmatchUnavailable('Circuit is open, {} is not requested'.format(method))
+        if self.limiter and not self.limiter.acquire():
+            raise MusixmatchUnavailable('Rate limit exceeded, {} is not requested'.format(method))
+        try:
+            payload = self.client.get(method, **params)
+        except CassetteMiss:
+            # Offline runs must not trip the circuit for calls that were never recorded.
+            raise
+        except MusixmatchError:
+            if self.breaker:
+                self.breaker.record_failure()
+            raise
+        if self.breaker:
+            if self._is_server_error(payload):
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+        return payload
+
+    def refresh(self, method, **params):
+        return self.get(method, **params)
+
+    @staticmethod
+    def _is_server_error(payload):
+        try:
+            return payload['message']['header']['status_code'] >= 500
+        except (KeyError, TypeError):
+            return True
+
+    def close(self):
+        self.client.close()
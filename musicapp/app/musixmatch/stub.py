@@ -0,0 +1,181 @@
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from .cache import make_key
+from .cassette import load_cassette
+
+
+WORDS = [
+    'midnight', 'river', 'neon', 'echo', 'golden', 'shadow', 'summer', 'broken', 'electric', 'velvet',
+    'wild', 'silver', 'paper', 'fire', 'ocean', 'glass', 'crystal', 'thunder', 'lonely', 'dream',
+]
+
+GENRES = ['Pop', 'Rock', 'Hip-Hop', 'Electronic', 'Jazz', 'Indie', 'Metal', 'Soul']
+
+
+class StubCatalog:
+    """Class generates deterministic MusixMatch-like payloads for stub server.
+
+    Every query gets the same results on every run, ids of different queries
+    rarely overlap, so ingestion sees both new and already known rows.
+    """
+    def __init__(self, seed=0):
+        self.seed = seed
+
+    def _random(self, *parts):
+        return random.Random(zlib.crc32(repr((self.seed,) + parts).encode()))
+
+    def _name(self, rnd, words=2):
+        return ' '.join(rnd.choice(WORDS).capitalize() for _ in range(words))
+
+    def artist(self, artist_id):
+        rnd = self._random('artist', artist_id)
+        return {'artist_id': artist_id, 'artist_name': self._name(rnd)}
+
+    def track(self, track_id, name=None):
+        rnd = self._random('track', track_id)
+        artist = self.artist(rnd.randint(1, 500))
+        album_id = artist['artist_id'] * 10 + rnd.randint(0, 4)
+        genres = rnd.sample(range(len(GENRES)), rnd.randint(0, 2))
+        return {
+            'track_id': track_id,
+            'track_name': name or self._name(rnd, rnd.randint(1, 3)),
+            'album_id': album_id,
+            'album_name': self._name(self._random('album', album_id)),
+            **artist,
+            'primary_genres': {
+                'music_genre_list': [
+                    {'music_genre': {'music_genre_id': index + 1, 'music_genre_name': GENRES[index]}}
+                    for index in genres
+                ]
+            },
+        }
+
+    def _query_ids(self, query, page, page_size):
+        base = zlib.crc32(' '.join(query.lower().split()).encode()) % 10 ** 6 * 100
+        start = (page - 1) * page_size
+        return [base + start + index + 1 for index in range(page_size)]
+
+    def track_search(self, q_track='', page=1, page_size=10, **params):
+        return 'track_list', [
+            {'track': self.track(track_id, '{} {}'.format(q_track, index + 1).strip().title())}
+            for index, track_id in enumerate(self._query_ids(q_track, page, page_size))
+        ]
+
+    def artist_search(self, q_artist='', page=1, page_size=10, **params):
+        rows = []
+        for index, artist_id in enumerate(self._query_ids(q_artist, page, page_size)):
+            artist = self.artist(artist_id)
+            artist['artist_name'] = '{} {}'.format(q_artist, artist['artist_name']).strip().title()
+            rows.append({'artist': artist})
+        return 'artist_list', rows
+
+    def chart_tracks(self, page=1, page_size=10, **params):
+        start = (page - 1) * page_size
+        ids = range(start + 1, start + page_size + 1)
+        return 'track_list', [{'track': self.track(track_id)} for track_id in ids]
+
+    def chart_artists(self, page=1, page_size=10, **params):
+        start = (page - 1) * page_size
+        ids = range(start + 1, start + page_size + 1)
+        return 'artist_list', [{'artist': self.artist(artist_id)} for artist_id in ids]
+
+    def respond(self, method, params):
+        """Method returns payload of API method, None for unknown method."""
+        handlers = {
+            'track.search': self.track_search,
+            'artist.search': self.artist_search,
+            'chart.tracks.get': self.chart_tracks,
+            'chart.artists.get': self.chart_artists,
+        }
+        if method not in handlers:
+            return None
+        for name in ('page', 'page_size'):
+            if name in params:
+                params[name] = int(params[name])
+        key, rows = handlers[method](**params)
+        return {'message': {'header': {'status_code': 200, 'available': len(rows)}, 'body': {key: rows}}}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Class answers MusixMatch API requests from cassette or stub catalog."""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        url = urlsplit(self.path)
+        method = url.path.rstrip('/').rsplit('/', 1)[-1]
+        params = dict(parse_qsl(url.query))
+        params.pop('apikey', None)
+        delay = server.latency + random.uniform(0, server.jitter)
+        if delay:
+            time.sleep(delay)
+        if server.error_rate and random.random() < server.error_rate:
+            return self._send(server.error_status, {'message': {'header': {'status_code': server.error_status}}})
+        interaction = server.interactions.get(make_key(method, params))
+        payload = interaction['response'] if interaction else server.catalog.respond(method, params)
+        if payload is None:
+            return self._send(404, {'message': {'header': {'status_code': 404}, 'body': []}})
+        self._send(200, payload)
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class StubServer(ThreadingHTTPServer):
+    """Local HTTP server imitating MusixMatch API with configurable latency and errors.
+
+    `latency` and `jitter` are in seconds, `error_rate` is a share of requests
+    answered with `error_status`. Recorded cassette responses take precedence
+    over generated ones.
+    """
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0, jitter=0, error_rate=0, error_status=503,
+                 cassette=None, seed=0, verbose=False):
+        super().__init__((host, port), StubHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.interactions = load_cassette(cassette) if cassette else {}
+        self.catalog = StubCatalog(seed)
+        self.verbose = verbose
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return 'http://{}:{}/ws/1.1/'.format(host, port)
+
+    def start(self):
+        """Method starts serving in background thread and returns the server."""
+        self._thread = threading.Thread(target=self.serve_forever, name='musixmatch-stub', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
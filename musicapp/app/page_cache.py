@@ -0,0 +1,113 @@
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import CustomUser, Playlists
+
+
+DEFAULTS = {
+    'ENABLED': True,
+    'CACHE_ALIAS': 'default',
+    # Entries of old versions are never read again and just expire.
+    'TIMEOUT': 3600,
+}
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def get_config():
+    """Function returns page cache settings merged with defaults."""
+    return {**DEFAULTS, **getattr(settings, 'PAGE_CACHE', {})}
+
+
+def _cache():
+    return caches[get_config()['CACHE_ALIAS']]
+
+
+def version_key(model, pk):
+    return 'pagever:{}:{}'.format(model._meta.model_name, pk)
+
+
+def get_version(model, pk):
+    """Function returns current version of cached content of object.
+
+    Missing version starts from current time, so entries cached before its eviction are not reused.
+    """
+    cache = _cache()
+    key = version_key(model, pk)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump(model, pks):
+    """Function invalidates cached content of objects with given pks by moving their versions.
+
+    Versions are moved again after commit, dropping entries cached meanwhile from data read before commit.
+    """
+    keys = [version_key(model, pk) for pk in pks]
+
+    def move():
+        cache = _cache()
+        for key in keys:
+            try:
+                cache.incr(key)
+            except ValueError:
+                pass
+    move()
+    transaction.on_commit(move)
+
+
+def count(name, outcome):
+    with _stats_lock:
+        stats = _stats.setdefault(name, {'hits': 0, 'misses': 0})
+        stats[outcome] += 1
+
+
+def stats():
+    """Function returns hits and misses of this process by entry name."""
+    with _stats_lock:
+        return {name: dict(counts) for name, counts in _stats.items()}
+
+
+def reset():
+    """Function drops collected hits and misses."""
+    with _stats_lock:
+        _stats.clear()
+
+
+def cached(name, model, pk, load, vary=()):
+    """Function returns value of `name` entry of object, calling `load` only when current version isn't cached.
+
+    `vary` holds everything besides the object the value depends on, like flags of viewer.
+    """
+    if not get_config()['ENABLED']:
+        return load()
+    digest = hashlib.md5(repr(list(vary)).encode()).hexdigest()
+    key = 'page:{}:{}:{}:{}:{}'.format(name, model._meta.model_name, pk, get_version(model, pk), digest)
+    cache = _cache()
+    value = cache.get(key)
+    if value is None:
+        count(name, 'misses')
+        value = load()
+        cache.set(key, value, timeout=get_config()['TIMEOUT'])
+    else:
+        count(name, 'hits')
+    return value
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_save, sender=Playlists)
+def _forget_created(sender, instance, created, **kwargs):
+    # Rolled back rows can leave their ids and versions to new rows.
+    if created:
+        _cache().delete(version_key(sender, instance.pk))
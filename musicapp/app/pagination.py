@@ -0,0 +1,100 @@
+import base64
+import binascii
+import datetime
+import json
+
+from django.core.exceptions import BadRequest, ValidationError
+from django.db.models import Q
+
+
+class Page:
+    """Class holds one page of keyset pagination and cursor of the next one."""
+    def __init__(self, items, next_cursor=None, url=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.url = url
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __bool__(self):
+        return bool(self.items)
+
+
+def encode_cursor(values):
+    """Function packs ordering values of the last row into url-safe cursor."""
+    values = [value.isoformat() if isinstance(value, datetime.datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor, size):
+    """Function unpacks cursor, raises BadRequest if it is malformed."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise BadRequest('Invalid cursor')
+    if not isinstance(values, list) or len(values) != size:
+        raise BadRequest('Invalid cursor')
+    return values
+
+
+def _field(model, path):
+    """Function returns model field reached by `__` separated path."""
+    for name in path.split('__'):
+        field = model._meta.get_field(name)
+        model = field.related_model
+    return field
+
+
+def clean_cursor(model, ordering, values):
+    """Function converts cursor values to python values of ordering fields, raises BadRequest if they don't fit."""
+    cleaned = []
+    for field, value in zip(ordering, values):
+        if value is None or isinstance(value, (list, dict)):
+            raise BadRequest('Invalid cursor')
+        try:
+            cleaned.append(_field(model, field.lstrip('-')).to_python(value))
+        except (ValidationError, TypeError, ValueError):
+            raise BadRequest('Invalid cursor')
+    return cleaned
+
+
+def _after(ordering, values):
+    """Function returns filter selecting rows placed after given values in ordering."""
+    condition = Q()
+    equal = {}
+    for field, value in zip(ordering, values):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        condition |= Q(**equal, **{'{}__{}'.format(name, lookup): value})
+        equal[name] = value
+    return condition
+
+
+def _value(row, field):
+    value = row
+    for name in field.lstrip('-').split('__'):
+        value = getattr(value, name)
+    return value
+
+
+def paginate(queryset, ordering, cursor=None, page_size=20, attr=None):
+    """Function returns page of queryset rows following cursor.
+
+    Ordering must end with unique field so cursor is stable. If `attr` is given,
+    page holds that attribute of every row instead of rows themselves.
+    """
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        values = clean_cursor(queryset.model, ordering, decode_cursor(cursor, len(ordering)))
+        queryset = queryset.filter(_after(ordering, values))
+    rows = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor([_value(rows[-1], field) for field in ordering])
+    items = [getattr(row, attr) for row in rows] if attr else rows
+    return Page(items, next_cursor)
@@ -0,0 +1,215 @@
+import bisect
+import contextvars
+import json
+import logging
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.dispatch import receiver
+from django.template.backends.django import DjangoTemplates
+
+from .musixmatch.client import api_called
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'SERVER_TIMING': True,
+    'SLOW_REQUEST_MS': 1000,
+    # Upper bounds of histogram buckets in ms, the last bucket holds everything slower.
+    'BUCKETS': (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000),
+}
+
+# part: what its count means
+PARTS = {'db': 'queries', 'api': 'calls', 'template': 'renders'}
+
+_current = contextvars.ContextVar('perf_metrics', default=None)
+
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+
+def get_config():
+    """Function returns performance instrumentation settings merged with defaults."""
+    return {**DEFAULTS, **getattr(settings, 'PERF', {})}
+
+
+class RequestMetrics:
+    """Class accumulates count and time of DB queries, API calls and template renders of one request."""
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.total = 0.0
+        self.counts = dict.fromkeys(PARTS, 0)
+        self.times = dict.fromkeys(PARTS, 0.0)
+        self.lock = threading.Lock()
+
+    def add(self, part, seconds):
+        with self.lock:
+            self.counts[part] += 1
+            self.times[part] += seconds
+
+    def finish(self):
+        self.total = time.perf_counter() - self.started
+
+    def durations(self):
+        """Method returns time spent in each part and in total, in ms."""
+        durations = {part: self.times[part] * 1000 for part in PARTS}
+        durations['total'] = self.total * 1000
+        return durations
+
+    def server_timing(self):
+        """Method returns value of Server-Timing header."""
+        entries = [
+            '{};dur={:.1f};desc="{} {}"'.format(part, self.times[part] * 1000, self.counts[part], unit)
+            for part, unit in PARTS.items()
+        ]
+        entries.append('total;dur={:.1f}'.format(self.total * 1000))
+        return ', '.join(entries)
+
+
+def record(part, seconds):
+    """Function adds measured time to metrics of current request, if any."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.add(part, seconds)
+
+
+def _time_query(execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        record('db', time.perf_counter() - started)
+
+
+@receiver(api_called)
+def _time_api_call(sender, duration, **kwargs):
+    record('api', duration)
+
+
+class Histogram:
+    """Class counts observed values in fixed buckets and estimates percentiles from them."""
+    def __init__(self, buckets):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def percentile(self, share):
+        """Method returns upper bound of bucket holding given share of observations."""
+        rank = share * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return self.buckets[index] if index < len(self.buckets) else self.max
+        return 0.0
+
+    def as_dict(self):
+        bounds = [str(bound) for bound in self.buckets] + ['+Inf']
+        return {
+            'count': self.count,
+            'mean': round(self.sum / self.count, 2) if self.count else 0.0,
+            'max': round(self.max, 2),
+            'p50': self.percentile(0.5),
+            'p90': self.percentile(0.9),
+            'p99': self.percentile(0.99),
+            'buckets': dict(zip(bounds, self.counts)),
+        }
+
+
+def observe(url_name, metrics):
+    """Function adds request metrics to histograms of its URL name."""
+    buckets = get_config()['BUCKETS']
+    with _histograms_lock:
+        histograms = _histograms.get(url_name)
+        if histograms is None:
+            histograms = _histograms[url_name] = {name: Histogram(buckets) for name in [*PARTS, 'total']}
+        for name, value in metrics.durations().items():
+            histograms[name].observe(value)
+
+
+def snapshot():
+    """Function returns histograms of this process by URL name and measured part."""
+    with _histograms_lock:
+        return {
+            url_name: {name: histogram.as_dict() for name, histogram in histograms.items()}
+            for url_name, histograms in _histograms.items()
+        }
+
+
+def reset():
+    """Function drops collected histograms."""
+    with _histograms_lock:
+        _histograms.clear()
+
+
+class PerformanceMiddleware:
+    """Middleware measures every request and reports it in Server-Timing header, log and histograms."""
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(_time_query))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        metrics.finish()
+
+        config = get_config()
+        url_name = getattr(request.resolver_match, 'url_name', None) or 'unresolved'
+        observe(url_name, metrics)
+        if config['SERVER_TIMING']:
+            response['Server-Timing'] = metrics.server_timing()
+        durations = metrics.durations()
+        level = logging.WARNING if durations['total'] >= config['SLOW_REQUEST_MS'] else logging.INFO
+        if logger.isEnabledFor(level):
+            logger.log(level, json.dumps({
+                'url_name': url_name,
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                **{part + '_count': metrics.counts[part] for part in PARTS},
+                **{name + '_ms': round(value, 2) for name, value in durations.items()},
+            }))
+        return response
+
+
+class TimedTemplate:
+    """Template wrapper recording render time in metrics of current request."""
+    def __init__(self, template):
+        self._template = template
+
+    def __getattr__(self, name):
+        return getattr(self._template, name)
+
+    def render(self, context=None, request=None):
+        started = time.perf_counter()
+        try:
+            return self._template.render(context, request)
+        finally:
+            record('template', time.perf_counter() - started)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Django templates backend which measures render time of top level templates."""
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
@@ -0,0 +1,164 @@
+import logging
+import threading
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Exists, F, OuterRef
+from django.utils import timezone
+
+from .models import CustomUser, Recommendations
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    # Follows changing scores of more users or candidates are handled by rebuild in background.
+    'MAX_FAN_OUT': 1000,
+    'BATCH_SIZE': 1000,
+}
+
+Following = CustomUser.following.through
+
+
+def get_config():
+    """Function returns recommendations settings merged with defaults."""
+    return {**DEFAULTS, **getattr(settings, 'RECOMMENDATIONS', {})}
+
+
+def compute(user_ids):
+    """Function returns (user_id, candidate_id, score) rows of friends-of-friends for given users."""
+    already_followed = Following.objects.filter(
+        from_customuser=OuterRef('user_id'),
+        to_customuser=OuterRef('to_customuser')
+    )
+    return (
+        Following.objects
+        .annotate(user_id=F('from_customuser__followers'))
+        .filter(user_id__in=user_ids)
+        .exclude(to_customuser=F('user_id'))
+        .exclude(Exists(already_followed))
+        .values_list('user_id', 'to_customuser')
+        .annotate(score=Count('id'))
+    )
+
+
+def rebuild(user_ids):
+    """Function replaces stored recommendations of given users with freshly computed ones."""
+    with transaction.atomic():
+        Recommendations.objects.filter(user_id__in=user_ids).delete()
+        Recommendations.objects.bulk_create([
+            Recommendations(user_id=user_id, candidate_id=candidate_id, score=score)
+            for user_id, candidate_id, score in compute(user_ids)
+        ])
+
+
+def rebuild_in_chunks(users, chunk_size=500):
+    """Function rebuilds recommendations of users of queryset in chunks and returns number of users."""
+    user_ids = users.order_by('id').values_list('id', flat=True)
+    last_id = 0
+    total = 0
+    while True:
+        chunk = list(user_ids.filter(id__gt=last_id)[:chunk_size])
+        if not chunk:
+            return total
+        rebuild(chunk)
+        last_id = chunk[-1]
+        total += len(chunk)
+
+
+def is_high_fan_out(user, target):
+    """Function tells whether follow between users changes too many scores to update them in request."""
+    return user.followers_count + target.following_count > get_config()['MAX_FAN_OUT']
+
+
+def rebuild_later(user_id):
+    """Function rebuilds recommendations of user and its followers in background thread after commit.
+
+    These are the only users whose recommendations change when user follows or unfollows somebody.
+    """
+    def run():
+        try:
+            rebuild([user_id])
+            rebuild_in_chunks(CustomUser.objects.filter(following=user_id), get_config()['BATCH_SIZE'])
+        except Exception:
+            logger.exception('Recommendations of followers of user %s failed to rebuild', user_id)
+        finally:
+            connection.close()
+
+    transaction.on_commit(lambda: threading.Thread(target=run, name='recommendations', daemon=True).start())
+
+
+def on_follow(user, target):
+    """Function updates stored recommendations after `user` started following `target`."""
+    if is_high_fan_out(user, target):
+        rebuild_later(user.id)
+        return
+    with transaction.atomic():
+        Recommendations.objects.filter(user=user, candidate=target).delete()
+        candidates = target.following.exclude(id=user.id).exclude(followers=user).values_list('id', flat=True)
+        _change_scores([user.id], candidates, 1)
+        followers = user.followers.exclude(id=target.id).exclude(following=target).values_list('id', flat=True)
+        _change_scores(followers, [target.id], 1)
+
+
+def on_unfollow(user, target):
+    """Function updates stored recommendations after `user` stopped following `target`."""
+    if is_high_fan_out(user, target):
+        rebuild_later(user.id)
+        return
+    with transaction.atomic():
+        candidates = target.following.exclude(id=user.id).values_list('id', flat=True)
+        _change_scores([user.id], candidates, -1)
+        followers = user.followers.exclude(id=target.id).values_list('id', flat=True)
+        _change_scores(followers, [target.id], -1)
+        score = user.following.filter(following=target).count()
+        if score:
+            Recommendations.objects.update_or_create(user=user, candidate=target, defaults={'score': score})
+
+
+def _chunks(ids, size):
+    """Function yields lists of ids from list or from subquery of user ids, at most `size` at once."""
+    if isinstance(ids, list):
+        for start in range(0, len(ids), size):
+            yield ids[start:start + size]
+        return
+    ids = ids.order_by('id')
+    last_id = 0
+    while True:
+        chunk = list(ids.filter(id__gt=last_id)[:size])
+        if chunk:
+            yield chunk
+        if len(chunk) < size:
+            return
+        last_id = chunk[-1]
+
+
+def _change_scores(user_ids, candidate_ids, delta):
+    """Function adds `delta` to scores of every user/candidate pair, creating or dropping rows.
+
+    Ids are lists or subqueries of user ids, so existing rows are changed without loading them,
+    and new pairs are inserted in batches.
+    """
+    pairs = Recommendations.objects.filter(user_id__in=user_ids, candidate_id__in=candidate_ids)
+    pairs.update(score=F('score') + delta, updated_at=timezone.now())
+    if delta < 0:
+        pairs.filter(score__lte=0).delete()
+        return
+    batch_size = get_config()['BATCH_SIZE']
+    for users in _chunks(user_ids, batch_size):
+        for candidates in _chunks(candidate_ids, batch_size):
+            existing = set(
+                Recommendations.objects
+                .filter(user_id__in=users, candidate_id__in=candidates)
+                .values_list('user_id', 'candidate_id')
+            )
+            Recommendations.objects.bulk_create(
+                [
+                    Recommendations(user_id=user_id, candidate_id=candidate_id, score=delta)
+                    for user_id in users
+                    for candidate_id in candidates
+                    if (user_id, candidate_id) not in existing
+                ],
+                ignore_conflicts=True,
+                batch_size=batch_size
+            )
@@ -0,0 +1,220 @@
+import hashlib
+import heapq
+import threading
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+from .models import Artists, Tracks
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': True,
+    'REFRESH_INTERVAL': 5,
+    'MIN_RESULTS': 5,
+    'FRESHNESS_TTL': 3600,
+}
+
+INDEXES = ['tracks', 'artists']
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_config():
+    """Function returns local search settings merged with defaults."""
+    return {**DEFAULTS, **getattr(settings, 'SEARCH_INDEX', {})}
+
+
+def tokenize(text):
+    """Function returns lowercase words of text."""
+    return ''.join(char if char.isalnum() else ' ' for char in text.lower()).split()
+
+
+def ngrams(word, size=3):
+    """Function returns n-grams of word padded at start, so prefixes share leading n-grams."""
+    padded = ' ' * (size - 1) + word
+    return {padded[i:i + size] for i in range(len(padded) - size + 1)}
+
+
+class SearchIndex:
+    """Class keeps in-memory n-gram inverted index over names of one model.
+
+    Query matches document when every query word is a prefix of some document word.
+    Index is built at worker start in background thread, then new rows are picked up
+    incrementally by primary key watermark. Rows are loaded outside of the lock, so
+    searches keep using current index meanwhile.
+    """
+    def __init__(self, model, fields, to_result):
+        self.model = model
+        self.fields = fields
+        self.to_result = to_result
+        self.postings = {}
+        self.documents = {}
+        self.watermark = 0
+        self.refreshed_at = None
+        self.built = False
+        self.building = False
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    def add(self, pk, name, result):
+        words = tokenize(name)
+        self.documents[pk] = (name.lower(), words, result)
+        for word in words:
+            for gram in ngrams(word):
+                self.postings.setdefault(gram, set()).add(pk)
+
+    def refresh(self, force=False):
+        """Method loads rows created since last refresh, at most once per refresh interval."""
+        if not self.built:
+            if not self.building:
+                # Index was not warmed up, so the first search builds it.
+                with self._load_lock:
+                    if not self.built:
+                        self._build()
+            return
+        interval = get_config()['REFRESH_INTERVAL']
+        if not force and self.refreshed_at is not None and time.monotonic() - self.refreshed_at < interval:
+            return
+        # Searches don't wait for rows loaded by other thread, they use current index.
+        if not self._load_lock.acquire(blocking=False):
+            return
+        try:
+            rows = self._load(self.watermark)
+            with self._lock:
+                for pk, name, result in rows:
+                    self.add(pk, name, result)
+                    self.watermark = pk
+                self.refreshed_at = time.monotonic()
+        finally:
+            self._load_lock.release()
+
+    def build_in_background(self):
+        """Method builds index in background thread unless it is already being built."""
+        with self._lock:
+            if self.building:
+                return
+            self.building = True
+
+        def build():
+            try:
+                with self._load_lock:
+                    self._build()
+            except Exception:
+                logger.exception('Search index of %s failed to build', self.model.__name__)
+            finally:
+                self.building = False
+                connection.close()
+
+        threading.Thread(target=build, name='search-index', daemon=True).start()
+
+    def _build(self):
+        fresh = SearchIndex(self.model, self.fields, self.to_result)
+        for pk, name, result in self._load(0):
+            fresh.add(pk, name, result)
+            fresh.watermark = pk
+        with self._lock:
+            self.postings, self.documents, self.watermark = fresh.postings, fresh.documents, fresh.watermark
+            self.refreshed_at = time.monotonic()
+            self.built = True
+
+    def _load(self, watermark):
+        """Method returns (pk, name, result) of rows created after watermark."""
+        rows = self.model.objects.filter(pk__gt=watermark).order_by('pk').values_list('pk', *self.fields)
+        return [(row[0], row[2], self.to_result(row)) for row in rows.iterator(chunk_size=2000)]
+
+    def invalidate(self):
+        """Method makes next search pick up new rows right away."""
+        self.refreshed_at = None
+
+    def search(self, query, limit=5):
+        self.refresh()
+        words = tokenize(query)
+        if not words:
+            return []
+        with self._lock:
+            postings = sorted(
+                (self.postings.get(gram, set()) for gram in set().union(*(ngrams(word) for word in words))),
+                key=len
+            )
+            # Intersection starts from the rarest n-gram, so common ones don't cost a table scan.
+            candidates = postings[0].intersection(*postings[1:])
+            matches = []
+            for pk in candidates:
+                name, doc_words, result = self.documents[pk]
+                if all(any(doc_word.startswith(word) for doc_word in doc_words) for word in words):
+                    exact = sum(word in doc_words for word in words)
+                    matches.append(((name != query.lower(), -exact, len(name), pk), result))
+        return [result for _, result in heapq.nsmallest(limit, matches, key=lambda match: match[0])]
+
+
+def _track_result(row):
+    pk, id_musixmatch, name, artist = row
+    return {'track': {'id_musixmatch': id_musixmatch, 'name': name, 'artist': {'name': artist}}}
+
+
+def _artist_result(row):
+    pk, id_musixmatch, name = row
+    return {'artist': {'id_musixmatch': id_musixmatch, 'name': name}}
+
+
+def get_index(name):
+    """Function returns process-wide index of 'tracks' or 'artists'."""
+    if name not in _indexes:
+        with _indexes_lock:
+            if name == 'tracks':
+                _indexes.setdefault(name, SearchIndex(Tracks, ('id_musixmatch', 'name', 'author__name'), _track_result))
+            elif name == 'artists':
+                _indexes.setdefault(name, SearchIndex(Artists, ('id_musixmatch', 'name'), _artist_result))
+            else:
+                raise KeyError(name)
+    return _indexes[name]
+
+
+def warm_up():
+    """Function builds every index in background, so first searches of worker don't wait for it."""
+    if get_config()['ENABLED']:
+        for name in INDEXES:
+            get_index(name).build_in_background()
+
+
+def invalidate():
+    """Function makes every built index pick up rows saved by ingestion on next search."""
+    for index in list(_indexes.values()):
+        index.invalidate()
+
+
+def freshness_key(name, query):
+    """Function returns cache key marking local results of query as fresh."""
+    digest = hashlib.md5(' '.join(tokenize(query)).encode()).hexdigest()
+    return 'search_index:fresh:{}:{}'.format(name, digest)
+
+
+def mark_fresh(name, query):
+    """Function records that upstream results of query were just fetched."""
+    cache.set(freshness_key(name, query), True, timeout=get_config()['FRESHNESS_TTL'])
+
+
+def mark_stale(name, query):
+    """Function makes next search of query refresh its results upstream."""
+    cache.delete(freshness_key(name, query))
+
+
+def claim_refresh(name, query):
+    """Function returns True when local results of query are older than FRESHNESS_TTL.
+
+    Results are marked fresh at once, so only one caller of all workers refreshes them upstream.
+    """
+    return cache.add(freshness_key(name, query), True, timeout=get_config()['FRESHNESS_TTL'])
+
+
+def reset():
+    """Function drops built indexes."""
+    with _indexes_lock:
+        _indexes.clear()
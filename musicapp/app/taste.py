@@ -0,0 +1,128 @@
+"""Similar taste neighbors computed with sparse matrix math.
+
+Requires optional numpy and scipy packages.
+"""
+import numpy as np
+from django.db import transaction
+from scipy import sparse
+
+from .models import CustomUser, Playlists, Tracks, TasteNeighbors, UserHasPlaylists, UserHasTracks
+
+
+def _pairs(queryset):
+    """Function loads two-column values_list queryset into (n, 2) integer array."""
+    return np.array(list(queryset.iterator(chunk_size=10000)), dtype=np.int64).reshape(-1, 2)
+
+
+def _index(ids, values):
+    """Function maps ids to positions in sorted `values` array."""
+    return np.searchsorted(values, ids)
+
+
+def load_matrices():
+    """Function returns user ids with binary user×track and weighted user×genre matrices.
+
+    User tracks are the ones added to library and the ones from added or created playlists.
+    """
+    user_ids = np.array(CustomUser.objects.order_by('id').values_list('id', flat=True), dtype=np.int64)
+    user_tracks = np.concatenate([
+        _pairs(UserHasTracks.objects.values_list('user_id', 'track_id')),
+        _pairs(UserHasPlaylists.objects.filter(playlist__tracks__isnull=False)
+               .values_list('user_id', 'playlist__tracks')),
+        _pairs(Playlists.objects.filter(tracks__isnull=False).values_list('creator_id', 'tracks')),
+    ])
+    track_ids, track_positions = np.unique(user_tracks[:, 1], return_inverse=True)
+    tracks = sparse.csr_matrix(
+        (np.ones(len(user_tracks)), (_index(user_tracks[:, 0], user_ids), track_positions)),
+        shape=(len(user_ids), len(track_ids))
+    )
+    tracks.data[:] = 1
+
+    track_genres = _pairs(Tracks.genres.through.objects.values_list('tracks_id', 'genres_id'))
+    track_genres = track_genres[np.isin(track_genres[:, 0], track_ids)]
+    genre_ids, genre_positions = np.unique(track_genres[:, 1], return_inverse=True)
+    genres_of_tracks = sparse.csr_matrix(
+        (np.ones(len(track_genres)), (_index(track_genres[:, 0], track_ids), genre_positions)),
+        shape=(len(track_ids), len(genre_ids))
+    )
+    return user_ids, tracks, tracks @ genres_of_tracks
+
+
+def _normalize_rows(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms) @ matrix
+
+
+def build_features(tracks, genres, metric='cosine', genre_weight=0.3):
+    """Function returns user×track and user×genre feature matrices whose row products give similarity numerators."""
+    if metric == 'cosine':
+        track_features = (1 - genre_weight) ** 0.5 * _normalize_rows(tracks)
+        genre_features = genre_weight ** 0.5 * _normalize_rows(genres)
+    elif metric == 'jaccard':
+        track_features = tracks
+        genre_features = genres.copy()
+        genre_features.data[:] = 1
+    else:
+        raise ValueError('Unknown metric {}'.format(metric))
+    return track_features.tocsr(), genre_features.tocsr()
+
+
+def _row_products(matrix, rows, cols, block_size=100000):
+    """Function returns products of matrix rows rows[i] and cols[i] for every pair, computed in blocks of pairs."""
+    products = np.empty(len(rows))
+    for start in range(0, len(rows), block_size):
+        stop = start + block_size
+        block = matrix[rows[start:stop]].multiply(matrix[cols[start:stop]])
+        products[start:stop] = np.asarray(block.sum(axis=1)).ravel()
+    return products
+
+
+def top_neighbors(features, start, stop, top_k, metric='cosine'):
+    """Function returns (rows, cols, scores) of top_k most similar users for rows start:stop.
+
+    Candidates are users sharing a track, genres only add to their scores. Genres are few,
+    so nearly every pair of users shares one and genre products would make the block dense.
+    """
+    tracks, genres = features
+    overlap = (tracks[start:stop] @ tracks.T).tocoo()
+    rows, cols, scores = overlap.row, overlap.col, overlap.data
+    keep = rows + start != cols
+    rows, cols, scores = rows[keep], cols[keep], scores[keep]
+    scores = scores + _row_products(genres, rows + start, cols)
+    if metric == 'jaccard':
+        sizes = np.asarray(tracks.sum(axis=1)).ravel() + np.asarray(genres.sum(axis=1)).ravel()
+        scores = scores / (sizes[rows + start] + sizes[cols] - scores)
+    keep = scores > 0
+    rows, cols, scores = rows[keep], cols[keep], scores[keep]
+    order = np.lexsort((-scores, rows))
+    rows, cols, scores = rows[order], cols[order], scores[order]
+    rank = np.arange(len(rows)) - np.searchsorted(rows, rows)
+    keep = rank < top_k
+    return rows[keep] + start, cols[keep], scores[keep]
+
+
+def build(metric='cosine', top_k=20, chunk_size=1000, genre_weight=0.3):
+    """Function recomputes stored taste neighbors of all users and returns number of rows stored."""
+    user_ids, tracks, genres = load_matrices()
+    if tracks.nnz == 0:
+        TasteNeighbors.objects.all().delete()
+        return 0
+    features = build_features(tracks, genres, metric, genre_weight)
+    total = 0
+    for start in range(0, len(user_ids), chunk_size):
+        stop = min(start + chunk_size, len(user_ids))
+        rows, cols, scores = top_neighbors(features, start, stop, top_k, metric)
+        with transaction.atomic():
+            TasteNeighbors.objects.filter(user_id__in=user_ids[start:stop].tolist()).delete()
+            TasteNeighbors.objects.bulk_create(
+                [
+                    TasteNeighbors(user_id=user_id, neighbor_id=neighbor_id, score=score)
+                    for user_id, neighbor_id, score in zip(
+                        user_ids[rows].tolist(), user_ids[cols].tolist(), scores.tolist()
+                    )
+                ],
+                batch_size=1000
+            )
+        total += len(rows)
+    return total
@@ -0,0 +1,40 @@
+from django import template
+from django.utils.crypto import salted_hmac
+
+from .. import page_cache
+
+
+register = template.Library()
+
+# Rendered instead of CSRF token in cached fragments and replaced by token of current request.
+CSRF_PLACEHOLDER = salted_hmac('page_cache.csrf', 'placeholder').hexdigest()
+
+
+class CachedFragmentNode(template.Node):
+    def __init__(self, nodelist, values):
+        self.nodelist = nodelist
+        self.values = values
+
+    def render(self, context):
+        name, obj, *vary = [value.resolve(context) for value in self.values]
+
+        def load():
+            with context.push(csrf_token=CSRF_PLACEHOLDER):
+                return self.nodelist.render(context)
+
+        html = page_cache.cached(name, type(obj), obj.pk, load, vary)
+        return html.replace(CSRF_PLACEHOLDER, str(context.get('csrf_token', '')))
+
+
+@register.tag
+def cachedfragment(parser, token):
+    """Tag caches its content for current version of object.
+
+    Usage: {% cachedfragment name object [vary ...] %} ... {% endcachedfragment %}
+    """
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError('{} tag requires name and object'.format(bits[0]))
+    nodelist = parser.parse(('endcachedfragment',))
+    parser.delete_first_token()
+    return CachedFragmentNode(nodelist, [parser.compile_filter(bit) for bit in bits[1:]])
@@ -0,0 +1,72 @@
+import time
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from app import autocomplete
+from app.models import Artists, CustomUser, Tracks
+
+
+@override_settings(AUTOCOMPLETE={'REFRESH_INTERVAL': 0})
+class AutocompleteTest(TestCase):
+    def setUp(self):
+        autocomplete.reset()
+        self.addCleanup(autocomplete.reset)
+        linkin = Artists.objects.create(id_musixmatch=1, name='Linkin Park')
+        Artists.objects.create(id_musixmatch=2, name='Parkway Drive')
+        Tracks.objects.create(id_musixmatch=10, name='Numb', author=linkin)
+        Tracks.objects.create(id_musixmatch=11, name='Numb Encore', author=linkin)
+        CustomUser.objects.create(username='parker', email='parker@test.test')
+        self.url = reverse('autocomplete')
+
+    def test_name_starts_rank_before_word_starts(self):
+        response = self.client.get(self.url, {'q': 'Park'})
+        self.assertEqual(['Parkway Drive', 'Linkin Park'], [artist['name'] for artist in response.json()['artists']])
+        self.assertEqual(['parker'], [user['username'] for user in response.json()['users']])
+        self.assertEqual([], response.json()['tracks'])
+
+    def test_limit_and_short_prefix(self):
+        response = self.client.get(self.url, {'q': 'nu', 'limit': 1})
+        self.assertEqual([{'id_musixmatch': 10, 'name': 'Numb', 'artist': 'Linkin Park'}], response.json()['tracks'])
+        self.assertEqual([], self.client.get(self.url, {'q': 'n'}).json()['tracks'])
+
+    def test_new_rows_are_merged_and_cache_is_dropped(self):
+        index = autocomplete.get_index('tracks')
+        self.assertEqual(2, len(index.complete('numb')))
+        Tracks.objects.create(id_musixmatch=12, name='Numbers')
+        self.assertEqual(3, len(index.complete('numb')))
+
+    def test_lookup_is_fast(self):
+        index = autocomplete.get_index('artists')
+        index.complete('li')
+        started = time.perf_counter()
+        with override_settings(AUTOCOMPLETE={'REFRESH_INTERVAL': 60}):
+            for _ in range(100):
+                index.complete('lin')
+        self.assertLess((time.perf_counter() - started) / 100, 0.02)
+
+    def test_expired_index_is_rebuilt_in_background(self):
+        index = autocomplete.get_index('artists')
+        self.assertEqual(1, len(index.complete('linkin')))
+        Artists.objects.filter(id_musixmatch=1).update(name='Mike Shinoda')
+        with mock.patch('app.autocomplete.threading.Thread') as thread, \
+                override_settings(AUTOCOMPLETE={'REFRESH_INTERVAL': 0, 'REBUILD_INTERVAL': 0}):
+            self.assertEqual(1, len(index.complete('linkin')))
+            self.assertEqual(1, len(index.complete('linkin')))
+        thread.assert_called_once()
+        with mock.patch('app.autocomplete.connection.close'):
+            thread.call_args.kwargs['target']()
+        self.assertEqual([], index.complete('linkin'))
+        self.assertEqual(1, len(index.complete('shinoda')))
+
+    def test_warm_up_builds_indexes_before_lookups(self):
+        with mock.patch('app.autocomplete.threading.Thread') as thread:
+            autocomplete.warm_up()
+            self.assertEqual([], autocomplete.get_index('tracks').complete('numb'))
+        self.assertEqual(3, thread.call_count)
+        with mock.patch('app.autocomplete.connection.close'), self.assertNumQueries(3):
+            for call in thread.call_args_list:
+                call.kwargs['target']()
+        with self.assertNumQueries(0), override_settings(AUTOCOMPLETE={'REFRESH_INTERVAL': 60}):
+            self.assertEqual(2, len(autocomplete.get_index('tracks').complete('numb')))
@@ -0,0 +1,113 @@
+import json
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from app.models import CustomUser, FeedItems, Playlists, PlaylistHasTracks, Tracks, UserHasPlaylists, UserHasTracks
+
+
+class BatchManagerTest(TestCase):
+    def setUp(self):
+        self.me, self.other = [
+            CustomUser.objects.create(username='batch{}'.format(i), email='batch{}@test.test'.format(i))
+            for i in range(2)
+        ]
+        Tracks.objects.bulk_create([Tracks(id_musixmatch=i, name='track{}'.format(i)) for i in range(1, 61)])
+        self.playlist = Playlists.objects.create(name='mine', creator=self.me)
+        self.client.force_login(self.me)
+
+    def post(self, **data):
+        return self.client.post(reverse('batch_manager'), json.dumps(data), content_type='application/json')
+
+    def results(self, **data):
+        response = self.post(**data)
+        self.assertEqual(200, response.status_code)
+        return [(item['id'], item['result']) for item in response.json()['results']]
+
+    def playlist_order(self):
+        rows = PlaylistHasTracks.objects.filter(playlists=self.playlist).order_by('position', 'id')
+        return list(rows.values_list('tracks__id_musixmatch', flat=True))
+
+    def test_library_tracks(self):
+        self.assertEqual(
+            [(1, 'added'), (2, 'added'), (999, 'not_found')],
+            self.results(content='track', action='add', ids=[1, 2, 999, 2])
+        )
+        self.assertEqual([(2, 'exists'), (3, 'added')], self.results(content='track', action='add', ids=[2, 3]))
+        self.assertEqual([(1, 'removed'), (4, 'missing')], self.results(content='track', action='remove', ids=[1, 4]))
+        self.me.refresh_from_db()
+        self.assertEqual(2, self.me.tracks_count)
+        library = UserHasTracks.objects.filter(user=self.me).values_list('track__id_musixmatch', flat=True)
+        self.assertEqual({2, 3}, set(library))
+
+    def test_rows_added_meanwhile_do_not_fail_batch(self):
+        bulk_create = UserHasTracks.objects.bulk_create
+
+        def racing_bulk_create(objs, **kwargs):
+            UserHasTracks.objects.create(user=self.me, track_id=objs[0].track_id)
+            return bulk_create(objs, **kwargs)
+
+        with mock.patch.object(UserHasTracks.objects, 'bulk_create', racing_bulk_create):
+            self.assertEqual([(1, 'added'), (2, 'added')], self.results(content='track', action='add', ids=[1, 2]))
+        self.me.refresh_from_db()
+        self.assertEqual(2, self.me.tracks_count)
+        self.assertEqual(2, UserHasTracks.objects.filter(user=self.me).count())
+
+    def test_added_tracks_are_pushed_to_feeds(self):
+        self.other.follow(self.me)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post(content='track', action='add', ids=[1, 2, 3])
+        items = FeedItems.objects.filter(owner=self.other).order_by('activity_id')
+        self.assertEqual([1, 2, 3], [item.activity.track.id_musixmatch for item in items])
+
+    def test_query_count_does_not_depend_on_batch_size(self):
+        counts = []
+        for ids in [range(1, 6), range(6, 56)]:
+            with CaptureQueriesContext(connection) as queries:
+                self.post(content='track', action='add', ids=list(ids))
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_liked_playlists(self):
+        playlists = [Playlists.objects.create(name='p{}'.format(i), creator=self.other) for i in range(3)]
+        ids = [playlist.pk for playlist in playlists]
+        self.assertEqual(
+            [(ids[0], 'added'), (ids[1], 'added')], self.results(content='playlist', action='add', ids=ids[:2])
+        )
+        self.assertEqual(
+            [(ids[1], 'removed'), (ids[2], 'missing')], self.results(content='playlist', action='remove', ids=ids[1:])
+        )
+        self.assertEqual([1, 0, 0], [Playlists.objects.get(pk=pk).adds_count for pk in ids])
+        liked = UserHasPlaylists.objects.filter(user=self.me).values_list('playlist', flat=True)
+        self.assertEqual([ids[0]], list(liked))
+
+    def test_playlist_tracks_are_appended_removed_and_reordered(self):
+        edit = {'content': 'track', 'playlist': self.playlist.pk}
+        self.results(action='add', ids=[3, 1, 2], **edit)
+        self.assertEqual([(1, 'exists'), (5, 'added'), (4, 'added')], self.results(action='add', ids=[1, 5, 4], **edit))
+        self.assertEqual([3, 1, 2, 5, 4], self.playlist_order())
+        self.assertEqual([(2, 'removed')], self.results(action='remove', ids=[2], **edit))
+        self.assertEqual(
+            [(4, 'moved'), (9, 'not_found'), (1, 'moved')], self.results(action='reorder', ids=[4, 9, 1], **edit)
+        )
+        self.assertEqual([4, 1, 3, 5], self.playlist_order())
+        self.playlist.refresh_from_db()
+        self.assertEqual(4, self.playlist.tracks_count)
+        response = self.client.get(reverse('playlist', kwargs={'pk': self.playlist.pk}))
+        self.assertEqual(['track4', 'track1', 'track3', 'track5'], [track.name for track in response.context['tracks']])
+
+    def test_rejected_requests(self):
+        foreign = Playlists.objects.create(name='foreign', creator=self.other)
+        self.assertEqual(403, self.post(content='track', action='add', ids=[1], playlist=foreign.pk).status_code)
+        self.assertEqual(404, self.post(content='track', action='add', ids=[1], playlist=0).status_code)
+        self.assertEqual(400, self.post(content='playlist', action='reorder', ids=[1]).status_code)
+        self.assertEqual(400, self.post(content='track', action='add', ids=['x']).status_code)
+        for ids in ['5', 5, {'5': 5}, ['5'], [1.5], [True], None]:
+            with self.subTest(ids=ids):
+                self.assertEqual(400, self.post(content='track', action='add', ids=ids).status_code)
+        self.assertEqual(400, self.post(content='track', action='add', ids=list(range(501))).status_code)
+        self.assertEqual(405, self.client.get(reverse('batch_manager')).status_code)
+        self.assertFalse(PlaylistHasTracks.objects.exists())
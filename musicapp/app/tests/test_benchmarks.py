@@ -0,0 +1,21 @@
+from django.test import TestCase
+
+from app import benchmarks
+
+
+class BenchmarksTest(TestCase):
+    def test_scenarios_run_on_small_dataset(self):
+        report = benchmarks.run(scale=0.01, repeat=1)
+        self.assertEqual(set(benchmarks.SCENARIOS), set(report['results']))
+        for result in report['results'].values():
+            self.assertGreater(result['queries'], 0)
+            self.assertGreater(result['wall_ms'], 0)
+
+    def test_regressions_are_reported(self):
+        baseline = {'scale': 1, 'results': {'profile': {'wall_ms': 10, 'queries': 8, 'peak_kb': 100}}}
+        report = {'scale': 1, 'results': {'profile': {'wall_ms': 14, 'queries': 9, 'peak_kb': 100}}}
+        regressions = benchmarks.compare(report, baseline, time_tolerance=0.5)
+        self.assertEqual(1, len(regressions))
+        self.assertIn('queries 9', regressions[0])
+        with self.assertRaises(ValueError):
+            benchmarks.compare({'scale': 2, 'results': {}}, baseline)
@@ -0,0 +1,71 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from app import charts
+from app.models import ChartEntries, ChartSnapshots
+from app.musixmatch import MusixmatchError
+from app.tests.test_views import api_artist, api_payload, api_track
+
+
+class ChartsTest(TestCase):
+    def setUp(self):
+        patcher = mock.patch('app.charts.get_client')
+        self.upstream = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.upstream.refresh.side_effect = self.upstream_get
+        self.track_ids = [3, 1, 2]
+
+    def upstream_get(self, method, **params):
+        if method == 'chart.tracks.get':
+            return api_payload('track_list', [api_track(i, 'track{}'.format(i)) for i in self.track_ids])
+        return api_payload('artist_list', [api_artist(i, 'artist{}'.format(i)) for i in [5, 4]])
+
+    def test_refresh_saves_ranked_snapshot(self):
+        call_command('refresh_charts', stdout=StringIO())
+        self.track_ids = [2, 3]
+        charts.refresh(ChartSnapshots.TRACKS)
+        self.assertEqual(3, ChartSnapshots.objects.count())
+        with self.assertNumQueries(1):
+            entries = charts.latest_entries(ChartSnapshots.TRACKS)
+            self.assertEqual([(1, 'track2'), (2, 'track3')], [(entry.rank, entry.track.name) for entry in entries])
+        self.assertEqual(
+            ['artist5', 'artist4'],
+            [entry.artist.name for entry in charts.latest_entries(ChartSnapshots.ARTISTS)]
+        )
+
+    def test_views_read_snapshot_without_upstream(self):
+        charts.refresh(ChartSnapshots.TRACKS)
+        self.upstream.refresh.reset_mock()
+        response = self.client.get(reverse('top_tracks'))
+        self.assertContains(response, '1. Название: track3')
+        self.upstream.refresh.assert_not_called()
+
+    def test_view_fetches_chart_once_when_no_snapshot(self):
+        response = self.client.get(reverse('top_artists'))
+        self.assertContains(response, '1. artist5')
+        self.assertEqual(1, ChartEntries.objects.filter(rank=2).count())
+
+    def test_failed_upstream_renders_empty_chart(self):
+        self.upstream.refresh.side_effect = MusixmatchError
+        response = self.client.get(reverse('top_tracks'))
+        self.assertContains(response, 'Данные по трекам отсутствуют')
+        stderr = StringIO()
+        call_command('refresh_charts', '--kind', 'tracks', stdout=StringIO(), stderr=stderr)
+        self.assertIn('Failed to refresh tracks chart', stderr.getvalue())
+
+    def test_failed_refresh_keeps_previous_snapshot(self):
+        charts.refresh(ChartSnapshots.TRACKS)
+        for payload in [{'message': {'header': {'status_code': 401}, 'body': ''}}, api_payload('track_list', [])]:
+            self.upstream.refresh.side_effect = lambda method, **params: payload
+            with self.assertRaises(ValueError):
+                charts.refresh(ChartSnapshots.TRACKS)
+        self.assertEqual(1, ChartSnapshots.objects.count())
+        self.upstream.refresh.reset_mock()
+        for _ in range(3):
+            response = self.client.get(reverse('top_tracks'))
+            self.assertContains(response, '1. Название: track3')
+        self.upstream.refresh.assert_not_called()
@@ -0,0 +1,79 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from app.models import CustomUser, Playlists, Tracks
+
+
+class ConditionalPagesTest(TestCase):
+    def setUp(self):
+        self.me, self.other = [
+            CustomUser.objects.create(username='cond{}'.format(i), email='cond{}@test.test'.format(i))
+            for i in range(2)
+        ]
+        self.track = Tracks.objects.create(id_musixmatch=1, name='track')
+        self.playlist = Playlists.objects.create(name='playlist', creator=self.other)
+        self.client.force_login(self.me)
+
+    def get(self, url, **headers):
+        return self.client.get(url, headers=headers)
+
+    def assert_changed(self, url, etag):
+        """Method reads page once to show pending messages, then checks its ETag changed."""
+        self.get(url)
+        response = self.get(url, if_none_match=etag)
+        self.assertEqual(200, response.status_code)
+        self.assertNotEqual(etag, response['ETag'])
+        return response['ETag']
+
+    def test_unchanged_playlist_is_not_rendered(self):
+        url = reverse('playlist', kwargs={'pk': self.playlist.pk})
+        response = self.get(url)
+        self.assertIn('private', response['Cache-Control'])
+        etag = response['ETag']
+        with self.assertNumQueries(3):
+            response = self.get(url, if_none_match=etag)
+        self.assertEqual(304, response.status_code)
+        self.assertEqual([], response.templates)
+        self.assertEqual(etag, response['ETag'])
+        response = self.get(url, if_modified_since=response['Last-Modified'])
+        self.assertEqual(304, response.status_code)
+
+    def test_playlist_mutations_change_etag(self):
+        url = reverse('playlist', kwargs={'pk': self.playlist.pk})
+        etag = self.get(url)['ETag']
+        self.client.post(url, {'message': 'hello', 'add_comment': ''})
+        etag = self.assert_changed(url, etag)
+        comment = self.playlist.comments_set.get()
+        self.client.post(url, {'comment_id': comment.pk, 'delete_comment': ''})
+        etag = self.assert_changed(url, etag)
+        self.client.post(reverse('manager'), {'content': 'playlist', 'pk': self.playlist.pk, 'add': ''})
+        self.assert_changed(url, etag)
+
+    def test_etag_depends_on_viewer(self):
+        url = reverse('playlist', kwargs={'pk': self.playlist.pk})
+        etag = self.get(url)['ETag']
+        self.client.force_login(self.other)
+        self.assertEqual(200, self.get(url, if_none_match=etag).status_code)
+
+    def test_pending_messages_are_rendered(self):
+        url = reverse('profile')
+        etag = self.get(url)['ETag']
+        self.client.post(reverse('manager'), {'content': 'track', 'pk': 1, 'delete': ''})
+        response = self.get(url, if_none_match=etag)
+        self.assertEqual(200, response.status_code)
+        self.assertNotIn('ETag', response)
+        self.assertEqual(304, self.get(url, if_none_match=etag).status_code)
+
+    def test_profile_mutations_change_etag(self):
+        url = reverse('profile')
+        etag = self.get(url)['ETag']
+        self.client.post(reverse('manager'), {'content': 'track', 'pk': 1, 'add': ''})
+        etag = self.assert_changed(url, etag)
+        self.client.post(reverse('create_playlist'), {'name': 'mine', 'description': '', 'creator': self.me.pk})
+        etag = self.assert_changed(url, etag)
+
+        other_url = reverse('user', kwargs={'pk': self.other.pk})
+        other_etag = self.get(other_url)['ETag']
+        self.client.post(other_url, {'user': self.other.pk, 'follow': ''})
+        self.assert_changed(other_url, other_etag)
+        self.assert_changed(url, etag)
@@ -0,0 +1,56 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from app.models import Comments, CustomUser, Playlists, Tracks
+
+
+class CountersTest(TestCase):
+    def setUp(self):
+        self.users = [
+            CustomUser.objects.create(username='counter{}'.format(i), email='counter{}@test.test'.format(i))
+            for i in range(3)
+        ]
+        self.track = Tracks.objects.create(id_musixmatch=1, name='track')
+        self.playlist = Playlists.objects.create(name='playlist', creator=self.users[0])
+
+    def counts(self, obj, *names):
+        obj.refresh_from_db()
+        return [getattr(obj, name) for name in names]
+
+    def test_follow_counters(self):
+        me, first, second = self.users
+        me.follow(first)
+        me.follow(first)
+        me.follow(second)
+        first.follow(second)
+        self.assertEqual([0, 2], self.counts(me, 'followers_count', 'following_count'))
+        self.assertEqual([2, 0], self.counts(second, 'followers_count', 'following_count'))
+        me.unfollow(second)
+        me.unfollow(second)
+        self.assertEqual([1, 0], self.counts(second, 'followers_count', 'following_count'))
+        self.assertEqual([0, 1], self.counts(me, 'followers_count', 'following_count'))
+
+    def test_views_keep_counters(self):
+        client = Client()
+        client.force_login(self.users[1])
+        for action in ['add', 'add', 'delete', 'add']:
+            client.post(reverse('manager'), {'content': 'track', 'pk': 1, action: ''})
+            client.post(reverse('manager'), {'content': 'playlist', 'pk': self.playlist.pk, action: ''})
+        url = reverse('playlist', kwargs={'pk': self.playlist.pk})
+        client.post(url, {'add_comment': '', 'message': 'first'})
+        client.post(url, {'add_comment': '', 'message': 'second'})
+        client.post(url, {'delete_comment': '', 'comment_id': Comments.objects.first().pk})
+        self.assertEqual([1], self.counts(self.users[1], 'tracks_count'))
+        self.assertEqual([1, 1], self.counts(self.playlist, 'adds_count', 'comments_count'))
+
+    def test_reconcile_fixes_drifted_counters(self):
+        self.users[0].following.add(self.users[1])
+        self.playlist.tracks.add(self.track)
+        CustomUser.objects.filter(pk=self.users[0].pk).update(tracks_count=5)
+        call_command('reconcile_counters', '--batch-size', '2', stdout=StringIO())
+        self.assertEqual([0, 1, 0], self.counts(self.users[0], 'followers_count', 'following_count', 'tracks_count'))
+        self.assertEqual([1], self.counts(self.users[1], 'followers_count'))
+        self.assertEqual([1, 0], self.counts(self.playlist, 'tracks_count', 'adds_count'))
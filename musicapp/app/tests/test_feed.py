@@ -0,0 +1,72 @@
+from django.core.exceptions import BadRequest
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from app import feed
+from app.models import Activities, CustomUser, FeedItems, Playlists
+from app.pagination import encode_cursor
+
+
+@override_settings(FEED={'CELEBRITY_FOLLOWERS': 3, 'BACKFILL': 2})
+class FeedTest(TestCase):
+    def setUp(self):
+        self.me, self.friend, self.star, *fans = [
+            CustomUser.objects.create(username='feed{}'.format(i), email='feed{}@test.test'.format(i))
+            for i in range(5)
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            for user in [self.me, *fans]:
+                user.follow(self.star)
+            self.me.follow(self.friend)
+        self.star.refresh_from_db()
+
+    def create_playlists(self, user, count):
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(user.playlists.count(), user.playlists.count() + count):
+                playlist = Playlists.objects.create(name='{}-{}'.format(user.username, i), creator=user)
+                feed.record(user, Activities.PLAYLIST_CREATED, playlist=playlist)
+
+    def test_activities_are_pushed_unless_actor_is_celebrity(self):
+        self.create_playlists(self.friend, 1)
+        self.create_playlists(self.star, 1)
+        self.assertEqual(1, FeedItems.objects.filter(owner=self.me, activity__actor=self.friend).count())
+        self.assertFalse(FeedItems.objects.filter(activity__actor=self.star).exists())
+        names = [activity.playlist.name for activity in feed.get_feed(self.me)]
+        self.assertEqual(['feed2-0', 'feed1-0'], names)
+
+    def test_pages_merge_pushed_and_pulled_activities(self):
+        for _ in range(4):
+            self.create_playlists(self.friend, 2)
+            self.create_playlists(self.star, 3)
+        expected = list(
+            Activities.objects.filter(actor__in=[self.friend, self.star]).order_by('-id').values_list('id', flat=True)
+        )
+        with self.assertNumQueries(2):
+            first = feed.get_feed(self.me, page_size=15)
+        with self.assertNumQueries(2):
+            second = feed.get_feed(self.me, first.next_cursor, page_size=15)
+        self.assertIsNone(second.next_cursor)
+        self.assertEqual(expected, [activity.id for activity in [*first, *second]])
+
+    def test_follow_backfills_and_unfollow_removes_activities(self):
+        self.create_playlists(self.friend, 3)
+        other = CustomUser.objects.get(username='feed3')
+        with self.captureOnCommitCallbacks(execute=True):
+            other.follow(self.friend)
+        self.assertEqual(2, FeedItems.objects.filter(owner=other, activity__actor=self.friend).count())
+        other.unfollow(self.friend)
+        self.assertFalse(FeedItems.objects.filter(owner=other, activity__actor=self.friend).exists())
+
+    def test_feed_page_is_rendered(self):
+        self.create_playlists(self.friend, 1)
+        self.client.force_login(self.me)
+        response = self.client.get(reverse('feed'))
+        self.assertContains(response, 'создал плейлист')
+        self.assertContains(response, 'feed1-0')
+
+    def test_cursor_must_hold_activity_id(self):
+        for values in [[{'a': 1}], ['12'], [True], [1.5]]:
+            with self.subTest(values=values), self.assertRaises(BadRequest):
+                feed.get_feed(self.me, encode_cursor(values))
+        self.client.force_login(self.me)
+        self.assertEqual(400, self.client.get(reverse('feed'), {'cursor': encode_cursor([{'a': 1}])}).status_code)
@@ -0,0 +1,40 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from app.management.commands.explain_queries import full_scans
+from app.models import CustomUser, Playlists, Tracks, UserHasTracks
+
+
+class IndexesTest(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create(username='indexed', email='indexed@test.test')
+        self.track = Tracks.objects.create(id_musixmatch=1, name='track')
+        Playlists.objects.create(name='playlist', creator=self.user)
+
+    def test_track_is_added_once(self):
+        UserHasTracks.objects.create(user=self.user, track=self.track)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            UserHasTracks.objects.create(user=self.user, track=self.track)
+        client = Client()
+        client.force_login(self.user)
+        response = client.post(reverse('manager'), {'content': 'track', 'pk': 1, 'add': ''}, follow=True)
+        self.assertContains(response, 'уже был добавлен ранее')
+        self.assertEqual(1, UserHasTracks.objects.count())
+
+    def test_hot_queries_use_indexes(self):
+        out = StringIO()
+        call_command('explain_queries', '--strict', stdout=out)
+        self.assertNotIn('FULL SCAN', out.getvalue())
+        self.assertIn('ok followers of user', out.getvalue())
+
+    def test_full_scans_are_recognized(self):
+        plan = '2 0 0 SCAN app_comments\n5 0 0 SCAN U0 USING COVERING INDEX comments_playlist_created'
+        self.assertEqual(['2 0 0 SCAN app_comments'], full_scans(plan, 'sqlite'))
+        self.assertEqual(
+            ['-> Table scan on app_comments'],
+            full_scans('-> Limit: 21 row(s)\n    -> Table scan on app_comments', 'mysql')
+        )
@@ -0,0 +1,89 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from app import ingestion
+from app.ingestion import IngestionQueue, enqueue, ingest
+from app.mixins import APIDataMixins
+from app.models import Albums, Artists, CustomUser, Genres, IngestionTask, Tracks
+from app.tests.test_views import api_artist, api_payload, api_track
+
+
+def track_rows(ids):
+    response = api_payload('track_list', [
+        api_track(track_id, artist_id=track_id % 3, album_id=track_id % 4, genres=[track_id % 2, 5])
+        for track_id in ids
+    ])
+    return APIDataMixins(response).get_data()
+
+
+class IngestTest(TestCase):
+    def test_tracks_are_saved_with_relations(self):
+        ingest(track_rows([1, 2, 3]))
+        self.assertEqual(3, Tracks.objects.count())
+        self.assertEqual(3, Albums.objects.count())
+        self.assertEqual(3, Artists.objects.count())
+        self.assertEqual(3, Genres.objects.count())
+        track = Tracks.objects.get(id_musixmatch=2)
+        self.assertEqual(2, track.album.id_musixmatch)
+        self.assertEqual(2, track.author.id_musixmatch)
+        self.assertEqual({0, 5}, set(track.genres.values_list('id_musixmatch', flat=True)))
+
+    def test_known_rows_are_skipped(self):
+        Tracks.objects.create(id_musixmatch=1, name='kept')
+        ingest(track_rows([1, 2]))
+        ingest(APIDataMixins(api_payload('artist_list', [api_artist(2), api_artist(7)])).get_data())
+        self.assertEqual('kept', Tracks.objects.get(id_musixmatch=1).name)
+        self.assertEqual(2, Tracks.objects.count())
+        self.assertEqual({2, 7}, set(Artists.objects.values_list('id_musixmatch', flat=True)))
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        def unique_rows(ids):
+            response = api_payload('track_list', [
+                api_track(track_id, artist_id=track_id, album_id=track_id, genres=[track_id])
+                for track_id in ids
+            ])
+            return APIDataMixins(response).get_data()
+
+        with CaptureQueriesContext(connection) as small:
+            ingest(unique_rows(range(2)))
+        with CaptureQueriesContext(connection) as large:
+            ingest(unique_rows(range(100, 150)))
+        self.assertEqual(len(small), len(large))
+
+
+class IngestionQueueTest(TestCase):
+    def test_rows_are_deduplicated_until_flush(self):
+        queue = IngestionQueue(batch_size=100, flush_interval=3600)
+        queue.put(track_rows([1, 2]))
+        queue.put(track_rows([2, 3]))
+        self.assertFalse(Tracks.objects.exists())
+        self.assertEqual(3, len(queue._pending))
+        queue.flush()
+        self.assertEqual(3, Tracks.objects.count())
+
+    @override_settings(INGESTION={'BACKEND': 'command', 'BATCH_SIZE': 2})
+    def test_command_backend_is_drained_by_worker(self):
+        enqueue(track_rows([1, 2]))
+        enqueue(track_rows([2, 3]))
+        enqueue(track_rows([4]))
+        self.assertEqual(3, IngestionTask.objects.count())
+        call_command('ingest_worker', '--once', stdout=StringIO())
+        self.assertFalse(IngestionTask.objects.exists())
+        self.assertEqual(4, Tracks.objects.count())
+
+    @override_settings(INGESTION={'BACKEND': 'thread'})
+    def test_content_manager_flushes_queued_track(self):
+        user = CustomUser.objects.create(username='test1', email='test@test.test')
+        client = Client()
+        client.force_login(user)
+        queue = IngestionQueue(batch_size=100, flush_interval=3600)
+        queue.put(track_rows([7]))
+        original_queue, ingestion._queue = ingestion._queue, queue
+        self.addCleanup(setattr, ingestion, '_queue', original_queue)
+        client.post(reverse('manager'), {'content': 'track', 'pk': 7, 'add': ''})
+        self.assertTrue(user.added_tracks.filter(id_musixmatch=7).exists())
@@ -0,0 +1,249 @@
+import os
+import tempfile
+import threading
+import time
+from unittest import mock
+
+import requests
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from app.mixins import APIDataMixins
+from app.musixmatch import (
+    CachedMusixmatchClient, CassetteMiss, CassetteMusixmatchClient, CircuitBreaker, GuardedMusixmatchClient,
+    MusixmatchClient, MusixmatchError, MusixmatchUnavailable, RateLimiter, fetch_many, get_client
+)
+from app.musixmatch.cache import make_key
+from app.musixmatch.stub import StubServer
+
+
+OK_PAYLOAD = {'message': {'header': {'status_code': 200}, 'body': {'track_list': []}}}
+
+
+class MusixmatchClientTest(SimpleTestCase):
+    def setUp(self):
+        self.client = MusixmatchClient('https://api.test/ws/1.1', 'key')
+
+    def test_query_params_are_encoded_by_session(self):
+        with mock.patch.object(self.client.session, 'get') as session_get:
+            session_get.return_value.json.return_value = {'message': {}}
+            self.client.get('track.search', q_track='AC/DC & friends', page=1)
+        session_get.assert_called_once_with(
+            'https://api.test/ws/1.1/track.search',
+            params={'q_track': 'AC/DC & friends', 'page': 1, 'apikey': 'key'},
+            timeout=self.client.timeout
+        )
+
+    def test_transport_errors_are_wrapped(self):
+        with mock.patch.object(self.client.session, 'get', side_effect=requests.Timeout):
+            with self.assertRaises(MusixmatchError):
+                self.client.get('chart.artists.get')
+
+    def test_shared_client_follows_settings(self):
+        with override_settings(MUSIXMATCH={'BASE_URL': 'https://one.test/', 'API_KEY': 'a'}):
+            client = get_client()
+            self.assertIs(client, get_client())
+            self.assertEqual('https://one.test/', client.base_url)
+        with override_settings(MUSIXMATCH={'BASE_URL': 'https://two.test/', 'CACHE_ALIAS': 'musixmatch'}):
+            self.assertIsInstance(get_client(), CachedMusixmatchClient)
+            self.assertEqual('https://two.test/', get_client().client.base_url)
+        with override_settings(MUSIXMATCH={'RATE_LIMIT': 5, 'CACHE_ALIAS': 'musixmatch'}):
+            self.assertIsInstance(get_client().client, GuardedMusixmatchClient)
+
+
+class CachedMusixmatchClientTest(SimpleTestCase):
+    def setUp(self):
+        caches['musixmatch'].clear()
+        self.upstream = mock.Mock(timeout=(1, 1))
+        self.upstream.get.return_value = OK_PAYLOAD
+        self.client = CachedMusixmatchClient(self.upstream, 'musixmatch', ttls={'chart.tracks.get': 60})
+
+    def test_equal_queries_share_cache_entry(self):
+        self.assertEqual(
+            make_key('track.search', {'q_track': '  Daft   Punk', 'page': 1, 'apikey': 'x'}),
+            make_key('track.search', {'page': 1, 'q_track': 'daft punk'})
+        )
+        self.client.get('track.search', q_track='Daft Punk', page=1)
+        self.client.get('track.search', q_track='daft punk ', page=1)
+        self.assertEqual(1, self.upstream.get.call_count)
+
+    def test_failed_payloads_are_not_cached(self):
+        self.upstream.get.return_value = {'message': {'header': {'status_code': 401}, 'body': []}}
+        self.client.get('chart.tracks.get')
+        self.client.get('chart.tracks.get')
+        self.assertEqual(2, self.upstream.get.call_count)
+
+    def test_stale_entry_is_served_while_revalidated(self):
+        self.client.ttls = {'chart.tracks.get': 0}
+        self.client.get('chart.tracks.get')
+        fresh = {'message': {'header': {'status_code': 200}, 'body': {'track_list': [1]}}}
+        self.upstream.get.return_value = fresh
+        self.assertEqual(OK_PAYLOAD, self.client.get('chart.tracks.get'))
+        for _ in range(50):
+            if self.upstream.get.call_count == 2:
+                break
+            time.sleep(0.01)
+        self.assertEqual(2, self.upstream.get.call_count)
+
+    def test_concurrent_misses_are_coalesced(self):
+        release = threading.Event()
+
+        def slow_get(method, **params):
+            release.wait(1)
+            return OK_PAYLOAD
+
+        self.upstream.get.side_effect = slow_get
+        threads = [threading.Thread(target=self.client.get, args=('artist.search',)) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(1, self.upstream.get.call_count)
+
+
+class FetchManyTest(SimpleTestCase):
+    def test_slow_and_failed_calls_are_dropped_by_deadline(self):
+        release = threading.Event()
+
+        def upstream_get(method, **params):
+            if method == 'slow':
+                release.wait(1)
+            elif method == 'broken':
+                raise MusixmatchError(method)
+            return OK_PAYLOAD
+
+        with mock.patch('app.musixmatch.fanout.get_client') as get_client_mock:
+            get_client_mock.return_value.get.side_effect = upstream_get
+            started = time.monotonic()
+            results = fetch_many(
+                {'fast': ('fast', {}), 'slow': ('slow', {}), 'broken': ('broken', {})},
+                deadline=0.1
+            )
+            release.set()
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual({'fast': OK_PAYLOAD, 'slow': None, 'broken': None}, results)
+
+
+class RateLimiterTest(SimpleTestCase):
+    def setUp(self):
+        caches['default'].clear()
+
+    def test_tokens_run_out_within_window(self):
+        limiter = RateLimiter(caches['default'], 'test:rate', rate=2, period=60)
+        self.assertEqual([True, True, False], [limiter.acquire() for _ in range(3)])
+
+
+class GuardedMusixmatchClientTest(SimpleTestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.upstream = mock.Mock(timeout=(1, 1))
+        self.upstream.get.side_effect = MusixmatchError('down')
+        self.breaker = CircuitBreaker(caches['default'], 'test:circuit', threshold=2, cooldown=60)
+        self.client = GuardedMusixmatchClient(self.upstream, breaker=self.breaker)
+
+    def test_circuit_opens_after_consecutive_failures(self):
+        for _ in range(2):
+            with self.assertRaises(MusixmatchError):
+                self.client.get('chart.tracks.get')
+        with self.assertRaises(MusixmatchUnavailable):
+            self.client.get('chart.tracks.get')
+        self.assertTrue(self.breaker.is_open())
+        self.assertEqual(2, self.upstream.get.call_count)
+
+    def test_server_errors_count_as_failures(self):
+        self.upstream.get.side_effect = None
+        self.upstream.get.return_value = {'message': {'header': {'status_code': 503}, 'body': []}}
+        self.client.get('chart.tracks.get')
+        self.client.get('chart.tracks.get')
+        self.assertTrue(self.breaker.is_open())
+
+    def test_single_probe_closes_circuit_after_cooldown(self):
+        for _ in range(2):
+            with self.assertRaises(MusixmatchError):
+                self.client.get('chart.tracks.get')
+        self.upstream.get.side_effect = None
+        self.upstream.get.return_value = OK_PAYLOAD
+        with mock.patch('app.musixmatch.limits.time.time', return_value=time.time() + 61):
+            self.assertFalse(self.breaker.is_open())
+            self.assertEqual(OK_PAYLOAD, self.client.get('chart.tracks.get'))
+        self.assertTrue(self.breaker.allow())
+
+    def test_concurrent_callers_wait_while_probe_is_running(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        with mock.patch('app.musixmatch.limits.time.time', return_value=time.time() + 61):
+            self.assertTrue(self.breaker.allow())
+            self.assertFalse(self.breaker.allow())
+
+    def test_rate_limited_calls_do_not_reach_upstream(self):
+        self.client.breaker = None
+        self.client.limiter = RateLimiter(caches['default'], 'test:rate', rate=0, period=60)
+        with self.assertRaises(MusixmatchUnavailable):
+            self.client.get('track.search')
+        self.upstream.get.assert_not_called()
+
+
+class CassetteMusixmatchClientTest(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'cassette.json')
+        self.upstream = mock.Mock(timeout=(1, 1))
+        self.upstream.get.return_value = OK_PAYLOAD
+
+    def test_recorded_calls_are_replayed_offline(self):
+        recorder = CassetteMusixmatchClient(self.upstream, self.path, mode='record')
+        recorder.get('track.search', q_track='Numb', page=1, apikey='secret')
+        recorder.get('track.search', q_track='numb ', page=1)
+        self.assertEqual(1, self.upstream.get.call_count)
+        with open(self.path) as file:
+            self.assertNotIn('secret', file.read())
+
+        offline = mock.Mock()
+        player = CassetteMusixmatchClient(offline, self.path)
+        self.assertEqual(OK_PAYLOAD, player.get('track.search', q_track='NUMB', page=1))
+        with self.assertRaises(MusixmatchError):
+            player.get('artist.search', q_artist='Numb')
+        offline.get.assert_not_called()
+
+    def test_replay_misses_do_not_trip_guard(self):
+        CassetteMusixmatchClient(self.upstream, self.path, mode='record').get('track.search', q_track='numb')
+        caches['default'].clear()
+        self.addCleanup(caches['default'].clear)
+        settings = {'CASSETTE': self.path, 'RATE_LIMIT': 2, 'RATE_PERIOD': 60, 'BREAKER_THRESHOLD': 2}
+        with override_settings(MUSIXMATCH=settings):
+            client = get_client()
+            for page in range(5):
+                with self.assertRaises(CassetteMiss):
+                    client.get('artist.search', q_artist='numb', page=page)
+            for _ in range(3):
+                self.assertEqual(OK_PAYLOAD, client.get('track.search', q_track='numb'))
+
+
+class StubServerTest(SimpleTestCase):
+    def setUp(self):
+        self.server = StubServer().start()
+        self.addCleanup(self.server.stop)
+        self.client = MusixmatchClient(self.server.url, 'key', retries=0)
+        self.addCleanup(self.client.close)
+
+    def test_generated_payloads_are_stable_and_readable(self):
+        for method, params in [
+            ('track.search', {'q_track': 'numb', 'page_size': 3}),
+            ('artist.search', {'q_artist': 'numb', 'page_size': 3}),
+            ('chart.tracks.get', {'chart_name': 'mxmweekly', 'page_size': 6}),
+            ('chart.artists.get', {'page_size': 7}),
+        ]:
+            payload = self.client.get(method, **params)
+            self.assertEqual(payload, self.client.get(method, **params))
+            self.assertEqual(params['page_size'], len(APIDataMixins(payload).get_data()))
+
+    def test_injected_errors_and_cassette(self):
+        self.server.error_rate = 1
+        with self.assertRaises(MusixmatchError):
+            self.client.get('track.search', q_track='numb')
+        self.server.error_rate = 0
+        self.server.interactions = {make_key('track.search', {'q_track': 'numb'}): {'response': OK_PAYLOAD}}
+        self.assertEqual(OK_PAYLOAD, self.client.get('track.search', q_track='Numb'))
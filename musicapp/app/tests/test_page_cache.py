@@ -0,0 +1,100 @@
+import re
+
+from django.core.cache import caches
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from app import page_cache
+from app.models import Comments, CustomUser, Playlists
+from app.templatetags.page_cache import CSRF_PLACEHOLDER
+
+
+class PageCacheTest(TestCase):
+    def setUp(self):
+        caches['pages'].clear()
+        page_cache.reset()
+        self.addCleanup(page_cache.reset)
+        self.me, self.other, self.third = [
+            CustomUser.objects.create(username='cache{}'.format(i), email='cache{}@test.test'.format(i))
+            for i in range(3)
+        ]
+        self.other.follow(self.third)
+        self.playlist = Playlists.objects.create(name='playlist', creator=self.other)
+        self.client.force_login(self.me)
+
+    def comment(self, user, message):
+        comment = Comments.objects.create(author=user, playlist=self.playlist, message=message)
+        Playlists.objects.filter(pk=self.playlist.pk).update(comments_count=self.playlist.comments_set.count())
+        page_cache.bump(Playlists, [self.playlist.pk])
+        return comment
+
+    def test_repeated_profile_is_served_from_cache(self):
+        url = reverse('user', kwargs={'pk': self.other.pk})
+        self.client.get(url)
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        self.assertContains(response, 'Подписки (1)')
+        self.assertContains(response, 'cache2')
+        stats = page_cache.stats()
+        self.assertEqual({'hits': 1, 'misses': 1}, stats['profile'])
+        self.assertEqual({'hits': 1, 'misses': 1}, stats['following'])
+
+    def test_follow_invalidates_profiles(self):
+        url = reverse('user', kwargs={'pk': self.third.pk})
+        self.assertNotContains(self.client.get(url), 'cache0')
+        self.client.post(url, {'user': self.third.pk, 'follow': ''})
+        response = self.client.get(url)
+        self.assertContains(response, 'Подписчики (2)')
+        self.assertContains(response, 'cache0')
+
+    def test_comments_vary_by_viewer_and_are_invalidated(self):
+        url = reverse('playlist', kwargs={'pk': self.playlist.pk})
+        self.comment(self.third, 'first')
+        self.assertNotContains(self.client.get(url), 'delete_comment')
+        self.client.force_login(self.third)
+        self.assertContains(self.client.get(url), 'delete_comment')
+        comment = self.comment(self.me, 'second')
+        self.assertContains(self.client.get(url), 'second')
+        self.client.post(url, {'comment_id': comment.pk, 'delete_comment': ''})
+        self.assertNotContains(self.client.get(url), 'second')
+
+    def test_cached_fragments_get_csrf_token_of_request(self):
+        comment = self.comment(self.me, 'mine')
+        url = reverse('playlist', kwargs={'pk': self.playlist.pk})
+        self.client.get(url)
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.me)
+        response = client.get(url)
+        self.assertEqual(1, page_cache.stats()['comments']['hits'])
+        self.assertNotContains(response, CSRF_PLACEHOLDER)
+        token = re.findall(r'name="csrfmiddlewaretoken" value="([^"]+)"', response.content.decode())[-1]
+        response = client.post(url, {'csrfmiddlewaretoken': token, 'comment_id': comment.pk, 'delete_comment': ''})
+        self.assertEqual(302, response.status_code)
+        self.assertFalse(Comments.objects.filter(pk=comment.pk).exists())
+
+    def test_evicted_version_is_not_reused(self):
+        load = [1, 2].pop
+        self.assertEqual(2, page_cache.cached('value', CustomUser, self.me.pk, load))
+        self.assertEqual(2, page_cache.cached('value', CustomUser, self.me.pk, load))
+        caches['pages'].delete(page_cache.version_key(CustomUser, self.me.pk))
+        self.assertEqual(1, page_cache.cached('value', CustomUser, self.me.pk, load))
+
+    @override_settings(PAGE_CACHE={'ENABLED': False})
+    def test_disabled_cache_always_loads(self):
+        load = [1, 2].pop
+        self.assertEqual(2, page_cache.cached('value', CustomUser, self.me.pk, load))
+        self.assertEqual(1, page_cache.cached('value', CustomUser, self.me.pk, load))
+        self.assertEqual({}, page_cache.stats())
+
+    def test_metrics_are_staff_only(self):
+        self.client.get(reverse('profile'))
+        self.assertEqual(302, self.client.get(reverse('cache_metrics')).status_code)
+        self.me.is_staff = True
+        self.me.save()
+        self.assertEqual({'hits': 0, 'misses': 1}, self.client.get(reverse('cache_metrics')).json()['profile'])
+
+    def test_cached_objects_hold_only_shown_fields(self):
+        user = self.client.get(reverse('user', kwargs={'pk': self.other.pk})).context['user']
+        self.assertTrue({'password', 'email'} <= user.get_deferred_fields())
+        playlist = self.client.get(reverse('playlist', kwargs={'pk': self.playlist.pk})).context['playlist']
+        self.assertTrue({'password', 'email'} <= playlist.creator.get_deferred_fields())
@@ -0,0 +1,62 @@
+from django.core.exceptions import BadRequest
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from app.models import Comments, CustomUser, Playlists
+from app.pagination import encode_cursor, paginate
+
+
+class KeysetPaginationTest(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create(username='test1', email='test@test.test')
+        self.playlist = Playlists.objects.create(name='test', creator=self.user)
+        Comments.objects.bulk_create([
+            Comments(message='comment{}'.format(i), author=self.user, playlist=self.playlist)
+            for i in range(7)
+        ])
+        same_time = timezone.now()
+        Comments.objects.filter(id__in=Comments.objects.order_by('id').values('id')[2:5]).update(created_at=same_time)
+
+    def test_pages_cover_collection_once_in_order(self):
+        expected = list(Comments.objects.order_by('created_at', 'id'))
+        collected = []
+        cursor = None
+        for _ in range(5):
+            page = paginate(Comments.objects.all(), ('created_at', 'id'), cursor, page_size=3)
+            collected += page.items
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        self.assertEqual(expected, collected)
+
+    def test_descending_ordering_and_attr(self):
+        page = paginate(Comments.objects.select_related('author'), ('-id',), page_size=2, attr='author')
+        self.assertEqual([self.user, self.user], page.items)
+        next_page = paginate(Comments.objects.all(), ('-id',), page.next_cursor, page_size=10)
+        self.assertEqual(5, len(next_page))
+        self.assertIsNone(next_page.next_cursor)
+
+    def test_malformed_cursor(self):
+        with self.assertRaises(BadRequest):
+            paginate(Comments.objects.all(), ('id',), 'not-a-cursor')
+
+    def test_well_formed_cursor_with_wrong_values(self):
+        for values in [['xx', 'yy'], [{'a': 1}, 1], [None, 1], ['2026-01-01T00:00:00', 'yy']]:
+            with self.subTest(values=values), self.assertRaises(BadRequest):
+                paginate(Comments.objects.all(), ('created_at', 'id'), encode_cursor(values))
+        url = reverse('user_collection', kwargs={'pk': self.user.pk, 'collection': 'tracks'})
+        self.assertEqual(400, self.client.get(url, {'cursor': encode_cursor(['xx', 'yy'])}).status_code)
+
+    def test_load_more_endpoints(self):
+        url = reverse('playlist_collection', kwargs={'pk': self.playlist.pk, 'collection': 'comments'})
+        first = self.client.get(reverse('playlist', kwargs={'pk': self.playlist.pk}))
+        self.assertEqual(7, len(first.context['comments']))
+        response = self.client.get(url, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertContains(response, 'comment6')
+        self.assertEqual(400, self.client.get(url, {'cursor': 'broken'}).status_code)
+        self.assertEqual(404, self.client.get(
+            reverse('user_collection', kwargs={'pk': self.user.pk, 'collection': 'password'})
+        ).status_code)
+        followers = self.client.get(reverse('user_collection', kwargs={'pk': self.user.pk, 'collection': 'followers'}))
+        self.assertEqual(200, followers.status_code)
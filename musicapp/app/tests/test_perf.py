@@ -0,0 +1,62 @@
+import re
+
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from app import perf
+from app.models import CustomUser
+from app.musixmatch.stub import StubServer
+
+
+def server_timing(response):
+    """Function returns Server-Timing entries as name: (duration, description)."""
+    entries = re.findall(r'(\w+);dur=([\d.]+)(?:;desc="([^"]*)")?', response['Server-Timing'])
+    return {name: (float(duration), description) for name, duration, description in entries}
+
+
+class PerformanceMiddlewareTest(TestCase):
+    def setUp(self):
+        perf.reset()
+        self.addCleanup(perf.reset)
+        self.user = CustomUser.objects.create(username='perf', email='perf@test.test')
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_parts_of_request_are_reported(self):
+        response = self.client.get(reverse('profile'))
+        timing = server_timing(response)
+        self.assertEqual({'db', 'api', 'template', 'total'}, set(timing))
+        self.assertRegex(timing['db'][1], r'^[1-9]\d* queries$')
+        self.assertEqual('1 renders', timing['template'][1])
+        self.assertEqual('0 calls', timing['api'][1])
+        self.assertGreaterEqual(timing['total'][0], timing['template'][0])
+
+    def test_upstream_calls_from_fanout_threads_are_attributed(self):
+        with StubServer() as server, override_settings(
+            MUSIXMATCH={'BASE_URL': server.url, 'RETRIES': 0},
+            SEARCH_INDEX={'ENABLED': False},
+            INGESTION={'BACKEND': 'sync'},
+        ):
+            response = self.client.get(reverse('search'), {'query': 'numb'})
+        self.assertEqual('2 calls', server_timing(response)['api'][1])
+
+    def test_metrics_are_aggregated_per_url_name(self):
+        for _ in range(3):
+            self.client.get(reverse('profile'))
+        self.assertEqual(302, self.client.get(reverse('metrics')).status_code)
+        self.user.is_staff = True
+        self.user.save()
+        metrics = self.client.get(reverse('metrics')).json()
+        self.assertEqual(3, metrics['profile']['total']['count'])
+        self.assertEqual(3, sum(metrics['profile']['db']['buckets'].values()))
+
+
+class HistogramTest(TestCase):
+    def test_percentiles_are_bucket_bounds(self):
+        histogram = perf.Histogram([10, 100])
+        for value in [1] * 90 + [50] * 9 + [500]:
+            histogram.observe(value)
+        self.assertEqual(10, histogram.percentile(0.5))
+        self.assertEqual(10, histogram.percentile(0.9))
+        self.assertEqual(100, histogram.percentile(0.99))
+        self.assertEqual(500, histogram.percentile(1))
@@ -0,0 +1,77 @@
+import random
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from app import counters
+from app.models import CustomUser, Recommendations
+from app.recommendations import compute, rebuild
+
+
+class StoredRecommendationsTest(TestCase):
+    def setUp(self):
+        self.users = [
+            CustomUser.objects.create(username='user{}'.format(i), email='user{}@test.test'.format(i))
+            for i in range(8)
+        ]
+
+    def stored(self):
+        return set(Recommendations.objects.values_list('user_id', 'candidate_id', 'score'))
+
+    def computed(self):
+        return set(compute([user.id for user in self.users]))
+
+    def test_compute_matches_ranked_query(self):
+        me, friend, other, candidate = self.users[:4]
+        me.following.set([friend, other])
+        friend.following.set([me, candidate, other])
+        other.following.set([candidate])
+        self.assertEqual([(me.id, candidate.id, 2)], list(compute([me.id])))
+        self.assertEqual(
+            [(user.id, user.mutual) for user in me.get_users_recommendations()],
+            [(candidate_id, score) for _, candidate_id, score in compute([me.id])]
+        )
+
+    def follow_randomly(self, seed, times=60):
+        shuffle = random.Random(seed)
+        for _ in range(times):
+            user, target = shuffle.sample(self.users, 2)
+            if user.is_follow(target):
+                user.unfollow(target)
+            else:
+                user.follow(target)
+            yield
+
+    def test_follow_and_unfollow_keep_store_consistent(self):
+        for _ in self.follow_randomly(7):
+            self.assertEqual(self.computed(), self.stored())
+
+    @override_settings(RECOMMENDATIONS={'BATCH_SIZE': 2})
+    def test_pairs_are_inserted_in_batches(self):
+        for _ in self.follow_randomly(11):
+            self.assertEqual(self.computed(), self.stored())
+
+    @override_settings(RECOMMENDATIONS={'MAX_FAN_OUT': 0})
+    def test_high_fan_out_follows_are_rebuilt_in_background(self):
+        me, friend, candidate, fan = self.users[:4]
+        friend.following.set([candidate])
+        fan.following.set([me])
+        counters.reconcile(CustomUser)
+        me.refresh_from_db()
+        with mock.patch('app.recommendations.threading.Thread') as thread:
+            with self.captureOnCommitCallbacks(execute=True):
+                me.follow(friend)
+            self.assertEqual(set(), self.stored())
+            with mock.patch('app.recommendations.connection.close'):
+                thread.call_args.kwargs['target']()
+        self.assertEqual(self.computed(), self.stored())
+        self.assertEqual({(me.id, candidate.id, 1), (fan.id, friend.id, 1)}, self.stored())
+
+    def test_rebuild_replaces_stale_rows(self):
+        me, friend, candidate = self.users[:3]
+        me.following.set([friend])
+        friend.following.set([candidate])
+        Recommendations.objects.create(user=me, candidate=self.users[5], score=9)
+        rebuild([me.id])
+        self.assertEqual({(me.id, candidate.id, 1)}, self.stored())
+        self.assertEqual([candidate], me.get_stored_recommendations())
@@ -0,0 +1,57 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from app import search_index
+from app.models import Artists, Tracks
+from app.search_index import ngrams, tokenize
+
+
+@override_settings(SEARCH_INDEX={'REFRESH_INTERVAL': 3600, 'MIN_RESULTS': 2})
+class SearchIndexTest(TestCase):
+    def setUp(self):
+        search_index.reset()
+        self.addCleanup(search_index.reset)
+        linkin = Artists.objects.create(id_musixmatch=1, name='Linkin Park')
+        Artists.objects.create(id_musixmatch=2, name='Park Jiha')
+        Tracks.objects.create(id_musixmatch=10, name='In the End', author=linkin)
+        Tracks.objects.create(id_musixmatch=11, name='Numb', author=linkin)
+        Tracks.objects.create(id_musixmatch=12, name='Numb/Encore', author=linkin)
+
+    def test_tokenizer_and_prefix_ngrams(self):
+        self.assertEqual(['numb', 'encore'], tokenize('Numb/Encore'))
+        self.assertTrue(ngrams('nu') <= ngrams('numb'))
+
+    def test_word_prefixes_match_in_any_order(self):
+        index = search_index.get_index('artists')
+        self.assertEqual(
+            [{'artist': {'id_musixmatch': 1, 'name': 'Linkin Park'}}],
+            index.search('park lin')
+        )
+        self.assertEqual(2, len(index.search('PARK')))
+        self.assertEqual([], index.search('ark'))
+
+    def test_exact_name_ranks_first(self):
+        results = search_index.get_index('tracks').search('numb')
+        self.assertEqual([11, 12], [result['track']['id_musixmatch'] for result in results])
+        self.assertEqual('Linkin Park', results[0]['track']['artist']['name'])
+
+    def test_new_rows_are_loaded_after_invalidate(self):
+        index = search_index.get_index('tracks')
+        self.assertEqual([], index.search('faint'))
+        Tracks.objects.create(id_musixmatch=13, name='Faint')
+        self.assertEqual([], index.search('faint'))
+        search_index.invalidate()
+        self.assertEqual(1, len(index.search('faint')))
+
+    def test_warm_up_builds_indexes_before_searches(self):
+        with mock.patch('app.search_index.threading.Thread') as thread:
+            search_index.warm_up()
+            with self.assertNumQueries(0):
+                self.assertEqual([], search_index.get_index('tracks').search('numb'))
+        self.assertEqual(2, thread.call_count)
+        with mock.patch('app.search_index.connection.close'), self.assertNumQueries(2):
+            for call in thread.call_args_list:
+                call.kwargs['target']()
+        with self.assertNumQueries(0):
+            self.assertEqual(2, len(search_index.get_index('tracks').search('numb')))
@@ -0,0 +1,58 @@
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from app.models import CustomUser, Genres, Playlists, TasteNeighbors, Tracks
+
+try:
+    import numpy  # noqa: F401
+    import scipy  # noqa: F401
+    HAS_SCIPY = True
+except ImportError:
+    HAS_SCIPY = False
+
+
+@skipUnless(HAS_SCIPY, 'numpy and scipy are not installed')
+class TasteNeighborsTest(TestCase):
+    def setUp(self):
+        self.users = [
+            CustomUser.objects.create(username='user{}'.format(i), email='user{}@test.test'.format(i))
+            for i in range(4)
+        ]
+        rock = Genres.objects.create(id_musixmatch=1, name='rock')
+        jazz = Genres.objects.create(id_musixmatch=2, name='jazz')
+        self.tracks = [Tracks.objects.create(id_musixmatch=i, name='track{}'.format(i)) for i in range(6)]
+        for track in self.tracks[:3]:
+            track.genres.add(rock)
+        for track in self.tracks[3:]:
+            track.genres.add(jazz)
+        first, second, third, _ = self.users
+        first.added_tracks.set(self.tracks[:3])
+        second.added_tracks.set(self.tracks[1:3])
+        playlist = Playlists.objects.create(name='jazz', creator=third)
+        playlist.tracks.set(self.tracks[3:])
+        self.users[3].added_playlists.add(playlist)
+
+    def test_neighbors_are_ranked_by_similarity(self):
+        for metric in ['cosine', 'jaccard']:
+            call_command('build_taste_neighbors', '--metric', metric, '--chunk-size', '2', stdout=StringIO())
+            first, second, third, fourth = self.users
+            self.assertEqual([second], first.get_taste_neighbors())
+            self.assertEqual([fourth], third.get_taste_neighbors())
+            self.assertFalse(TasteNeighbors.objects.filter(user=first, neighbor=third).exists())
+
+    def test_top_k_limits_neighbors(self):
+        self.users[2].added_tracks.set(self.tracks[:1])
+        call_command('build_taste_neighbors', '--top-k', '1', stdout=StringIO())
+        self.assertEqual(1, TasteNeighbors.objects.filter(user=self.users[0]).count())
+
+    def test_shared_genre_without_shared_tracks_is_no_candidate(self):
+        other = CustomUser.objects.create(username='other', email='other@test.test')
+        track = Tracks.objects.create(id_musixmatch=100, name='other rock')
+        track.genres.add(Genres.objects.get(name='rock'))
+        other.added_tracks.add(track)
+        call_command('build_taste_neighbors', stdout=StringIO())
+        self.assertFalse(TasteNeighbors.objects.filter(user=other).exists())
+        self.assertEqual([self.users[1]], self.users[0].get_taste_neighbors())
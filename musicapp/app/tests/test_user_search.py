@@ -0,0 +1,53 @@
+from django.test import TestCase
+
+from app import counters
+from app.models import CustomUser, UsernameTrigrams
+from app.user_search import search_users
+
+
+class SearchUsersTest(TestCase):
+    def setUp(self):
+        names = ['maxim', 'maxwell', 'MaxPower', 'alexander', 'alexandra', 'bob']
+        self.users = {
+            name: CustomUser.objects.create(username=name, email='{}@test.test'.format(name)) for name in names
+        }
+        self.users['bob'].following.add(self.users['maxwell'], self.users['alexandra'])
+        self.users['maxim'].following.add(self.users['maxwell'])
+        counters.reconcile(CustomUser)
+
+    def test_prefix_is_case_insensitive_and_ranked_by_followers(self):
+        found = search_users('MAX')
+        self.assertEqual('maxwell', found[0].username)
+        self.assertEqual({'maxim', 'maxwell', 'MaxPower'}, {user.username for user in found})
+        self.assertEqual(2, found[0].followers_count)
+
+    def test_prefix_candidates_are_not_limited_alphabetically(self):
+        popular = CustomUser.objects.create(username='maxzz', email='maxzz@test.test')
+        for number in range(3):
+            fan = CustomUser.objects.create(username='fan{}'.format(number), email='fan{}@test.test'.format(number))
+            fan.following.add(popular)
+        counters.reconcile(CustomUser)
+        self.assertEqual([popular], search_users('max', limit=1))
+
+    def test_typos_are_matched_by_trigrams(self):
+        found = [user.username for user in search_users('alexandr')]
+        self.assertEqual(['alexandra', 'alexander'], found)
+        found = [user.username for user in search_users('aleksander')]
+        self.assertIn('alexander', found)
+        self.assertNotIn('bob', found)
+
+    def test_limit_and_username_change(self):
+        self.assertEqual(1, len(search_users('max', limit=1)))
+        user = self.users['bob']
+        user.username = 'robert'
+        user.save()
+        self.assertFalse(UsernameTrigrams.objects.filter(user=user, trigram=' bo').exists())
+        self.assertEqual([user], search_users('robret'))
+
+    def test_trigrams_are_rebuilt_only_on_username_change(self):
+        user = CustomUser.objects.get(pk=self.users['bob'].pk)
+        user.first_name = 'Bob'
+        with self.assertNumQueries(1):
+            user.save()
+        user.save(update_fields=['username'])
+        self.assertTrue(UsernameTrigrams.objects.filter(user=user, trigram=' bo').exists())
@@ -1,7 +1,44 @@
-from django.test import Client, TestCase
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
-from app.models import CustomUser, Tracks, Playlists
+from app import counters, search_index
+from app.models import Artists, CustomUser, Tracks, Playlists
+from app.musixmatch import MusixmatchUnavailable
+from app.musixmatch.stub import StubServer
+
+
+def api_payload(key, rows):
+    return {'message': {'header': {'status_code': 200}, 'body': {key: rows}}}
+
+
+def api_track(track_id, name='track', artist_id=1, album_id=1, genres=()):
+    return {
+        'track': {
+            'track_id': track_id,
+            'track_name': name,
+            'album_id': album_id,
+            'album_name': 'album{}'.format(album_id),
+            'artist_id': artist_id,
+            'artist_name': 'artist{}'.format(artist_id),
+            'primary_genres': {
+                'music_genre_list': [
+                    {'music_genre': {'music_genre_id': genre_id, 'music_genre_name': 'genre{}'.format(genre_id)}}
+                    for genre_id in genres
+                ]
+            }
+        }
+    }
+
+
+def api_artist(artist_id, name='artist'):
+    return {'artist': {'artist_id': artist_id, 'artist_name': name}}
 
 
 class CreatePlaylistViewTest(TestCase):
@@ -44,3 +81,199 @@ class CreatePlaylistViewTest(TestCase):
         )
         self.assertRedirects(response, reverse('profile'), status_code=302, target_status_code=200)
         self.assertEqual(1, Playlists.objects.count())
+
+
+@override_settings(INGESTION={'BACKEND': 'sync'})
+class SearchViewTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.url = reverse('search')
+        patcher = mock.patch('app.musixmatch.fanout.get_client')
+        self.upstream = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch('app.views.threading.Thread')
+        self.thread = patcher.start()
+        self.addCleanup(patcher.stop)
+        search_index.reset()
+        self.addCleanup(search_index.reset)
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_empty_query_skips_upstream(self):
+        response = self.client.get(self.url, {'query': ''})
+        self.assertEqual(200, response.status_code)
+        self.upstream.get.assert_not_called()
+
+    def test_tracks_and_artists_are_rendered(self):
+        def upstream_get(method, **params):
+            if method == 'track.search':
+                return api_payload('track_list', [api_track(10, 'Numb', genres=[3])])
+            return api_payload('artist_list', [api_artist(20, 'Linkin Park')])
+
+        self.upstream.get.side_effect = upstream_get
+        response = self.client.get(self.url, {'query': 'numb'})
+        self.assertContains(response, 'Numb')
+        self.assertContains(response, 'Linkin Park')
+        self.assertTrue(Tracks.objects.filter(id_musixmatch=10).exists())
+        self.assertTrue(Artists.objects.filter(id_musixmatch=20).exists())
+
+    def test_failed_side_renders_partial_results(self):
+        def upstream_get(method, **params):
+            if method == 'track.search':
+                return api_payload('track_list', [api_track(10, 'Numb')])
+            raise TimeoutError
+
+        self.upstream.get.side_effect = upstream_get
+        response = self.client.get(self.url, {'query': 'numb'})
+        self.assertContains(response, 'Numb')
+        self.assertContains(response, 'Часть результатов не успела загрузиться')
+
+    @override_settings(SEARCH_INDEX={'MIN_RESULTS': 1})
+    def test_local_results_skip_upstream(self):
+        artist = Artists.objects.create(id_musixmatch=20, name='Numb Band')
+        Tracks.objects.create(id_musixmatch=10, name='Numb', author=artist)
+        search_index.mark_fresh('tracks', 'numb')
+        search_index.mark_fresh('artists', 'numb')
+        response = self.client.get(self.url, {'query': 'numb'})
+        self.assertContains(response, 'Numb Band')
+        self.upstream.get.assert_not_called()
+        self.thread.assert_not_called()
+
+    @override_settings(SEARCH_INDEX={'MIN_RESULTS': 1})
+    def test_stale_local_results_are_refreshed_in_background(self):
+        artist = Artists.objects.create(id_musixmatch=20, name='Numb Band')
+        Tracks.objects.create(id_musixmatch=10, name='Numb', author=artist)
+
+        def upstream_get(method, **params):
+            if method == 'track.search':
+                return api_payload('track_list', [api_track(11, 'Numb Remix')])
+            return api_payload('artist_list', [api_artist(20, 'Numb Band')])
+
+        self.upstream.get.side_effect = upstream_get
+        response = self.client.get(self.url, {'query': 'numb'})
+        self.assertContains(response, 'Numb Band')
+        self.assertNotContains(response, 'Numb Remix')
+        self.upstream.get.assert_not_called()
+        with mock.patch('app.views.connection.close'), self.captureOnCommitCallbacks(execute=True):
+            self.thread.call_args.kwargs['target']()
+        self.assertTrue(Tracks.objects.filter(id_musixmatch=11).exists())
+        self.thread.reset_mock()
+        response = self.client.get(self.url, {'query': 'NUMB'})
+        self.assertContains(response, 'Numb Remix')
+        self.thread.assert_not_called()
+
+    @override_settings(SEARCH_INDEX={'MIN_RESULTS': 1})
+    def test_failed_background_refresh_is_retried(self):
+        artist = Artists.objects.create(id_musixmatch=20, name='Numb Band')
+        Tracks.objects.create(id_musixmatch=10, name='Numb', author=artist)
+        self.upstream.get.side_effect = MusixmatchUnavailable('Circuit is open')
+        self.client.get(self.url, {'query': 'numb'})
+        with mock.patch('app.views.connection.close'):
+            self.thread.call_args.kwargs['target']()
+        self.thread.reset_mock()
+        self.client.get(self.url, {'query': 'numb'})
+        self.thread.assert_called_once()
+
+    @override_settings(SEARCH_INDEX={'MIN_RESULTS': 2})
+    def test_local_results_are_kept_when_upstream_is_unavailable(self):
+        artist = Artists.objects.create(id_musixmatch=20, name='Numb Band')
+        Tracks.objects.create(id_musixmatch=10, name='Numb', author=artist)
+        self.upstream.get.side_effect = MusixmatchUnavailable('Circuit is open')
+        response = self.client.get(self.url, {'query': 'numb'})
+        self.assertEqual(200, response.status_code)
+        self.assertContains(response, 'Numb Band')
+        self.assertEqual(2, self.upstream.get.call_count)
+
+
+class SearchViewStubTest(TestCase):
+    def setUp(self):
+        self.server = StubServer().start()
+        self.addCleanup(self.server.stop)
+        search_index.reset()
+        self.addCleanup(search_index.reset)
+
+    def test_search_runs_against_local_stub(self):
+        settings = {'BASE_URL': self.server.url, 'RETRIES': 0}
+        with override_settings(MUSIXMATCH=settings, INGESTION={'BACKEND': 'sync'}):
+            response = Client().get(reverse('search'), {'query': 'numb'})
+        self.assertContains(response, 'Numb 1')
+        self.assertEqual(5, Tracks.objects.count())
+
+
+class RecommendationsViewTest(TestCase):
+    def setUp(self):
+        self.users = [
+            CustomUser.objects.create(username='user{}'.format(i), email='user{}@test.test'.format(i))
+            for i in range(6)
+        ]
+        me, friend1, friend2, known, popular, rare = self.users
+        me.following.set([friend1, friend2, known])
+        friend1.following.set([me, known, popular, rare])
+        friend2.following.set([popular])
+        self.me = me
+
+    def test_friends_of_friends_are_ranked_by_mutual_connections(self):
+        with self.assertNumQueries(1):
+            recommendations = list(self.me.get_users_recommendations())
+        self.assertEqual([self.users[4], self.users[5]], recommendations)
+        self.assertEqual([2, 1], [user.mutual for user in recommendations])
+        self.assertEqual([self.users[4]], list(self.me.get_users_recommendations(limit=1)))
+
+    def test_view_renders_stored_recommendations(self):
+        call_command('rebuild_recommendations', stdout=StringIO())
+        self.client.force_login(self.me)
+        response = self.client.get(reverse('recommendations'))
+        self.assertEqual([self.users[4], self.users[5]], response.context['users'])
+
+
+class ProfileViewsTest(TestCase):
+    def setUp(self):
+        self.me = CustomUser.objects.create(username='me', email='me@test.test')
+        self.other = CustomUser.objects.create(username='other', email='other@test.test')
+        self.client.force_login(self.me)
+
+    def fill(self, user, size):
+        offset = CustomUser.objects.count()
+        users = [
+            CustomUser.objects.create(username='user{}'.format(i), email='user{}@test.test'.format(i))
+            for i in range(offset, offset + size)
+        ]
+        user.following.add(*users)
+        user.followers.add(*users)
+        tracks = [
+            Tracks.objects.create(
+                id_musixmatch=i,
+                name='track{}'.format(i),
+                author=Artists.objects.create(id_musixmatch=i, name='artist{}'.format(i))
+            )
+            for i in range(offset, offset + size)
+        ]
+        user.added_tracks.add(*tracks)
+        for i, owner in enumerate(users, offset):
+            user.added_playlists.add(Playlists.objects.create(name='playlist{}'.format(i), creator=owner))
+            Playlists.objects.create(name='playlist{}'.format(i), creator=user)
+        counters.reconcile(CustomUser, ids=[user.pk])
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(200, response.status_code)
+        return len(queries)
+
+    def test_query_count_does_not_depend_on_content_size(self):
+        for url, user in [(reverse('profile'), self.me), (reverse('user', kwargs={'pk': self.other.pk}), self.other)]:
+            self.fill(user, 1)
+            small = self.count_queries(url)
+            self.fill(user, 10)
+            self.assertEqual(small, self.count_queries(url))
+
+    def test_sections_and_counts_are_rendered(self):
+        self.fill(self.other, 2)
+        response = self.client.get(reverse('user', kwargs={'pk': self.other.pk}))
+        self.assertContains(response, 'Подписчики (2)')
+        self.assertContains(response, 'track3')
+        self.assertEqual(2, response.context['user'].liked_playlists_count)
+
+    def test_missing_user_redirects(self):
+        response = self.client.get(reverse('user', kwargs={'pk': 999}))
+        self.assertRedirects(response, reverse('index'))
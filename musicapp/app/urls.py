@@ -14,13 +14,20 @@ urlpatterns = [
     path('content/', include([
         path('create-playlist/', views.CreatePlaylistView.as_view(), name='create_playlist'),
         path('playlist/<int:pk>/', views.PlaylistView.as_view(), name='playlist'),
-        path('user/<int:pk>/', views.ProfileView.as_view(), name='user')
+        path('playlist/<int:pk>/<str:collection>/', views.PlaylistCollectionView.as_view(), name='playlist_collection'),
+        path('user/<int:pk>/', views.ProfileView.as_view(), name='user'),
+        path('user/<int:pk>/<str:collection>/', views.UserCollectionView.as_view(), name='user_collection'),
+        path('feed/', views.FeedView.as_view(), name='feed')
     ])),
     path('search/', include([
         path('search', views.SearchView.as_view(), name='search'),
+        path('autocomplete', views.autocomplete, name='autocomplete'),
         path('top-artists', views.TopArtistsView.as_view(), name='top_artists'),
         path('top-tracks', views.TopTracksView.as_view(), name='top_tracks'),
         path('recommendations', views.RecommendationsView.as_view(), name='recommendations')
     ])),
-    path('content-manager', views.content_manager, name='manager')
+    path('content-manager', views.content_manager, name='manager'),
+    path('content-manager/batch', views.batch_manager, name='batch_manager'),
+    path('metrics', views.metrics, name='metrics'),
+    path('metrics/cache', views.cache_metrics, name='cache_metrics')
 ]
@@ -0,0 +1,39 @@
+from django.db.models import Count
+
+from .models import CustomUser, UsernameTrigrams, trigrams
+
+
+MIN_SIMILARITY = 0.3
+
+
+def search_users(query, limit=10):
+    """Function returns users whose username starts with query, then similar ones, by followers.
+
+    Prefix matches are ranked by stored followers counter, typos are matched by shared
+    username trigrams and ranked by similarity, then by followers.
+    """
+    query = query.strip().lower()
+    if not query:
+        return []
+    users = list(
+        CustomUser.objects
+        .filter(username__istartswith=query)
+        .order_by('-followers_count', 'username')[:limit]
+    )
+    if len(users) >= limit:
+        return users
+    query_trigrams = trigrams(query)
+    shared = (
+        UsernameTrigrams.objects
+        .filter(trigram__in=query_trigrams)
+        .exclude(user__username__istartswith=query)
+        .values('user_id')
+        .annotate(shared=Count('id'))
+        .filter(shared__gte=max(1, round(len(query_trigrams) * MIN_SIMILARITY)))
+        .order_by('-shared', '-user__followers_count', 'user_id')
+        .values_list('user_id', 'shared')[:limit - len(users)]
+    )
+    shared = dict(shared)
+    fuzzy = list(CustomUser.objects.filter(id__in=shared))
+    fuzzy.sort(key=lambda user: (-shared[user.id], -user.followers_count, user.username))
+    return users + fuzzy
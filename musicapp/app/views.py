@@ -1,21 +1,81 @@
-import os
-import requests
+import json
+import threading
 
 from django.contrib import messages
 from django.contrib.auth import login
-from django.contrib.auth.decorators import login_required
+from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth.views import LoginView
+from django.db import connection, transaction
+from django.http import Http404, JsonResponse
 from django.shortcuts import render, redirect
+from django.urls import reverse
 from django.utils.decorators import method_decorator
+from django.utils.functional import SimpleLazyObject
 from django.views import View
+from django.views.decorators.http import require_POST
 
+from . import batch, charts, feed, ingestion, page_cache, perf, search_index
+from .autocomplete import complete
+from .conditional import conditional_page, playlist_validators, profile_validators
+from .counters import count_of, increment, touch
 from .forms import CreatePlaylistForm, RegistrationForm, CommentsForm
-from .models import Tracks, Playlists, CustomUser, Comments
+from .models import (
+    Activities, ChartSnapshots, Tracks, Playlists, PlaylistHasTracks, CustomUser, Comments, UserHasPlaylists,
+    UserHasTracks
+)
 from .mixins import APIDataMixins
-
-
-URL = 'https://api.musixmatch.com/ws/1.1/'
-APIKEY = f"&apikey={os.getenv('MUSIXMATCH_API')}"
+from .musixmatch import MusixmatchError, fetch_many, get_config
+from .pagination import paginate
+from .user_search import search_users
+
+
+PAGE_SIZE = 20
+
+BATCH_LIMIT = 500
+
+AUTOCOMPLETE_LIMIT = 5
+AUTOCOMPLETE_MAX_LIMIT = 10
+AUTOCOMPLETE_MIN_LENGTH = 2
+
+Following = CustomUser.following.through
+
+# name: (model, user field, related rows to join, ordering, attribute holding item, fragment template)
+USER_COLLECTIONS = {
+    'following': (
+        Following, 'from_customuser', ['to_customuser'], ('id',), 'to_customuser', 'content/fragments/users.html'
+    ),
+    'followers': (
+        Following, 'to_customuser', ['from_customuser'], ('id',), 'from_customuser', 'content/fragments/users.html'
+    ),
+    'tracks': (
+        UserHasTracks, 'user', ['track__album', 'track__author'], ('-added_at', '-id'), 'track',
+        'content/fragments/tracks.html'
+    ),
+    'liked_playlists': (
+        UserHasPlaylists, 'user', ['playlist'], ('-added_at', '-id'), 'playlist', 'content/fragments/playlists.html'
+    ),
+    'created_playlists': (
+        Playlists, 'creator', [], ('-created_at', '-id'), None, 'content/fragments/playlists.html'
+    ),
+}
+
+# name: (model, playlist field, related rows to join, ordering, attribute holding item, fragment template)
+PLAYLIST_COLLECTIONS = {
+    'tracks': (
+        PlaylistHasTracks, 'playlists', ['tracks__author'], ('position', 'id'), 'tracks',
+        'content/fragments/playlist_tracks.html'
+    ),
+    'comments': (
+        Comments, 'playlist', ['author'], ('created_at', 'id'), None, 'content/fragments/comments.html'
+    ),
+}
+
+# Fields shown on profile and playlist pages, cached objects hold nothing else (like password hashes or emails).
+PROFILE_FIELDS = ['id', 'username', 'followers_count', 'following_count', 'tracks_count']
+PLAYLIST_FIELDS = [
+    'id', 'name', 'description', 'created_at', 'updated_at', 'adds_count', 'comments_count', 'tracks_count',
+    'creator__id', 'creator__username'
+]
 
 
 def index(request):
@@ -34,38 +94,64 @@ def content_manager(request):
     if content == 'playlist':
         playlist = Playlists.objects.get(id=request.POST.get('pk'))
         if 'add' in request.POST:
-            if user.added_playlists.filter(id=playlist.id).exists():
-                messages.success(request, f'Плейлист "{playlist.name}" был добавлен ранее')
-            else:
-                user.added_playlists.add(playlist)
-                user.save()
+            with transaction.atomic():
+                # Serialized with batches of user, which add rows of many items at once.
+                batch.lock(CustomUser, user.pk)
+                _, created = UserHasPlaylists.objects.get_or_create(user=user, playlist=playlist)
+                if created:
+                    increment(Playlists, playlist.pk, adds_count=1)
+                    touch(CustomUser, [user.pk])
+                    feed.record(user, Activities.PLAYLIST_ADDED, playlist=playlist)
+            if created:
                 messages.success(request, f'Плейлист "{playlist.name}" уже успешно добавлен!')
+            else:
+                messages.success(request, f'Плейлист "{playlist.name}" был добавлен ранее')
         elif 'delete' in request.POST:
             if playlist.creator == user:
-                playlist.delete()
+                with transaction.atomic():
+                    touch(CustomUser, [user.pk])
+                    likers = UserHasPlaylists.objects.filter(playlist=playlist).values_list('user', flat=True)
+                    touch(CustomUser, likers)
+                    playlist.delete()
                 messages.success(request, f'Плейлист "{playlist.name}" успешно удален!')
                 return redirect('profile')
-            elif not user.added_playlists.filter(id=playlist.id).exists():
+            with transaction.atomic():
+                batch.lock(CustomUser, user.pk)
+                deleted, _ = UserHasPlaylists.objects.filter(user=user, playlist=playlist).delete()
+                if deleted:
+                    increment(Playlists, playlist.pk, adds_count=-1)
+                    touch(CustomUser, [user.pk])
+            if not deleted:
                 messages.error(request, 'Недоступное действие')
             else:
-                user.added_playlists.remove(playlist)
-                user.save()
                 messages.success(request, f'Плейлист "{playlist.name}" успешно удален!')
     elif content == 'track':
-        track = Tracks.objects.get(id_musixmatch=request.POST.get('pk'))
+        try:
+            track = Tracks.objects.get(id_musixmatch=request.POST.get('pk'))
+        except Tracks.DoesNotExist:
+            # Track found by search could still wait in ingestion queue.
+            ingestion.flush()
+            track = Tracks.objects.get(id_musixmatch=request.POST.get('pk'))
         if 'add' in request.POST:
-            if user.added_tracks.filter(id=track.id).exists():
-                messages.success(request, f'Трек "{track.name}" уже был добавлен ранее')
-            else:
-                user.added_tracks.add(track)
-                user.save()
+            with transaction.atomic():
+                batch.lock(CustomUser, user.pk)
+                _, created = UserHasTracks.objects.get_or_create(user=user, track=track)
+                if created:
+                    increment(CustomUser, user.pk, tracks_count=1)
+                    feed.record(user, Activities.TRACK_ADDED, track=track)
+            if created:
                 messages.success(request, f'Трек "{track.name}" успешно добавлен!')
+            else:
+                messages.success(request, f'Трек "{track.name}" уже был добавлен ранее')
         elif 'delete' in request.POST:
-            if not user.added_tracks.filter(id=track.id).exists():
+            with transaction.atomic():
+                batch.lock(CustomUser, user.pk)
+                deleted, _ = UserHasTracks.objects.filter(user=user, track=track).delete()
+                if deleted:
+                    increment(CustomUser, user.pk, tracks_count=-1)
+            if not deleted:
                 messages.error(request, 'Недоступное действие')
             else:
-                user.added_tracks.remove(track)
-                user.save()
                 messages.success(request, f'Трек "{track.name}" успешно удален!')
     next_url = request.POST.get('next')
     query = request.POST.get('query')
@@ -77,26 +163,84 @@ def content_manager(request):
         return redirect('profile')
 
 
+@login_required
+@require_POST
+def batch_manager(request):
+    """View applies one action to list of tracks or playlists and returns outcome of every item as JSON.
+
+    Body: {"content": "track" | "playlist", "action": "add" | "remove", "ids": [...]} changes library of user,
+    with "playlist": pk tracks of own playlist are changed and "action" may also be "reorder".
+    Tracks are given by MusixMatch ids, like in `content_manager`.
+    """
+    try:
+        data = json.loads(request.body)
+        content, action, ids = data['content'], data['action'], data['ids']
+        if not isinstance(ids, list) or not all(type(pk) is int for pk in ids):
+            raise TypeError('ids must be list of integers')
+        ids = list(dict.fromkeys(ids))
+        playlist_id = data.get('playlist')
+        playlist_id = None if playlist_id is None else int(playlist_id)
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'error': 'Некорректный запрос'}, status=400)
+    if len(ids) > BATCH_LIMIT:
+        return JsonResponse({'error': f'Не больше {BATCH_LIMIT} элементов за запрос'}, status=400)
+    if playlist_id is None:
+        handler = batch.LIBRARY_ACTIONS.get((content, action))
+        target = request.user
+    else:
+        handler = batch.PLAYLIST_ACTIONS.get(action) if content == 'track' else None
+        target = Playlists.objects.filter(pk=playlist_id).first()
+        if target is None:
+            return JsonResponse({'error': 'Плейлист не найден'}, status=404)
+        if target.creator_id != request.user.pk:
+            return JsonResponse({'error': 'Недоступное действие'}, status=403)
+    if handler is None:
+        return JsonResponse({'error': 'Недоступное действие'}, status=400)
+    return JsonResponse({'results': handler(target, ids)})
+
+
+def get_collection(collections, url_name, pk, name, cursor=None):
+    """Function returns page of `name` collection which belongs to user or playlist with given pk."""
+    model, field, related, ordering, attr, _ = collections[name]
+    queryset = model.objects.filter(**{field + '_id': pk}).select_related(*related)
+    page = paginate(queryset, ordering, cursor, PAGE_SIZE, attr)
+    page.url = reverse(url_name, kwargs={'pk': pk, 'collection': name})
+    return page
+
+
+def render_collection(request, template_name, context):
+    """Function renders collection page alone for "load more" requests or inside site layout."""
+    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+        return render(request, template_name, context)
+    return render(request, 'content/collection.html', {'fragment': template_name, **context})
+
+
+def get_profile_users():
+    """Function returns users annotated with sizes of profile sections which have no stored counter."""
+    return CustomUser.objects.annotate(
+        liked_playlists_count=count_of(UserHasPlaylists, 'user'),
+        created_playlists_count=count_of(Playlists, 'creator'),
+    )
+
+
+def lazy_collection(collections, url_name, pk, name):
+    """Function returns first page of collection loaded on first use, so cached fragments skip its query."""
+    return SimpleLazyObject(lambda: get_collection(collections, url_name, pk, name))
+
+
+def get_profile_context(pk):
+    """Function loads user with every profile section in fixed number of queries."""
+    user = page_cache.cached('profile', CustomUser, pk, lambda: get_profile_users().only(*PROFILE_FIELDS).get(pk=pk))
+    context = {'user': user}
+    for name in USER_COLLECTIONS:
+        context[name] = lazy_collection(USER_COLLECTIONS, 'user_collection', user.pk, name)
+    return context
+
+
 @login_required(redirect_field_name='login')
+@conditional_page(lambda request: profile_validators(request, request.user.pk))
 def profile(request):
-    user = request.user
-    created_playlists = user.playlists.all()
-    liked_playlists = user.added_playlists.all()
-    tracks = user.added_tracks.all()
-    following = user.following.all()
-    followers = user.followers.all()
-    return render(
-        request,
-        'content/profile.html',
-        {
-            'user': user,
-            'following': following,
-            'followers': followers,
-            'tracks': tracks,
-            'liked_playlists': liked_playlists,
-            'created_playlists': created_playlists
-        }
-    )
+    return render(request, 'content/profile.html', get_profile_context(request.user.pk))
 
 
 @method_decorator(login_required, name='dispatch')
@@ -110,7 +254,10 @@ class CreatePlaylistView(View):
     def post(self, request):
         form = CreatePlaylistForm(request.POST, user=request.user)
         if form.is_valid():
-            playlist = form.save()
+            with transaction.atomic():
+                playlist = form.save()
+                touch(CustomUser, [request.user.pk])
+                feed.record(request.user, Activities.PLAYLIST_CREATED, playlist=playlist)
             messages.success(request, f'Плейлист "{playlist.name}" создан успешно')
             return redirect('profile')
         else:
@@ -130,11 +277,15 @@ class MyLoginView(LoginView):
 class PlaylistView(View):
     template_name = 'content/playlist.html'
 
+    @method_decorator(conditional_page(playlist_validators))
     def get(self, request, pk):
         owner = False
-        playlist = Playlists.objects.get(pk=pk)
-        tracks = playlist.tracks.all()
-        comments = Comments.objects.filter(playlist=playlist)
+        playlist = page_cache.cached(
+            'playlist', Playlists, pk,
+            lambda: Playlists.objects.select_related('creator').only(*PLAYLIST_FIELDS).get(pk=pk)
+        )
+        tracks = lazy_collection(PLAYLIST_COLLECTIONS, 'playlist_collection', pk, 'tracks')
+        comments = lazy_collection(PLAYLIST_COLLECTIONS, 'playlist_collection', pk, 'comments')
         comment_form = CommentsForm()
         if request.user.is_authenticated and request.user == playlist.creator:
             owner = True
@@ -159,49 +310,78 @@ class PlaylistView(View):
                 comment = form.save(commit=False)
                 comment.author = user
                 comment.playlist = Playlists.objects.get(pk=pk)
-                comment.save()
+                with transaction.atomic():
+                    comment.save()
+                    increment(Playlists, pk, comments_count=1)
+                    feed.record(user, Activities.COMMENTED, playlist=comment.playlist, comment=comment)
                 messages.success(request, 'Комментарий успешно добавлен')
                 return redirect('playlist', pk=pk)
             else:
                 messages.error(request, 'Что-то пошло не так!')
                 return redirect('playlist', pk=pk)
         elif 'delete_comment' in request.POST:
-            comment = Comments.objects.get(id=request.POST.get('comment_id')).delete()
+            with transaction.atomic():
+                deleted, _ = Comments.objects.filter(id=request.POST.get('comment_id'), playlist_id=pk).delete()
+                if deleted:
+                    increment(Playlists, pk, comments_count=-1)
             messages.success(request, 'Сообщение удалено')
             return redirect('playlist', pk=pk)
 
 
+class PlaylistCollectionView(View):
+    """Next pages of playlist tracks and comments."""
+    def get(self, request, pk, collection):
+        if collection not in PLAYLIST_COLLECTIONS:
+            raise Http404
+        creator_id = Playlists.objects.filter(pk=pk).values_list('creator_id', flat=True).first()
+        if creator_id is None:
+            raise Http404
+        page = get_collection(PLAYLIST_COLLECTIONS, 'playlist_collection', pk, collection, request.GET.get('cursor'))
+        return render_collection(
+            request,
+            PLAYLIST_COLLECTIONS[collection][-1],
+            {
+                'page': page,
+                'playlist_id': pk,
+                'owner': request.user.is_authenticated and request.user.pk == creator_id,
+                'back_url': reverse('playlist', kwargs={'pk': pk})
+            }
+        )
+
+
+class UserCollectionView(View):
+    """Next pages of profile sections."""
+    def get(self, request, pk, collection):
+        if collection not in USER_COLLECTIONS:
+            raise Http404
+        page = get_collection(USER_COLLECTIONS, 'user_collection', pk, collection, request.GET.get('cursor'))
+        own = request.user.is_authenticated and request.user.pk == pk
+        return render_collection(
+            request,
+            USER_COLLECTIONS[collection][-1],
+            {
+                'page': page,
+                'own': own,
+                'removable': own and collection == 'liked_playlists',
+                'back_url': reverse('profile') if own else reverse('user', kwargs={'pk': pk})
+            }
+        )
+
+
 class ProfileView(View):
     template_name = "content/user.html"
 
+    @method_decorator(conditional_page(profile_validators))
     def get(self, request, pk):
+        if request.user.is_authenticated and request.user.pk == pk:
+            messages.success(request, 'Это ваш аккаунт')
+            return redirect('profile')
         try:
-            user = CustomUser.objects.get(id=pk)
+            context = get_profile_context(pk)
         except CustomUser.DoesNotExist:
-            messages.error("Пользователь с таким id не найден")
+            messages.error(request, "Пользователь с таким id не найден")
             return redirect('index')
-        finally:
-            if request.user.is_authenticated and user == request.user:
-                messages.success(request, 'Это ваш аккаунт')
-                return redirect('profile')
-            else:
-                created_playlists = user.playlists.all()
-                liked_playlists = user.added_playlists.all()
-                tracks = user.added_tracks.all()
-                following = user.following.all()
-                followers = user.followers.all()
-                return render(
-                    request,
-                    self.template_name,
-                    {
-                        'user': user,
-                        'following': following,
-                        'followers': followers,
-                        'tracks': tracks,
-                        'liked_playlists': liked_playlists,
-                        'created_playlists': created_playlists
-                    }
-                )
+        return render(request, self.template_name, context)
 
     @method_decorator(login_required)
     def post(self, request, pk):
@@ -227,14 +407,31 @@ class ProfileView(View):
         return redirect('user', pk=pk)
 
 
+@method_decorator(login_required, name='dispatch')
+class FeedView(View):
+    """Activities of followed users, newest first."""
+    template_name = 'content/feed.html'
+    fragment_name = 'content/fragments/feed.html'
+
+    def get(self, request):
+        page = feed.get_feed(request.user, request.GET.get('cursor'), PAGE_SIZE)
+        page.url = reverse('feed')
+        if request.GET.get('cursor'):
+            return render_collection(request, self.fragment_name, {'page': page, 'back_url': reverse('feed')})
+        return render(request, self.template_name, {'page': page})
+
+
 class RecommendationsView(View):
     template_name = 'content/recommendations.html'
+    limit = 50
 
     def get(self, request):
         users_to_recommend = []
+        similar_users = []
         if request.user.is_authenticated:
-            users_to_recommend = request.user.get_users_recommendations()
-        return render(request, self.template_name, {'users': users_to_recommend})
+            users_to_recommend = request.user.get_stored_recommendations(limit=self.limit)
+            similar_users = request.user.get_taste_neighbors(limit=self.limit)
+        return render(request, self.template_name, {'users': users_to_recommend, 'similar_users': similar_users})
 
 
 class RegistrationView(View):
@@ -264,8 +461,11 @@ class RegistrationView(View):
 
 class SearchView(View):
     template_name = 'content/searching.html'
-    api_tracks_query = 'track.search&page=1&page_size=5&s_track_rating=desc&q_track='
-    api_artists_query = 'artist.search&page=1&page_size=5&q_artist='
+    api_tracks_method = 'track.search'
+    api_tracks_params = {'page': 1, 'page_size': 5, 's_track_rating': 'desc'}
+    api_artists_method = 'artist.search'
+    api_artists_params = {'page': 1, 'page_size': 5}
+    profiles_limit = 10
 
     def get(self, request):
         user_query = request.GET.get('query')
@@ -277,19 +477,28 @@ class SearchView(View):
                     'query': user_query
                 }
             )
-        tracks_response = requests.get(
-            URL + self.api_tracks_query + user_query + APIKEY
-        ).json()
-        artists_response = requests.get(
-            URL + self.api_artists_query + user_query + APIKEY
-        ).json()
-        api_handler1 = APIDataMixins(tracks_response)
-        api_handler2 = APIDataMixins(artists_response)
-        api_handler1.insert_to_db()
-        api_handler2.insert_to_db()
-        tracks = api_handler1.get_data()
-        artists = api_handler2.get_data()
-        profiles = CustomUser.objects.filter(username=user_query)
+        results, enough = self._search_locally(user_query)
+        calls = {}
+        stale = {}
+        for name, call in self._api_calls(user_query).items():
+            if not enough[name]:
+                calls[name] = call
+            elif search_index.claim_refresh(name, user_query):
+                stale[name] = call
+        if calls:
+            responses = fetch_many(calls, deadline=get_config()['SEARCH_DEADLINE'])
+            if None in responses.values():
+                messages.warning(request, 'Часть результатов не успела загрузиться')
+            for name in calls:
+                data = self._handle_response(responses[name])
+                if data is not None:
+                    search_index.mark_fresh(name, user_query)
+                # Whatever was found locally is kept when upstream is slow or unavailable.
+                results[name] = data or results[name] or None
+        if stale:
+            self._refresh_in_background(stale, user_query)
+        tracks, artists = results['tracks'], results['artists']
+        profiles = search_users(user_query, limit=self.profiles_limit)
         return render(
             request,
             self.template_name,
@@ -301,34 +510,108 @@ class SearchView(View):
             }
         )
 
+    def _api_calls(self, user_query):
+        """Method returns MusixMatch calls searching tracks and artists by query."""
+        return {
+            'tracks': (self.api_tracks_method, {'q_track': user_query, **self.api_tracks_params}),
+            'artists': (self.api_artists_method, {'q_artist': user_query, **self.api_artists_params}),
+        }
 
-class TopArtistsView(View):
-    template_name = 'content/top_artists.html'
-    top_artists_query = 'chart.artists.get'
-    params = '?&page=1&page_size=7&format=json'
-
-    def get(self, request):
-        response = requests.get(URL+self.top_artists_query+self.params+APIKEY).json()
-        api_handler = APIDataMixins(response)
-        api_handler.insert_to_db()
-        artists = api_handler.get_data()
-        return render(request, self.template_name, {'artists': artists})
-
-
-class TopTracksView(View):
-    template_name = 'content/top_tracks.html'
-    top_tracks_query = 'chart.tracks.get'
-    params = '?chart_name=mxmweekly&page=1&page_size=6'
+    def _refresh_in_background(self, calls, user_query):
+        """Method fetches stale results upstream after response, new rows are saved by ingestion."""
+        def refresh():
+            try:
+                responses = fetch_many(calls, deadline=get_config()['SEARCH_DEADLINE'])
+                for name, response in responses.items():
+                    if self._handle_response(response) is None:
+                        search_index.mark_stale(name, user_query)
+            finally:
+                connection.close()
+
+        threading.Thread(target=refresh, name='search-refresh', daemon=True).start()
+
+    def _search_locally(self, user_query):
+        """Method returns tracks and artists found in local index and whether each side has enough of them."""
+        results = {'tracks': [], 'artists': []}
+        enough = {'tracks': False, 'artists': False}
+        config = search_index.get_config()
+        if not config['ENABLED']:
+            return results, enough
+        for name, limit in [('tracks', self.api_tracks_params['page_size']),
+                            ('artists', self.api_artists_params['page_size'])]:
+            results[name] = search_index.get_index(name).search(user_query, limit=limit)
+            enough[name] = len(results[name]) >= min(config['MIN_RESULTS'], limit)
+        return results, enough
+
+    @staticmethod
+    def _handle_response(response):
+        """Method schedules saving of API response content and returns its formatted data."""
+        if response is None:
+            return None
+        try:
+            api_handler = APIDataMixins(response)
+            data = api_handler.get_data()
+        except (ValueError, KeyError):
+            return None
+        api_handler.enqueue_to_db()
+        return data
+
+
+def autocomplete(request):
+    """View returns JSON with track, artist and user suggestions for `q` prefix."""
+    prefix = request.GET.get('q', '')
+    try:
+        limit = min(int(request.GET.get('limit', AUTOCOMPLETE_LIMIT)), AUTOCOMPLETE_MAX_LIMIT)
+    except ValueError:
+        limit = AUTOCOMPLETE_LIMIT
+    if len(prefix.strip()) < AUTOCOMPLETE_MIN_LENGTH or limit < 1:
+        return JsonResponse({'tracks': [], 'artists': [], 'users': []})
+    return JsonResponse(complete(prefix, limit))
+
+
+class ChartView(View):
+    """Base view of the latest saved chart snapshot."""
+    kind = None
+    context_name = None
 
     def get(self, request):
-        track_response = requests.get(
-            URL + self.top_tracks_query + self.params + APIKEY
-        ).json()
-        api_handler = APIDataMixins(track_response)
-        api_handler.insert_to_db()
-        self.tracks = api_handler.get_data()
+        entries = charts.latest_entries(self.kind)
+        if not entries:
+            # Chart was never refreshed, fetch it once right away.
+            try:
+                charts.refresh(self.kind)
+            except (MusixmatchError, ValueError):
+                pass
+            entries = charts.latest_entries(self.kind)
         return render(
             request,
             self.template_name,
-            {'tracks': self.tracks}
+            {
+                self.context_name: entries,
+                'updated_at': entries[0].snapshot.created_at if entries else None
+            }
         )
+
+
+class TopArtistsView(ChartView):
+    template_name = 'content/top_artists.html'
+    kind = ChartSnapshots.ARTISTS
+    context_name = 'artists'
+
+
+class TopTracksView(ChartView):
+    template_name = 'content/top_tracks.html'
+    kind = ChartSnapshots.TRACKS
+    context_name = 'tracks'
+
+
+@user_passes_test(lambda user: user.is_staff)
+def metrics(request):
+    """View returns request time histograms of this worker by URL name."""
+    return JsonResponse(perf.snapshot())
+
+
+@user_passes_test(lambda user: user.is_staff)
+def cache_metrics(request):
+    """View returns page cache hits and misses of this worker by entry name."""
+    return JsonResponse(page_cache.stats())
@@ -24,10 +24,11 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'app',
     'rest_framework',
-    # 'api',
+    'api',
 ]
 
 MIDDLEWARE = [
+    'app.perf.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -41,15 +42,110 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.DjangoModelPermissionsOrAnonReadOnly'
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 10
+    # Cursor pages don't count rows, so every page costs the same.
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.CursorPagination',
+    'PAGE_SIZE': 20
+}
+
+# Saving of MusixMatch data: 'sync', 'thread' (in-process queue) or 'command' (`manage.py ingest_worker`).
+INGESTION = {
+    'BACKEND': os.getenv('INGESTION_BACKEND', default='thread'),
+    'BATCH_SIZE': 200,
+    'FLUSH_INTERVAL': 2.0,
+}
+
+# In-memory index answering searches before MusixMatch API is requested.
+# Local results older than FRESHNESS_TTL seconds are shown while MusixMatch is asked again in background.
+SEARCH_INDEX = {
+    'ENABLED': True,
+    'REFRESH_INTERVAL': 5,
+    'MIN_RESULTS': 5,
+    'FRESHNESS_TTL': 3600,
+}
+
+# Sorted prefix arrays behind `search/autocomplete` endpoint.
+AUTOCOMPLETE = {
+    'REFRESH_INTERVAL': 5,
+    'REBUILD_INTERVAL': 600,
+    'CACHE_SIZE': 1024,
+}
+
+# Activities are pushed to followers' feeds unless actor has CELEBRITY_FOLLOWERS followers or more,
+# feeds read activities of such users directly.
+FEED = {
+    'CELEBRITY_FOLLOWERS': 1000,
+    'BACKFILL': 20,
+    'BATCH_SIZE': 1000,
+}
+
+# Follows changing recommendations of more than MAX_FAN_OUT users or candidates rebuild them
+# in background thread after commit instead of updating scores in request.
+RECOMMENDATIONS = {
+    'MAX_FAN_OUT': 1000,
+    'BATCH_SIZE': 1000,
+}
+
+# Fragments and objects of playlist and profile pages cached for versions of playlists and users.
+# Versions are moved on every change, so several workers need shared "pages" cache (Redis, Memcached).
+# Hits and misses per worker are served at `metrics/cache` endpoint.
+PAGE_CACHE = {
+    'ENABLED': os.getenv('PAGE_CACHE_ENABLED', default='1') == '1',
+    'CACHE_ALIAS': 'pages',
+    'TIMEOUT': 60 * 60,
+}
+
+# Per-request timings of `app.perf.PerformanceMiddleware`, aggregated per worker at `metrics` endpoint.
+# Every request is logged as JSON line by "app.perf" logger at INFO level, slow ones at WARNING.
+PERF = {
+    'SERVER_TIMING': os.getenv('PERF_SERVER_TIMING', default='1') == '1',
+    'SLOW_REQUEST_MS': 1000,
+    'BUCKETS': (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000),
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'app.perf': {
+            'handlers': ['console'],
+            'level': os.getenv('PERF_LOG_LEVEL', default='WARNING'),
+            'propagate': False,
+        },
+    },
+}
+
+# LocMemCache evicts least recently used entries over MAX_ENTRIES.
+# Point MUSIXMATCH_CACHE_BACKEND to Redis/file backend to share responses between workers.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'musixmatch': {
+        'BACKEND': os.getenv('MUSIXMATCH_CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('MUSIXMATCH_CACHE_LOCATION', default='musixmatch'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
+    },
+    'pages': {
+        'BACKEND': os.getenv('PAGE_CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('PAGE_CACHE_LOCATION', default='pages'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
 }
 
 ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'app.perf.TimedDjangoTemplates',
         'DIRS': [
             os.path.join(BASE_DIR, 'app', 'templates'),
         ],
@@ -110,3 +206,33 @@ AUTH_USER_MODEL = 'app.CustomUser'
 LOGIN_URL = 'login'
 
 LOGIN_REDIRECT_URL = 'profile'
+
+MUSIXMATCH = {
+    'BASE_URL': os.getenv('MUSIXMATCH_BASE_URL', default='https://api.musixmatch.com/ws/1.1/'),
+    'API_KEY': os.getenv('MUSIXMATCH_API'),
+    'CONNECT_TIMEOUT': float(os.getenv('MUSIXMATCH_CONNECT_TIMEOUT', default='3.05')),
+    'READ_TIMEOUT': float(os.getenv('MUSIXMATCH_READ_TIMEOUT', default='10')),
+    'RETRIES': 2,
+    'BACKOFF_FACTOR': 0.3,
+    'POOL_SIZE': 10,
+    'FANOUT_WORKERS': 8,
+    'SEARCH_DEADLINE': 5,
+    # Limiter and circuit state are shared by workers only if STATE_CACHE_ALIAS is a shared cache (Redis).
+    'RATE_LIMIT': int(os.getenv('MUSIXMATCH_RATE_LIMIT', default='10')),
+    'RATE_PERIOD': 1,
+    'BREAKER_THRESHOLD': 5,
+    'BREAKER_COOLDOWN': 30,
+    'STATE_CACHE_ALIAS': 'default',
+    'CACHE_ALIAS': 'musixmatch',
+    'CACHE_TTL': {
+        'chart.tracks.get': 60 * 60 * 6,
+        'chart.artists.get': 60 * 60 * 6,
+        'track.search': 60 * 15,
+        'artist.search': 60 * 15,
+    },
+    'CACHE_DEFAULT_TTL': 60 * 5,
+    'CACHE_STALE_TTL': 60 * 60,
+    # JSON file of recorded responses, "replay" answers only from it, "record" appends missing ones.
+    'CASSETTE': os.getenv('MUSIXMATCH_CASSETTE'),
+    'CASSETTE_MODE': os.getenv('MUSIXMATCH_CASSETTE_MODE', default='replay'),
+}
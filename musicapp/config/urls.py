@@ -4,6 +4,6 @@ from django.urls import path, include
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    # path('api/', include('api.urls')),
+    path('api/', include('api.urls')),
     path('', include('app.urls')),
 ]
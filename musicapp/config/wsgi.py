@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application()
+
+from app import autocomplete, search_index  # noqa: E402
+
+autocomplete.warm_up()
+search_index.warm_up()